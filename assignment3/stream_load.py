@@ -0,0 +1,347 @@
+"""
+Streaming ingestion of ENTSO-E load records with incremental aggregates (asyncio)
+
+Streaming counterpart of total_load.py. An asyncio consumer reads records from
+a local feed and updates, per record and in O(1):
+    - the hourly mean of the open hour, per country (energy / covered time, so
+      15- and 30-minute records mix correctly; equal to resample('H').mean())
+    - running energy per country and year (MW x interval length)
+    - peak and trough of the closed hourly means, per country and for the
+      cross-country total (an hour counts once every country has closed it)
+Snapshots of all aggregates are written to a JSON file every few seconds
+(atomically, so readers never see a partial file) and once at the end.
+
+Feed record: a country code followed by an ENTSO-E export row, one per line
+    DE,"01.01.2024 00:00 - 01.01.2024 00:15","40733","40593"
+Sources: a file (optionally followed like `tail -f`) or a localhost TCP socket
+that any number of producers can connect to. `replay` is a producer that sends
+the 2024 DE and UK exports, merged in time order, as a stand-in for a live feed.
+
+An hour closes when a record of a later hour arrives for that country (or at
+the end of the stream); records for an already closed hour are still counted
+in the energy totals but reported as late. Lines that do not parse are skipped
+and counted as malformed in the snapshot.
+
+Usage:
+    python stream_load.py serve --port 9009 --countries DE UK &   # consumer
+    python stream_load.py replay --port 9009                     # producer
+    python stream_load.py file feed.csv --countries DE UK [--follow]
+"""
+import argparse
+import asyncio
+import datetime
+import functools
+import heapq
+import json
+import os
+import time
+
+FILES = {
+    'DE': 'Total_Load_Day_Ahead_Actual_2024_Germany.csv',
+    'UK': 'Total_Load_Day_Ahead_Actual_2024_UK.csv',
+}
+SNAPSHOT_FILE = 'stream_snapshot.json'
+SNAPSHOT_EVERY_S = 5.0
+MALFORMED = 'malformed'                             # parse_record result for lines that do not parse
+
+
+@functools.lru_cache(maxsize=4096)
+def _day_minutes(date_str):
+    """'dd.mm.yyyy' -> minutes since 0001-01-01 (one strptime per distinct day)"""
+    return datetime.datetime.strptime(date_str, '%d.%m.%Y').toordinal() * 1440
+
+
+def _minutes(stamp):
+    """'dd.mm.yyyy HH:MM' -> absolute minute"""
+    return _day_minutes(stamp[:10]) + int(stamp[11:13]) * 60 + int(stamp[14:16])
+
+
+def parse_record(line):
+    """
+    Feed line -> (country, start minute, interval hours, year, actual MW or None);
+    None for headers, MALFORMED for a line whose interval does not parse
+    """
+    country, _, row = line.rstrip('\r\n').partition(',')
+    fields = row.split(',')
+    interval = fields[0].strip('"')
+    if len(fields) < 3 or ' - ' not in interval:
+        return None
+    try:
+        start = _minutes(interval[:16])
+        hours = (_minutes(interval[19:35]) - start) / 60
+        year = int(interval[6:10])
+    except (ValueError, IndexError):
+        return MALFORMED
+    value = fields[2].strip('"')
+    try:
+        actual = float(value)
+    except ValueError:
+        actual = None                               # "N/A" or empty
+    return country, start, hours, year, actual
+
+
+class Tracker:
+    """Peak and trough of a stream of (value, label) pairs"""
+
+    def __init__(self):
+        self.peak = self.trough = None
+
+    def update(self, value, label):
+        if self.peak is None or value > self.peak[0]:
+            self.peak = (value, label)
+        if self.trough is None or value < self.trough[0]:
+            self.trough = (value, label)
+
+
+class CountryAggregate:
+    def __init__(self):
+        self.records = self.missing = self.late = 0
+        self.energy_mwh = {}                        # year -> MWh
+        self.open_hour = None                       # hour index (absolute minute // 60)
+        self.open_energy = self.open_hours = 0.0
+        self.closed_through = -1
+        self.hourly = Tracker()
+
+    def add(self, start, hours, year, actual):
+        """One record; returns (hour, mean MW) if it closed the previous hour, else None"""
+        self.records += 1
+        if actual is None:
+            self.missing += 1
+            return None
+        self.energy_mwh[year] = self.energy_mwh.get(year, 0.0) + actual * hours
+        hour = start // 60
+        closed = None
+        if hour != self.open_hour:
+            if hour <= self.closed_through:
+                self.late += 1
+                return None
+            closed = self.close()
+            self.open_hour = hour
+        self.open_energy += actual * hours
+        self.open_hours += hours
+        return closed
+
+    def close(self):
+        if self.open_hour is None or self.open_hours == 0:
+            return None
+        hour, mean = self.open_hour, self.open_energy / self.open_hours
+        self.hourly.update(mean, hour)
+        self.closed_through = hour
+        self.open_hour, self.open_energy, self.open_hours = None, 0.0, 0.0
+        return hour, mean
+
+
+class StreamAggregator:
+    def __init__(self, countries):
+        self.countries = {c: CountryAggregate() for c in countries}
+        self.pending = {}                           # hour -> [sum of closed country means, count]
+        self.total = Tracker()
+        self.incomplete = 0                         # hours some country never reported
+        self.started = time.perf_counter()
+        self.records = self.malformed = 0
+
+    def add_line(self, line):
+        record = parse_record(line)
+        if record is None:
+            return
+        if record is MALFORMED:
+            self.malformed += 1
+            return
+        country, start, hours, year, actual = record
+        agg = self.countries.get(country)
+        if agg is None:
+            agg = self.countries[country] = CountryAggregate()
+        self.records += 1
+        closed = agg.add(start, hours, year, actual)
+        if closed:
+            self._combine(*closed)
+
+    def _combine(self, hour, mean):
+        entry = self.pending.setdefault(hour, [0.0, 0])
+        entry[0] += mean
+        entry[1] += 1
+        if entry[1] == len(self.countries):
+            self.total.update(entry[0], hour)
+            del self.pending[hour]
+        # hours every country has moved past can no longer complete; drop them (oldest first)
+        horizon = min(a.closed_through for a in self.countries.values())
+        while self.pending:
+            oldest = next(iter(self.pending))
+            if oldest >= horizon:
+                break
+            del self.pending[oldest]
+            self.incomplete += 1
+
+    def flush(self):
+        """End of stream: close every open hour"""
+        for agg in self.countries.values():
+            closed = agg.close()
+            if closed:
+                self._combine(*closed)
+
+    def snapshot(self):
+        label = lambda tracker: None if tracker is None else {
+            'mw': tracker[0],
+            'hour': datetime.datetime.fromordinal(tracker[1] // 24).replace(hour=tracker[1] % 24).isoformat()}
+        elapsed = time.perf_counter() - self.started
+        return {
+            'records': self.records,
+            'records_per_s': self.records / elapsed if elapsed > 0 else None,
+            'malformed': self.malformed,
+            'countries': {c: {'records': a.records, 'missing': a.missing, 'late': a.late,
+                              'energy_twh': {str(y): e / 1e6 for y, e in sorted(a.energy_mwh.items())},
+                              'peak_hour': label(a.hourly.peak), 'trough_hour': label(a.hourly.trough)}
+                          for c, a in self.countries.items()},
+            'total': {'energy_twh': sum(e for a in self.countries.values() for e in a.energy_mwh.values()) / 1e6,
+                      'peak_hour': label(self.total.peak), 'trough_hour': label(self.total.trough),
+                      'incomplete_hours': self.incomplete + len(self.pending)},
+        }
+
+
+def write_snapshot(snapshot, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp, path)
+
+
+async def snapshots(aggregator, path, every):
+    while True:
+        await asyncio.sleep(every)
+        await asyncio.to_thread(write_snapshot, aggregator.snapshot(), path)
+
+
+# === Sources ===
+async def consume_file(aggregator, path, follow=False, poll_s=0.2):
+    """Read a feed file; with follow, keep waiting for appended lines like `tail -f`"""
+    with open(path) as f:
+        partial = ''
+        while True:
+            chunk = f.read(1 << 20)
+            if chunk:
+                lines = (partial + chunk).split('\n')
+                partial = lines.pop()
+                for line in lines:
+                    aggregator.add_line(line)
+                await asyncio.sleep(0)              # let snapshots run between chunks
+            elif follow:
+                await asyncio.sleep(poll_s)
+            else:
+                break
+        if partial:
+            aggregator.add_line(partial)
+
+
+async def serve(aggregator, port, idle_exit_s=None):
+    """Consume every connection on 127.0.0.1:port; optionally stop once all producers left and `idle_exit_s` passed"""
+    connections = {'open': 0, 'seen': 0}
+    done = asyncio.Event()
+
+    async def handle(reader, writer):
+        connections['open'] += 1
+        connections['seen'] += 1
+        try:
+            async for line in reader:
+                aggregator.add_line(line.decode())
+        finally:
+            connections['open'] -= 1
+            writer.close()
+            if idle_exit_s is not None and connections['open'] == 0:
+                await asyncio.sleep(idle_exit_s)
+                if connections['open'] == 0:
+                    done.set()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', port, limit=1 << 16)
+    print(f"📡 Listening on 127.0.0.1:{port}")
+    async with server:
+        if idle_exit_s is None:
+            await server.serve_forever()
+        else:
+            await done.wait()
+
+
+def feed_lines(files=FILES):
+    """DE and UK export rows as feed lines, merged by interval start"""
+    def rows(country, path):
+        with open(path) as f:
+            next(f)                                 # header
+            for row in f:
+                row = row.rstrip('\r\n')
+                yield _minutes(row[1:17]), f"{country},{row}\n"
+    return (line for _, line in heapq.merge(*(rows(c, p) for c, p in files.items()), key=lambda r: r[0]))
+
+
+async def replay(port, repeat=1, batch=1000):
+    """Producer: send the merged exports `repeat` times to the consumer socket"""
+    lines = list(feed_lines())
+    _, writer = await asyncio.open_connection('127.0.0.1', port)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(lines), batch):
+            writer.write(''.join(lines[i:i + batch]).encode())
+            await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+    n = len(lines) * repeat
+    print(f"📤 Sent {n:,} records in {time.perf_counter() - start:.2f} s")
+
+
+async def run_consumer(args, consume):
+    aggregator = StreamAggregator(args.countries)
+    ticker = asyncio.create_task(snapshots(aggregator, args.snapshot, args.every))
+    try:
+        await consume(aggregator)
+    finally:
+        ticker.cancel()
+        aggregator.flush()
+        snapshot = aggregator.snapshot()
+        write_snapshot(snapshot, args.snapshot)
+    elapsed = time.perf_counter() - aggregator.started
+    print(f"\n✅ {aggregator.records:,} records in {elapsed:.2f} s ({aggregator.records / elapsed:,.0f}/s), "
+          f"snapshot saved to '{args.snapshot}'")
+    if snapshot['malformed']:
+        print(f"⚠️ {snapshot['malformed']:,} malformed lines skipped")
+    for country, summary in snapshot['countries'].items():
+        energy = ', '.join(f"{y}: {e:.2f} TWh" for y, e in summary['energy_twh'].items())
+        print(f"🔹 {country}: {energy} | missing {summary['missing']} | late {summary['late']}")
+    total = snapshot['total']
+    if total['peak_hour']:
+        print(f"📈 Highest hourly total demand: {total['peak_hour']['mw']:.0f} MW at {total['peak_hour']['hour']}")
+        print(f"📉 Lowest hourly total demand: {total['trough_hour']['mw']:.0f} MW at {total['trough_hour']['hour']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming load ingestion with incremental aggregates")
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('serve', 'file'):
+        p = sub.add_parser(name)
+        if name == 'file':
+            p.add_argument('path')
+            p.add_argument('--follow', action='store_true', help="keep reading appended lines (Ctrl-C to stop)")
+        else:
+            p.add_argument('--port', type=int, default=9009)
+            p.add_argument('--idle-exit', type=float, help="stop this many seconds after the last producer left")
+        p.add_argument('--countries', nargs='+', default=list(FILES),
+                       help="countries that must report before an hour counts in the total")
+        p.add_argument('--snapshot', default=SNAPSHOT_FILE)
+        p.add_argument('--every', type=float, default=SNAPSHOT_EVERY_S, help="snapshot interval (s)")
+    p = sub.add_parser('replay')
+    p.add_argument('--port', type=int, default=9009)
+    p.add_argument('--repeat', type=int, default=1)
+    p = sub.add_parser('export', help="write the merged DE/UK feed to a file (for `file` mode)")
+    p.add_argument('path')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'serve':
+            asyncio.run(run_consumer(args, lambda agg: serve(agg, args.port, args.idle_exit)))
+        elif args.command == 'file':
+            asyncio.run(run_consumer(args, lambda agg: consume_file(agg, args.path, args.follow)))
+        elif args.command == 'replay':
+            asyncio.run(replay(args.port, args.repeat))
+        else:
+            with open(args.path, 'w') as f:
+                f.writelines(feed_lines())
+            print(f"✅ Feed written to '{args.path}'")
+    except KeyboardInterrupt:
+        pass
@@ -1,99 +1,478 @@
+import os
+import sys
+import time
+import argparse
 import pulp
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tek5410.cache import ResultCache, code_version
+from tek5410.sharedarrays import attach_frame, is_shared_ref
+from tek5410.resolution import (RESOLUTIONS, aggregate, hour_weights, compare_resolutions, print_report,
+                                 subhourly, entsoe_load)
+from tek5410.conditioning import (POWER_UNIT, coefficient_ranges, print_ranges, tighten, active_bounds,
+                                   solve_with_stats)
+from tek5410.reduction import reduce_model
+from tek5410.dispatch import simulate
 
 #-------------------  INPUT DATA -------------------
-raw_data = pd.read_csv('baseline_data.csv', header=0)
-hours = range(len(raw_data))
 technologies = ['wind', 'solar', 'gas', 'batt']
 storage_tech = ['batt']
 
-demand = {h: raw_data.loc[h, 'demand']*1.2 for h in hours}  # +20% demand
-cf = {('wind',h): raw_data.loc[h,'cf_wind'] for h in hours}
-cf.update({('solar',h): raw_data.loc[h,'cf_solar'] for h in hours})
-cf.update({('gas',h): raw_data.loc[h,'cf_gas'] for h in hours})
-cf.update({('batt',h): 1.0 for h in hours})
-
-a = {'wind': 67.653, 'solar': 48.140, 'gas': 52.041, 'batt': 80 + 320/4}
-vom = {'wind': 2.3, 'solar': 0.01, 'gas': 4.0, 'batt': 0.0}
-fuel = {'wind': 0.0, 'solar': 0.0, 'gas': 21.6, 'batt': 0.0}
-co2 = {'wind': 0.0, 'solar': 0.0, 'gas': 0.202, 'batt': 0.0}
-eta_stor = {'batt': 0.9}
-dur_stor = {'batt': 4}
-
-#-------------------  VARIABLES -------------------
-prob = pulp.LpProblem("HighRES", pulp.LpMinimize)
-CAP = {t: pulp.LpVariable(f"CAP_{t}", lowBound=0) for t in technologies}
-GEN = {(t,h): pulp.LpVariable(f"GEN_{t}_{h}", lowBound=0) for t in technologies for h in hours}
-CHARGE = {(t,h): pulp.LpVariable(f"CHARGE_{t}_{h}", lowBound=0) for t in storage_tech for h in hours}
-STO = {(t,h): pulp.LpVariable(f"STO_{t}_{h}", lowBound=0) for t in storage_tech for h in hours}
-STO0 = {t: pulp.LpVariable(f"STO0_{t}", lowBound=0) for t in storage_tech}
-
-#-------------------  OBJECTIVE -------------------
-prob += (
-    pulp.lpSum([a[t]*CAP[t] for t in technologies]) +
-    pulp.lpSum([(vom[t]+fuel[t])*GEN[(t,h)] for t in technologies for h in hours]) +
-    pulp.lpSum([vom[t]*CHARGE[(t,h)] for t in storage_tech for h in hours])
-), "TotalCost"
-
-#-------------------  CONSTRAINTS -------------------
-for h in hours:
-    prob += (pulp.lpSum([GEN[(t,h)] for t in technologies]) +
-             pulp.lpSum([CHARGE[(t,h)] for t in storage_tech]) == demand[h], f"Balance_{h}")
-
-for t in ['wind','solar','gas']:
-    for h in hours:
-        prob += GEN[(t,h)] <= CAP[t]*cf[(t,h)], f"CapLim_{t}_{h}"
+PARAMS = {
+    'demand_scale': 1.2,  # +20% demand
+    'a': {'wind': 67.653, 'solar': 48.140, 'gas': 52.041, 'batt': 80},   # batt: power (MW)
+    'a_energy': {'batt': (320/4) / 4},   # per MWh: the 320/4 per MW energy share of a 4 h battery
+    'vom': {'wind': 2.3, 'solar': 0.01, 'gas': 4.0, 'batt': 0.0},
+    'fuel': {'wind': 0.0, 'solar': 0.0, 'gas': 21.6, 'batt': 0.0},
+    'co2': {'wind': 0.0, 'solar': 0.0, 'gas': 0.202, 'batt': 0.0},
+    'eta': {'batt': 0.9},
+    # optional 'dur': {'batt': 4} fixes energy = dur * power (the former 80 + 320/4 per MW model)
+}
+
+CASES = ['no_batt', 'with_batt']
+ENTSOE_DE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assignment3',
+                         'Total_Load_Day_Ahead_Actual_2024_Germany.csv')
+
+
+def load_data(path='baseline_data.csv'):
+    """CSV path, or a 'shm:'/'npy:' reference to arrays shared by a coordinator process"""
+    if is_shared_ref(path):
+        return attach_frame(path)
+    return pd.read_csv(path, header=0)
+
+
+#-------------------  MODEL -------------------
+def build_model(raw_data, params=PARAMS, condition=False):
+    """
+    Hourly data, or blocks from tek5410.resolution.aggregate (the `weight` column = hours per step).
+    condition=True builds in GW / k€ with data-derived bounds (see tek5410.conditioning).
+    """
+    hours = range(len(raw_data))
+    unit = POWER_UNIT if condition else 1.0
+    w = dict(zip(hours, hour_weights(raw_data).tolist()))
+    a, vom, fuel = params['a'], params['vom'], params['fuel']
+    eta_stor, dur_stor = params['eta'], params.get('dur', {})
+    a_energy = params['a_energy']
 
-for t in storage_tech:
+    demand = {h: raw_data.loc[h, 'demand']*params['demand_scale']/unit for h in hours}
+    cf = {('wind',h): raw_data.loc[h,'cf_wind'] for h in hours}
+    cf.update({('solar',h): raw_data.loc[h,'cf_solar'] for h in hours})
+    cf.update({('gas',h): raw_data.loc[h,'cf_gas'] for h in hours})
+    cf.update({('batt',h): 1.0 for h in hours})
+
+    #-------------------  VARIABLES -------------------
+    prob = pulp.LpProblem("HighRES", pulp.LpMinimize)
+    CAP = {t: pulp.LpVariable(f"CAP_{t}", lowBound=0) for t in technologies}
+    CAPE = {t: pulp.LpVariable(f"CAPE_{t}", lowBound=0) for t in storage_tech}   # storage energy (MWh)
+    GEN = {(t,h): pulp.LpVariable(f"GEN_{t}_{h}", lowBound=0) for t in technologies for h in hours}
+    CHARGE = {(t,h): pulp.LpVariable(f"CHARGE_{t}_{h}", lowBound=0) for t in storage_tech for h in hours}
+    STO = {(t,h): pulp.LpVariable(f"STO_{t}_{h}", lowBound=0) for t in storage_tech for h in hours}
+    STO0 = {t: pulp.LpVariable(f"STO0_{t}", lowBound=0) for t in storage_tech}
+
+    #-------------------  OBJECTIVE -------------------
+    prob += (
+        pulp.lpSum([a[t]*CAP[t] for t in technologies]) +
+        pulp.lpSum([a_energy[t]*CAPE[t] for t in storage_tech]) +
+        pulp.lpSum([(vom[t]+fuel[t])*w[h]*GEN[(t,h)] for t in technologies for h in hours]) +
+        pulp.lpSum([vom[t]*w[h]*CHARGE[(t,h)] for t in storage_tech for h in hours])
+    ), "TotalCost"
+
+    #-------------------  CONSTRAINTS -------------------
     for h in hours:
-        if h == 0:
-            prob += STO[(t,h)] == eta_stor[t]*CHARGE[(t,h)] - GEN[(t,h)], f"StorBal_{t}_{h}"
-        else:
-            prob += STO[(t,h)] == STO[(t,h-1)] + eta_stor[t]*CHARGE[(t,h)] - GEN[(t,h)], f"StorBal_{t}_{h}"
-        prob += STO[(t,h)] <= dur_stor[t]*CAP[t], f"StorSoc_{t}_{h}"
-        prob += GEN[(t,h)] + CHARGE[(t,h)] <= CAP[t], f"StorPower_{t}_{h}"
-
-for t in storage_tech:
-    prob += STO0[t] == 0, f"InitSOC_{t}"
-
-#-------------------  CASE 1: WITHOUT BATTERY -------------------
-CAP['batt'].upBound = 0
-prob.solve()
-
-res_no_batt = {
-    'CAP': {t: CAP[t].varValue for t in ['wind','solar','gas']},
-    'COST': pulp.value(prob.objective),
-    'EMIS': sum(co2['gas']*GEN[('gas',h)].varValue for h in hours)
-}
+        prob += (pulp.lpSum([GEN[(t,h)] for t in technologies]) -
+                 pulp.lpSum([CHARGE[(t,h)] for t in storage_tech]) == demand[h], f"Balance_{h}")
 
-#-------------------  CASE 2: WITH BATTERY -------------------
-CAP['batt'].upBound = None
-prob.solve()
+    for t in ['wind','solar','gas']:
+        for h in hours:
+            prob += GEN[(t,h)] <= CAP[t]*cf[(t,h)], f"CapLim_{t}_{h}"
+
+    for t in storage_tech:
+        for h in hours:
+            if h == 0:
+                prob += STO[(t,h)] == w[h]*(eta_stor[t]*CHARGE[(t,h)] - GEN[(t,h)]), f"StorBal_{t}_{h}"
+            else:
+                prob += STO[(t,h)] == STO[(t,h-1)] + w[h]*(eta_stor[t]*CHARGE[(t,h)] - GEN[(t,h)]), f"StorBal_{t}_{h}"
+            prob += STO[(t,h)] <= CAPE[t], f"StorSoc_{t}_{h}"
+            prob += GEN[(t,h)] + CHARGE[(t,h)] <= CAP[t], f"StorPower_{t}_{h}"
+
+    for t in storage_tech:
+        prob += STO0[t] == 0, f"InitSOC_{t}"
+        if t in dur_stor:
+            prob += CAPE[t] == dur_stor[t]*CAP[t], f"StorDur_{t}"
+
+    #-------------------  BOUNDS FROM DATA -------------------
+    # Generation may exceed the hour's demand while charging, so only gas capacity is bounded:
+    # above peak demand, gas could serve every hour directly instead of through the battery
+    tightened = []
+    if condition:
+        tighten(CAP['gas'], upper=max(demand.values()), record=tightened)
+
+    return prob, {'CAP': CAP, 'CAPE': CAPE, 'GEN': GEN, 'CHARGE': CHARGE, 'STO': STO, 'STO0': STO0, 'hours': hours, 'w': w,
+                  'unit': unit, 'tightened': tightened}
+
+
+def solve_case(prob, var, case, params=PARAMS, solve_fn=None):
+    """Solve one case on a built model: 'no_batt' fixes the battery capacity to zero"""
+    CAP, GEN, hours, w, co2 = var['CAP'], var['GEN'], var['hours'], var['w'], params['co2']
+    unit = var['unit']   # MW and € per model unit (GW / k€ in a conditioned build)
+
+    CAP['batt'].upBound = var['CAPE']['batt'].upBound = 0 if case == 'no_batt' else None
+    (solve_fn or pulp.LpProblem.solve)(prob)
+
+    if case == 'no_batt':
+        return {
+            'CAP': {t: CAP[t].varValue*unit for t in ['wind','solar','gas']},
+            'COST': pulp.value(prob.objective)*unit,
+            'EMIS': sum(co2['gas']*w[h]*GEN[('gas',h)].varValue for h in hours)*unit
+        }
+    caps = {t: CAP[t].varValue*unit for t in technologies}
+    caps['batt_energy'] = var['CAPE']['batt'].varValue*unit          # MWh
+    return {
+        'CAP': caps,
+        'Duration_batt': caps['batt_energy'] / caps['batt'] if caps['batt'] > 0 else 0.0,
+        'COST': pulp.value(prob.objective)*unit,
+        'EMIS': sum(co2['gas']*w[h]*GEN[('gas',h)].varValue for h in hours)*unit,
+        'Energy_batt': sum(w[h]*GEN[('batt',h)].varValue for h in hours)*unit
+    }
+
+
+#-------------------  SPARSE MATRIX FORM -------------------
+def build_matrix(raw_data, params=PARAMS):
+    """
+    The LP of build_model as scipy.sparse arrays, built with vectorised COO triplets
+    instead of one PuLP expression per row. Same variables, rows and balance convention,
+    in GW (demand / POWER_UNIT) so the coefficients stay O(1); for long time bases
+    (15-minute steps, ~35k per year) where the PuLP build dominates time and memory.
+    Column blocks of H steps: GEN per technology, CHARGE, STO; then CAP and CAPE.
+    """
+    H = len(raw_data)
+    w = hour_weights(raw_data)
+    demand = raw_data['demand'].to_numpy(float) * params['demand_scale'] / POWER_UNIT
+    cf = {t: raw_data[f'cf_{t}'].to_numpy(float) for t in ['wind', 'solar', 'gas']}
+    eta, dur = params['eta']['batt'], params.get('dur', {}).get('batt')
+
+    blocks = [f'gen_{t}' for t in technologies] + ['charge', 'sto']
+    col = {name: np.arange(k * H, (k + 1) * H) for k, name in enumerate(blocks)}
+    n_ops = len(blocks) * H
+    cap = {t: n_ops + k for k, t in enumerate(technologies)}
+    cape = n_ops + len(technologies)
+    n = cape + 1
+    steps = np.arange(H)
+
+    c = np.zeros(n)
+    for t in technologies:
+        c[col[f'gen_{t}']] = (params['vom'][t] + params['fuel'][t]) * w
+        c[cap[t]] = params['a'][t]
+    c[col['charge']] = params['vom']['batt'] * w
+    c[cape] = params['a_energy']['batt']
+
+    def coo(rows, cols, vals, m):
+        return sp.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(m, n))
+
+    # Balance (GEN - CHARGE = demand) and storage balance (STO_-1 = 0)
+    supply = [col[f'gen_{t}'] for t in technologies] + [col['charge']]
+    rows = [steps] * len(supply) + [H + steps, H + steps[1:], H + steps, H + steps]
+    cols = supply + [col['sto'], col['sto'][:-1], col['charge'], col['gen_batt']]
+    vals = ([np.ones(H)] * len(technologies) + [-np.ones(H)]
+            + [np.ones(H), -np.ones(H - 1), -eta * w, w])
+    m_eq, b_eq = 2 * H, [demand, np.zeros(H)]
+    if dur is not None:
+        rows.append([m_eq, m_eq])
+        cols.append([cape, cap['batt']])
+        vals.append([1.0, -dur])
+        m_eq += 1
+        b_eq.append([0.0])
+    A_eq = coo(rows, cols, vals, m_eq)
+
+    # CapLim (GEN <= cf * CAP), StorSoc (STO <= CAPE), StorPower (GEN + CHARGE <= CAP)
+    rows, cols, vals = [], [], []
+    for k, t in enumerate(['wind', 'solar', 'gas']):
+        rows += [k * H + steps] * 2
+        cols += [col[f'gen_{t}'], np.full(H, cap[t])]
+        vals += [np.ones(H), -cf[t]]
+    rows += [3 * H + steps] * 2 + [4 * H + steps] * 3
+    cols += [col['sto'], np.full(H, cape), col['gen_batt'], col['charge'], np.full(H, cap['batt'])]
+    vals += [np.ones(H), -np.ones(H), np.ones(H), np.ones(H), -np.ones(H)]
+    A_ub = coo(rows, cols, vals, 5 * H)
+
+    return {'c': c, 'A_ub': A_ub, 'b_ub': np.zeros(5 * H), 'A_eq': A_eq, 'b_eq': np.concatenate(b_eq),
+            'col': col, 'cap': cap, 'cape': cape, 'w': w}
+
+
+def solve_matrix(lp, case, params=PARAMS):
+    """HiGHS solve of a build_matrix LP; same result dict as solve_case"""
+    n = len(lp['c'])
+    bounds = np.column_stack([np.zeros(n), np.full(n, np.inf)])
+    if case == 'no_batt':
+        bounds[[lp['cap']['batt'], lp['cape']], 1] = 0
+    res = linprog(lp['c'], A_ub=lp['A_ub'], b_ub=lp['b_ub'], A_eq=lp['A_eq'], b_eq=lp['b_eq'],
+                  bounds=bounds, method='highs')
+    if res.status != 0:
+        raise RuntimeError(f"Assignment 4 LP ({case}) failed: {res.message}")
+    x, w, col, unit = res.x, lp['w'], lp['col'], POWER_UNIT
+    techs = ['wind', 'solar', 'gas'] if case == 'no_batt' else technologies
+    out = {
+        'CAP': {t: float(x[lp['cap'][t]]) * unit for t in techs},
+        'COST': float(res.fun) * unit,
+        'EMIS': params['co2']['gas'] * float(w @ x[col['gen_gas']]) * unit,
+    }
+    if case == 'with_batt':
+        out['CAP']['batt_energy'] = float(x[lp['cape']]) * unit
+        out['Duration_batt'] = out['CAP']['batt_energy'] / out['CAP']['batt'] if out['CAP']['batt'] > 0 else 0.0
+        out['Energy_batt'] = float(w @ x[col['gen_batt']]) * unit
+    return out
+
+
+def entsoe_data(raw_data, path=ENTSOE_DE, steps_per_hour=4):
+    """
+    Sub-hourly time base: capacity factors interpolated from the hourly data, demand
+    straight from the ENTSO-E series (MW). The load year must match the data length.
+    """
+    load = entsoe_load(path)
+    if len(load) != len(raw_data) * steps_per_hour:
+        raise ValueError(f"{path}: {len(load)} steps, expected {len(raw_data) * steps_per_hour} "
+                         f"({len(raw_data)} h x {steps_per_hour})")
+    data = subhourly(raw_data, steps_per_hour)
+    data['demand'] = load.to_numpy()
+    return data
+
+
+def run(raw_data, params=PARAMS, cases=CASES, cache=None, condition=False, reduce=False, sparse=False):
+    """
+    Solve the requested cases. With a ResultCache, each case is keyed on the input
+    data, the parameters and the code version; the model is only built if a case misses,
+    and only optimal solves are stored.
+    sparse=True builds the matrix form (build_matrix) and solves it with HiGHS.
+    """
+    cache = cache or ResultCache(enabled=False)
+    version = code_version(__file__, aggregate, tighten, reduce_model)
+    keys = {case: cache.key('assignment4', data=raw_data, params=params, code=version, case=case,
+                            condition=condition, reduce=reduce, sparse=sparse)
+            for case in cases}
+
+    results, model, solve_fn = {}, None, None
+    for case in cases:
+        results[case] = cache.get(keys[case])
+        if results[case] is None:
+            if model is None:
+                model = build_matrix(raw_data, params) if sparse else build_model(raw_data, params, condition)
+                if reduce and not sparse:
+                    solve_fn = reduce_model(*model, strip=True).solve
+            if sparse:
+                results[case] = solve_matrix(model, case, params)   # raises unless optimal
+            else:
+                results[case] = solve_case(*model, case, params, solve_fn=solve_fn)
+                if model[0].status != pulp.LpStatusOptimal:
+                    continue                                          # never cache a failed solve
+            cache.put(keys[case], results[case])
+    return results
 
-res_with_batt = {
-    'CAP': {t: CAP[t].varValue for t in technologies},
-    'COST': pulp.value(prob.objective),
-    'EMIS': sum(co2['gas']*GEN[('gas',h)].varValue for h in hours),
-    'Energy_batt': sum(GEN[('batt',h)].varValue for h in hours)
-}
 
 #-------------------  EXPORT RESULTS TO CSV -------------------
-# Case 1: without battery
-df_no_batt = pd.DataFrame.from_dict({
-    'Technology': list(res_no_batt['CAP'].keys()) + ['COST','EMIS'],
-    'Value': list(res_no_batt['CAP'].values()) + [res_no_batt['COST'], res_no_batt['EMIS']]
-})
-df_no_batt.to_csv('res_no_batt.csv', index=False)
-
-# Case 2: with battery
-df_with_batt = pd.DataFrame.from_dict({
-    'Technology': list(res_with_batt['CAP'].keys()) + ['COST','EMIS','Energy_batt'],
-    'Value': list(res_with_batt['CAP'].values()) + [res_with_batt['COST'], res_with_batt['EMIS'], res_with_batt['Energy_batt']]
-})
-df_with_batt.to_csv('res_with_batt.csv', index=False)
-
-#-------------------  DISPLAY RESULTS -------------------
-print("=== CASE 1: WITHOUT BATTERY ===")
-print(res_no_batt)
-print("\n=== CASE 2: WITH BATTERY ===")
-print(res_with_batt)
+def export_results(res_no_batt, res_with_batt):
+    # Case 1: without battery
+    df_no_batt = pd.DataFrame.from_dict({
+        'Technology': list(res_no_batt['CAP'].keys()) + ['COST','EMIS'],
+        'Value': list(res_no_batt['CAP'].values()) + [res_no_batt['COST'], res_no_batt['EMIS']]
+    })
+    df_no_batt.to_csv('res_no_batt.csv', index=False)
+
+    # Case 2: with battery
+    df_with_batt = pd.DataFrame.from_dict({
+        'Technology': list(res_with_batt['CAP'].keys()) + ['COST','EMIS','Energy_batt','Duration_batt'],
+        'Value': list(res_with_batt['CAP'].values()) + [res_with_batt['COST'], res_with_batt['EMIS'], res_with_batt['Energy_batt'],
+                                                        res_with_batt['Duration_batt']]
+    })
+    df_with_batt.to_csv('res_with_batt.csv', index=False)
+
+
+def resolution_metrics(res):
+    """Cost, emissions and capacities of both cases (for compare_resolutions)"""
+    out = {}
+    for case, r in res.items():
+        out[f'cost_{case}'] = r['COST']
+        out[f'emis_{case}'] = r['EMIS']
+        out.update({f'cap_{t}_{case}': v for t, v in r['CAP'].items()})
+    return out
+
+
+def benchmark_conditioning(raw_data, params=PARAMS, case='with_batt'):
+    """Coefficient ranges, CBC iterations and solve time of the MW/€ vs the conditioned GW/k€ build"""
+    ranges, rows = {}, []
+    for condition in (False, True):
+        label = 'GW/k€' if condition else 'MW/€'
+        prob, var = build_model(raw_data, params, condition)
+        ranges[label] = coefficient_ranges(prob)
+        stats = {}
+        res = solve_case(prob, var, case, params, solve_fn=lambda p: stats.update(solve_with_stats(p)))
+        rows.append({'build': label, **stats, 'cost': res['COST'],
+                     **{f'cap_{t}': v for t, v in res['CAP'].items()}})
+        active = active_bounds(var['tightened'])
+        if active:
+            print(f"⚠️  {len(active)} tightened bound(s) active, e.g. {active[:3]}")
+
+    print(f"\n=== Assignment 4 ({case}): coefficient ranges ===")
+    print_ranges(ranges)
+    table = pd.DataFrame(rows)
+    print(f"\n=== Assignment 4 ({case}): solve ===")
+    print(table.to_string(index=False))
+    return table
+
+
+def benchmark_reduction(raw_data, params=PARAMS, case='with_batt'):
+    """Reduction report, plus model size and solve time with and without stripping"""
+    rows = []
+    for strip in (False, True):
+        prob, var = build_model(raw_data, params)
+        red = reduce_model(prob, var, strip=strip)
+        if strip:
+            red.print_report("Assignment 4: model reduction")
+        stats = {}
+        res = solve_case(prob, var, case, params,
+                         solve_fn=lambda p: red.solve(p, lambda q: stats.update(solve_with_stats(q))))
+        rows.append({'model': 'reduced' if strip else 'original', 'columns': len(prob.variables()),
+                     'rows': len(prob.constraints), **stats, 'cost': res['COST']})
+    table = pd.DataFrame(rows)
+    print(f"\n=== Assignment 4 ({case}): solve ===")
+    print(table.to_string(index=False))
+    return table
+
+
+def benchmark_quarter_hour(raw_data, params=PARAMS, path=ENTSOE_DE):
+    """
+    ENTSO-E 15-minute time base vs the same data averaged to hours (identical energy per
+    hour, so only the intra-hour shape differs): build/solve time, size, cost and capacities.
+    """
+    quarters = entsoe_data(raw_data, path)
+    rows = {}
+    for label, data in (('hourly', aggregate(quarters, 1)), ('15min', quarters)):
+        start = time.perf_counter()
+        lp = build_matrix(data, params)
+        build_s = time.perf_counter() - start
+        size = {'steps': len(data), 'columns': len(lp['c']), 'rows': lp['A_ub'].shape[0] + lp['A_eq'].shape[0],
+                'nnz': lp['A_ub'].nnz + lp['A_eq'].nnz,
+                'matrix_mb': sum(A.data.nbytes + A.indices.nbytes + A.indptr.nbytes
+                                 for A in (lp['A_ub'], lp['A_eq'])) / 1e6}
+        for case in CASES:
+            start = time.perf_counter()
+            res = solve_matrix(lp, case, params)
+            rows[(label, case)] = {**size, 'build_s': build_s, 'solve_s': time.perf_counter() - start,
+                                   'cost': res['COST'], 'emis': res['EMIS'],
+                                   **{f'cap_{t}': v for t, v in res['CAP'].items()}}
+        print(f"  {label}: {len(data)} steps, {size['nnz']:,} nnz, built in {build_s:.1f} s")
+
+    table = pd.DataFrame(rows)
+    for case in CASES:
+        ref = table[('hourly', case)]
+        table[('diff_pct', case)] = (table[('15min', case)] - ref) / ref.abs().where(ref.abs() > 1e-9) * 100
+    table = table[[(k, case) for case in CASES for k in ('hourly', '15min', 'diff_pct')]]
+    print("\n=== Assignment 4: ENTSO-E 15-minute vs hourly time base ===")
+    with pd.option_context('display.width', 200, 'display.float_format', '{:,.2f}'.format):
+        print(table.to_string())
+    return table
+
+
+def simulate_capacities(raw_data, caps, params=PARAMS):
+    """
+    Merit-order dispatch (tek5410.dispatch) of given capacities {tech: MW or array of MW}.
+    The battery charges from surplus VRE and discharges into demand; unlike build_model it
+    has no foresight.
+    """
+    demand = raw_data['demand'].to_numpy(float) * params['demand_scale']
+    cf = {t: raw_data[f'cf_{t}'].to_numpy(float) for t in ['wind', 'solar', 'gas']}
+    return simulate(demand, cf, caps, params, weights=hour_weights(raw_data), co2=params['co2']['gas'])
+
+
+def benchmark_dispatch(raw_data, params=PARAMS, n_mixes=1000, seed=0):
+    """Simulated vs LP cost for the no_batt optimum, and time per mix for a batch of random mixes"""
+    lp = run(raw_data, params, cases=['no_batt'])['no_batt']
+    caps = {**lp['CAP'], 'batt': 0.0, 'batt_energy': 0.0}
+    start = time.perf_counter()
+    sim = simulate_capacities(raw_data, caps, params)
+    single = time.perf_counter() - start
+    print(f"LP no_batt cost {lp['COST']:,.0f} | simulated {sim['cost'][0]:,.0f} "
+          f"(unserved {sim['unserved'][0]:,.1f} MWh, emissions {sim['emissions'][0]:,.0f} vs {lp['EMIS']:,.0f} t) "
+          f"| {single * 1e3:.0f} ms")
+
+    rng = np.random.default_rng(seed)
+    batch = {t: caps[t] * rng.uniform(0.5, 1.5, n_mixes) for t in ['wind', 'solar', 'gas']}
+    batch['batt'] = rng.uniform(0, 0.2, n_mixes) * lp['CAP']['gas']
+    batch['batt_energy'] = batch['batt'] * rng.uniform(1, 8, n_mixes)
+    start = time.perf_counter()
+    out = simulate_capacities(raw_data, batch, params)
+    elapsed = time.perf_counter() - start
+    print(f"{n_mixes} mixes in {elapsed:.2f} s ({elapsed / n_mixes * 1e3:.2f} ms per simulated year); "
+          f"cheapest {out['cost'].min():,.0f}, {np.mean(out['unserved'] > 0) * 100:.0f}% with unserved energy")
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assignment 4: single-node capacity expansion")
+    parser.add_argument('--data', default='baseline_data.csv')
+    parser.add_argument('--no-cache', action='store_true', help="always re-solve (skip the result cache)")
+    parser.add_argument('--resolution', type=int, default=1, help="hours per time step (1, 2, 3, 6, ...)")
+    parser.add_argument('--compare-resolutions', type=int, nargs='*', metavar='H',
+                        help=f"solve at several resolutions and report speedup and deviation (default {list(RESOLUTIONS)})")
+    parser.add_argument('--condition', action='store_true', help="build in GW / k€ with data-derived bounds")
+    parser.add_argument('--benchmark-conditioning', action='store_true',
+                        help="report coefficient ranges, iterations and solve time with and without conditioning")
+    parser.add_argument('--reduce', action='store_true',
+                        help="strip dangling variables and singleton/duplicate rows before the solve")
+    parser.add_argument('--benchmark-reduction', action='store_true',
+                        help="report what the reduction pass finds, and size and solve time before/after")
+    parser.add_argument('--sparse', action='store_true',
+                        help="build the LP as sparse matrices and solve with HiGHS (same model)")
+    parser.add_argument('--quarter-hour', action='store_true',
+                        help="15-minute time base: ENTSO-E German load, interpolated capacity factors (sparse)")
+    parser.add_argument('--benchmark-quarter-hour', action='store_true',
+                        help="report cost and capacity differences of the 15-minute vs the hourly time base")
+    parser.add_argument('--entsoe', default=ENTSOE_DE, help="ENTSO-E load export for the 15-minute time base")
+    parser.add_argument('--simulate', type=int, nargs='?', const=1000, metavar='N',
+                        help="merit-order dispatch of the LP capacities and of N random mixes (default 1000)")
+    args = parser.parse_args()
+
+    raw_data = load_data(args.data)
+    if args.benchmark_conditioning:
+        benchmark_conditioning(raw_data, PARAMS)
+        sys.exit(0)
+    if args.benchmark_reduction:
+        benchmark_reduction(raw_data, PARAMS)
+        sys.exit(0)
+    if args.simulate:
+        benchmark_dispatch(raw_data, PARAMS, args.simulate)
+        sys.exit(0)
+    if args.benchmark_quarter_hour:
+        benchmark_quarter_hour(raw_data, PARAMS, args.entsoe)
+        sys.exit(0)
+    if args.compare_resolutions is not None:
+        table = compare_resolutions(lambda data: run(data, PARAMS, condition=args.condition), raw_data,
+                                    args.compare_resolutions or RESOLUTIONS, resolution_metrics)
+        print_report(table, "Assignment 4")
+        table.to_csv('resolution_comparison.csv', index=False)
+        sys.exit(0)
+
+    if args.quarter_hour:
+        raw_data = entsoe_data(raw_data, args.entsoe)
+        print(f"Temporal resolution: 15 min, ENTSO-E load ({len(raw_data)} steps)")
+    if args.resolution > 1:
+        raw_data = aggregate(raw_data, args.resolution)
+        print(f"Temporal resolution: {args.resolution}h ({len(raw_data)} steps)")
+    cache = ResultCache(enabled=not args.no_cache)
+    res = run(raw_data, PARAMS, cache=cache, condition=args.condition, reduce=args.reduce,
+              sparse=args.sparse or args.quarter_hour)
+    res_no_batt, res_with_batt = res['no_batt'], res['with_batt']
+    if cache.hits:
+        print(f"Result cache: {cache.hits} case(s) loaded from cache")
+
+    export_results(res_no_batt, res_with_batt)
+
+    #-------------------  DISPLAY RESULTS -------------------
+    print("=== CASE 1: WITHOUT BATTERY ===")
+    print(res_no_batt)
+    print("\n=== CASE 2: WITH BATTERY ===")
+    print(res_with_batt)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Screening-curve / load-duration-curve estimator for assignment4.
+
+Without storage the hourly dispatch of assignment4 is a merit order: the VRE
+technology with the lower marginal cost (vom + fuel) serves demand first,
+the other one next, and gas covers the residual load. Gas capacity is the peak
+of the residual load duration curve. For given wind and solar capacities the
+system cost is therefore a closed-form function of the hourly data, and the
+cost-optimal mix is found with a vectorised grid search that zooms in on the
+best point. This reproduces the LP's no_batt case in milliseconds.
+
+Uses:
+    estimate(data, params)            approximate optimal capacities and cost
+    screen(data, samples)             thousands of cost assumptions at once on a
+                                      precomputed feature grid (one matrix product)
+    apply_hint(prob, var, est)        initial values (and optional bounds) for the LP
+
+    python screening.py                          # estimate vs LP (no_batt)
+    python screening.py --samples 5000           # triage random cost assumptions
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import assignment4 as a4
+from tek5410.conditioning import tighten, active_bounds
+from tek5410.resolution import hour_weights
+
+VRE = ['wind', 'solar']
+
+
+# ------------------------------------------------------------------
+# Data and dispatch
+# ------------------------------------------------------------------
+def prepare(raw_data, params=a4.PARAMS):
+    """Scaled demand, capacity factors and hour weights as arrays"""
+    return {
+        'demand': raw_data['demand'].to_numpy(float) * params['demand_scale'],
+        'cf_wind': raw_data['cf_wind'].to_numpy(float),
+        'cf_solar': raw_data['cf_solar'].to_numpy(float),
+        'cf_gas': raw_data['cf_gas'].to_numpy(float),
+        'w': hour_weights(raw_data),
+    }
+
+
+def marginal_cost(params):
+    return {t: params['vom'][t] + params['fuel'][t] for t in a4.technologies}
+
+
+def merit_order(params):
+    """VRE technologies in dispatch order (cheapest marginal cost first)"""
+    mc = marginal_cost(params)
+    return sorted(VRE, key=lambda t: mc[t])
+
+
+def features(data, wind, solar, order=VRE):
+    """
+    Merit-order dispatch for arrays of wind/solar capacities (n points).
+    Returns energy served per technology, gas capacity (peak residual load) and hourly gas.
+    """
+    cap = {'wind': np.atleast_1d(np.asarray(wind, float)), 'solar': np.atleast_1d(np.asarray(solar, float))}
+    residual = np.broadcast_to(data['demand'], (cap['wind'].size, data['demand'].size)).copy()
+    energy = {}
+    for t in order:
+        served = np.minimum(cap[t][:, None] * data[f'cf_{t}'], residual)
+        residual -= served
+        energy[t] = served @ data['w']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gas_cap = np.where(data['cf_gas'] > 0, residual / data['cf_gas'], np.where(residual > 0, np.inf, 0))
+    return {'wind': cap['wind'], 'solar': cap['solar'], 'gas': gas_cap.max(axis=1),
+            'E_wind': energy['wind'], 'E_solar': energy['solar'], 'E_gas': residual @ data['w'],
+            'gas_hourly': residual}
+
+
+def system_cost(feat, params):
+    """Annualised capacity + operating cost (same objective as the LP without battery)"""
+    a, mc = params['a'], marginal_cost(params)
+    return sum(a[t] * feat[t] + mc[t] * feat[f'E_{t}'] for t in ('wind', 'solar', 'gas'))
+
+
+# ------------------------------------------------------------------
+# Single estimate: zooming grid search
+# ------------------------------------------------------------------
+def _upper_bounds(data, params):
+    """Any optimal capacity costs at most the all-gas system: cap_t <= cost(all gas) / a_t"""
+    all_gas = features(data, 0.0, 0.0)
+    ub = float(system_cost(all_gas, params)[0])
+    return {t: ub / params['a'][t] for t in VRE}
+
+
+def estimate(raw_data, params=a4.PARAMS, points=9, rounds=30, rel_tol=1e-7):
+    """Approximate cost-optimal wind/solar/gas capacities and cost (no storage)"""
+    start = time.perf_counter()
+    data = prepare(raw_data, params)
+    order = merit_order(params)
+    ub = _upper_bounds(data, params)
+
+    # First pass on a geometric grid (the optimum can be anywhere in [0, ub]), then zoom linearly
+    axes = {t: np.concatenate([[0.0], np.geomspace(ub[t] * 1e-6, ub[t], points - 1)]) for t in VRE}
+    best, best_cost, stalled = None, np.inf, 0
+    for _ in range(rounds):
+        W, S = np.meshgrid(axes['wind'], axes['solar'], indexing='ij')
+        feat = features(data, W.ravel(), S.ravel(), order)
+        cost = system_cost(feat, params)
+        i = int(np.argmin(cost))
+        stalled = stalled + 1 if best_cost - cost[i] <= rel_tol * abs(cost[i]) else 0
+        if cost[i] <= best_cost:
+            best, best_cost = {k: v[i] for k, v in feat.items()}, cost[i]
+        if stalled >= 2:
+            break
+        # Zoom to the neighbouring grid cells of the best point
+        iw, is_ = np.unravel_index(i, W.shape)
+        axes = {'wind': _zoom(axes['wind'], iw, points), 'solar': _zoom(axes['solar'], is_, points)}
+
+    co2 = params['co2']['gas']
+    return {
+        'CAP': {t: float(best[t]) for t in ('wind', 'solar', 'gas')},
+        'COST': float(best_cost),
+        'EMIS': float(co2 * best['E_gas']),
+        'dispatch': {'gas': best['gas_hourly']},
+        'time_s': time.perf_counter() - start,
+    }
+
+
+def _zoom(axis, i, points):
+    lo, hi = axis[max(i - 1, 0)], axis[min(i + 1, len(axis) - 1)]
+    return np.linspace(lo, hi, points)
+
+
+# ------------------------------------------------------------------
+# Batch triage of cost assumptions
+# ------------------------------------------------------------------
+def feature_grid(raw_data, params=a4.PARAMS, points=48, chunk=256):
+    """
+    Dispatch features on a fixed geometric (wind, solar) grid, for both VRE merit orders.
+    Computed once; any cost assumption is then a dot product.
+    """
+    data = prepare(raw_data, params)
+    ub = _upper_bounds(data, params)
+    axes = {t: np.concatenate([[0.0], np.geomspace(ub[t] * 1e-6, ub[t], points - 1)]) for t in VRE}
+    W, S = (g.ravel() for g in np.meshgrid(axes['wind'], axes['solar'], indexing='ij'))
+    grid = {}
+    for order in (('wind', 'solar'), ('solar', 'wind')):
+        parts = [features(data, W[k:k + chunk], S[k:k + chunk], order) for k in range(0, W.size, chunk)]
+        grid[order] = {key: np.concatenate([p[key] for p in parts])
+                       for key in ('wind', 'solar', 'gas', 'E_wind', 'E_solar', 'E_gas')}
+    return grid
+
+
+def sample_assumptions(n, params=a4.PARAMS, spread=0.3, seed=0):
+    """Random ±spread perturbations of annuities and gas fuel price"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n):
+        f = rng.uniform(1 - spread, 1 + spread, 4)
+        rows.append({'a_wind': params['a']['wind'] * f[0], 'a_solar': params['a']['solar'] * f[1],
+                     'a_gas': params['a']['gas'] * f[2], 'fuel_gas': params['fuel']['gas'] * f[3]})
+    return pd.DataFrame(rows)
+
+
+def assumption_params(row, params=a4.PARAMS):
+    """PARAMS with one sampled cost assumption applied"""
+    out = {k: (dict(v) if isinstance(v, dict) else v) for k, v in params.items()}
+    for t in ('wind', 'solar', 'gas'):
+        out['a'][t] = float(row[f'a_{t}'])
+    out['fuel']['gas'] = float(row['fuel_gas'])
+    return out
+
+
+def screen(grid, samples, params=a4.PARAMS):
+    """Best grid point (capacities, cost) for every sampled cost assumption"""
+    vom = params['vom']
+    feats = grid[tuple(merit_order(params))]
+    # cost[s, p] = sum_t a_t[s] * cap_t[p] + mc_t[s] * E_t[p]
+    coef = np.column_stack([samples['a_wind'], samples['a_solar'], samples['a_gas'],
+                            np.full(len(samples), vom['wind']), np.full(len(samples), vom['solar']),
+                            vom['gas'] + samples['fuel_gas']])
+    X = np.vstack([feats['wind'], feats['solar'], feats['gas'], feats['E_wind'], feats['E_solar'], feats['E_gas']])
+    cost = coef @ X
+    best = cost.argmin(axis=1)
+    out = samples.copy()
+    out['cap_wind'], out['cap_solar'], out['cap_gas'] = feats['wind'][best], feats['solar'][best], feats['gas'][best]
+    out['cost'] = cost[np.arange(len(samples)), best]
+    return out
+
+
+# ------------------------------------------------------------------
+# LP hint
+# ------------------------------------------------------------------
+def apply_hint(prob, var, est, margin=None):
+    """
+    Initial values for CAP and gas GEN from an estimate (CBC warm start). With a margin,
+    capacities are also bounded to [est*(1-margin), est*(1+margin)]; the returned record
+    lets tek5410.conditioning.active_bounds check afterwards that no hint bound is active.
+    """
+    unit = var.get('unit', 1.0)
+    record = []
+    for t, value in est['CAP'].items():
+        var['CAP'][t].setInitialValue(value / unit)
+        if margin is not None:
+            tighten(var['CAP'][t], lower=value * (1 - margin) / unit,
+                    upper=value * (1 + margin) / unit + 1.0 / unit, record=record)
+    for h, g in zip(var['hours'], est['dispatch']['gas']):
+        var['GEN'][('gas', h)].setInitialValue(g / unit)
+    return record
+
+
+# ------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------
+def compare_with_lp(raw_data, params=a4.PARAMS, margin=0.5):
+    import pulp
+    est = estimate(raw_data, params)
+    print(f"Screening estimate ({est['time_s'] * 1e3:.0f} ms): "
+          + ", ".join(f"{t} {v:,.0f} MW" for t, v in est['CAP'].items()) + f", cost {est['COST']:,.0f}")
+
+    rows = [{'method': 'screening', 'time_s': est['time_s'], 'cost': est['COST'],
+             **{f'cap_{t}': v for t, v in est['CAP'].items()}}]
+    for label, hint in (('LP', False), ('LP + hint', True)):
+        prob, var = a4.build_model(raw_data, params)
+        record = apply_hint(prob, var, est, margin) if hint else []
+        solver = pulp.PULP_CBC_CMD(msg=False, warmStart=hint)
+        start = time.perf_counter()
+        res = a4.solve_case(prob, var, 'no_batt', params, solve_fn=lambda p: p.solve(solver))
+        rows.append({'method': label, 'time_s': time.perf_counter() - start, 'cost': res['COST'],
+                     **{f'cap_{t}': v for t, v in res['CAP'].items()}})
+        active = active_bounds(record)
+        if active:
+            print(f"⚠️  hint bounds active ({', '.join(active)}): widen --margin")
+    table = pd.DataFrame(rows)
+    lp_cost = table.loc[1, 'cost']
+    table['cost_dev_pct'] = (table['cost'] - lp_cost) / lp_cost * 100
+    print(table.to_string(index=False))
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assignment 4: screening-curve capacity estimate")
+    parser.add_argument('--data', default='baseline_data.csv')
+    parser.add_argument('--samples', type=int, help="triage this many random cost assumptions")
+    parser.add_argument('--margin', type=float, default=0.5, help="relative capacity bounds hint for the LP")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    raw_data = a4.load_data(args.data)
+    if args.samples:
+        t0 = time.perf_counter()
+        grid = feature_grid(raw_data)
+        t1 = time.perf_counter()
+        samples = sample_assumptions(args.samples)
+        table = screen(grid, samples)
+        t2 = time.perf_counter()
+        print(f"Feature grid: {t1 - t0:.2f} s (once) | {len(samples)} assumptions screened in {(t2 - t1) * 1e3:.0f} ms")
+        top = table.nsmallest(args.top, 'cost').copy()
+        refined = [estimate(raw_data, assumption_params(row)) for _, row in top.iterrows()]
+        top['refined_cost'] = [r['COST'] for r in refined]
+        for t in ('wind', 'solar', 'gas'):
+            top[f'refined_{t}'] = [r['CAP'][t] for r in refined]
+        print(f"\nCheapest {args.top} assumptions, refined with the zooming estimate (send these to the LP):")
+        print(top.to_string(index=False))
+        table.to_csv('screening_results.csv', index=False)
+    else:
+        compare_with_lp(raw_data, a4.PARAMS, args.margin)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Two-stage stochastic capacity expansion for assignment4 with Benders decomposition.
+
+The deterministic model sizes capacity against a single synthetic year. Here the
+capacities (wind, solar, gas, battery) are first-stage decisions shared by N
+weather/demand years, and the hourly dispatch of each year is a second-stage
+LP that only sees its own year:
+
+    min  a . CAP + sum_s p_s Q_s(CAP)
+    Q_s(CAP) = min operating cost of year s with capacities CAP (+ VOLL * unserved)
+
+Unserved energy at VOLL keeps every subproblem feasible for any capacity vector.
+Each Q_s is convex and piecewise linear in CAP; the duals of the capacity rows
+give a subgradient, so every subproblem solve adds one optimality cut
+theta_s >= Q_s(CAP_k) + g_s . (CAP - CAP_k) to a small master LP (multi-cut).
+The master objective is a lower bound, the best evaluated plan an upper bound.
+
+Subproblems run in worker processes. The year profiles are published once in
+shared memory (tek5410.sharedarrays); each worker builds the sparse LP of a year
+the first time it is asked for it and keeps it, so memory per worker is a few
+subproblems, not the extensive form (N x the deterministic model).
+
+The dispatch LP is the one of assignment4.build_model (GEN - CHARGE = demand),
+in matrix form and solved with HiGHS dual simplex.
+Battery power (MW) and energy (MWh) are separate first-stage capacities unless
+the parameters fix a duration ('dur').
+
+Usage:
+    python stochastic.py --years 10                   # baseline year + 9 generated years
+    python stochastic.py --years 30 --resolution 3 --workers 4
+    python stochastic.py --years 10 --compare         # expected cost of the single-year plan
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+import assignment4 as a4
+from generate_data import generate
+from tek5410.dispatch import VOLL
+from tek5410.resolution import aggregate, hour_weights
+from tek5410.sharedarrays import SharedArrays, attach
+
+COLUMNS = ['demand', 'cf_wind', 'cf_solar', 'cf_gas']
+TECHS = a4.technologies        # generation/power capacities
+CAPACITIES = TECHS + ['batt_energy']   # first-stage vector, in this order
+BLOCKS = ['wind', 'solar', 'gas', 'batt', 'charge', 'soc', 'unserved']
+MASTER_UNIT = 1e6    # € per master cost unit; cuts at VOLL reach 1e11 € and stall HiGHS in €
+
+
+# ------------------------------------------------------------------
+# Weather years
+# ------------------------------------------------------------------
+def weather_years(raw_data, n_years, seed=0, step_h=1):
+    """
+    The given year plus n_years - 1 synthetic years (generate_data with seeds seed+1, ...),
+    optionally aggregated to step_h blocks. Returns profiles (N, H, 4) in COLUMNS order and
+    the hour weights (H,).
+    """
+    frames = [raw_data[COLUMNS].reset_index(drop=True)]
+    frames += [generate(len(raw_data), seed + i)[COLUMNS].reset_index(drop=True) for i in range(1, n_years)]
+    if step_h > 1:
+        frames = [aggregate(f, step_h) for f in frames]
+    weights = hour_weights(frames[0])
+    return np.stack([f[COLUMNS].to_numpy(float) for f in frames]), weights
+
+
+# ------------------------------------------------------------------
+# Second stage: dispatch of one year for fixed capacities
+# ------------------------------------------------------------------
+def _coo(rows, cols, vals, shape):
+    return sp.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=shape)
+
+
+class Subproblem:
+    """Dispatch LP of one year; capacities only enter the right-hand side (b_ub = B @ CAP)"""
+
+    def __init__(self, profile, w, params=a4.PARAMS):
+        H = len(profile)
+        demand = profile[:, 0] * params['demand_scale']
+        cf = {'wind': profile[:, 1], 'solar': profile[:, 2], 'gas': profile[:, 3]}
+        mc = {t: params['vom'][t] + params['fuel'][t] for t in TECHS}
+        eta, dur = params['eta']['batt'], params.get('dur', {}).get('batt')
+        col = {name: np.arange(k * H, (k + 1) * H) for k, name in enumerate(BLOCKS)}
+        n = len(BLOCKS) * H
+        hours = np.arange(H)
+
+        c = np.zeros(n)
+        for t in TECHS:
+            c[col[t]] = mc[t] * w
+        c[col['charge']] = params['vom']['batt'] * w
+        c[col['unserved']] = VOLL * w
+
+        # Balance (GEN - CHARGE + unserved = demand, as in build_model) and storage balance
+        gen = ['wind', 'solar', 'gas', 'batt', 'charge', 'unserved']
+        rows = [hours] * len(gen) + [H + hours, H + hours[1:], H + hours, H + hours]
+        cols = [col[t] for t in gen] + [col['soc'], col['soc'][:-1], col['charge'], col['batt']]
+        vals = ([np.ones(H)] * 4 + [-np.ones(H), np.ones(H)]
+                + [np.ones(H), -np.ones(H - 1), -eta * w, w])
+        self.A_eq = _coo(rows, cols, vals, (2 * H, n))
+        self.b_eq = np.concatenate([demand, np.zeros(H)])
+
+        # Capacity rows: GEN <= cf * CAP, SOC <= CAP_batt_energy (or dur * CAP_batt),
+        # discharge + charge <= CAP_batt
+        rows = [k * H + hours for k in range(5)] + [4 * H + hours]
+        cols = [col['wind'], col['solar'], col['gas'], col['soc'], col['batt'], col['charge']]
+        self.A_ub = _coo(rows, cols, [np.ones(H)] * 6, (5 * H, n))
+        rows = [k * H + hours for k in range(5)]
+        soc_cap = 'batt_energy' if dur is None else 'batt'
+        cap_col = [CAPACITIES.index(t) for t in ('wind', 'solar', 'gas', soc_cap, 'batt')]
+        vals = [cf['wind'], cf['solar'], cf['gas'], np.full(H, 1.0 if dur is None else float(dur)), np.ones(H)]
+        self.B = _coo(rows, [np.full(H, j) for j in cap_col], vals, (5 * H, len(CAPACITIES)))
+
+        self.c, self.w, self.col = c, w, col
+        self.co2 = params['co2']['gas']
+
+    def solve(self, caps):
+        """Operating cost Q(caps), subgradient dQ/dcaps and a few dispatch totals"""
+        start = time.perf_counter()
+        res = linprog(self.c, A_ub=self.A_ub, b_ub=self.B @ caps, A_eq=self.A_eq, b_eq=self.b_eq,
+                      bounds=(0, None), method='highs-ds')
+        if res.status != 0:
+            raise RuntimeError(f"Benders subproblem failed: {res.message}")
+        x = res.x
+        return {
+            'cost': res.fun,
+            'grad': self.B.T @ res.ineqlin.marginals,
+            'unserved': float(self.w @ x[self.col['unserved']]),
+            'emissions': float(self.co2 * (self.w @ x[self.col['gas']])),
+            'solve_s': time.perf_counter() - start,
+        }
+
+
+# ------------------------------------------------------------------
+# Worker processes
+# ------------------------------------------------------------------
+_WORKER = {}
+
+
+def _setup(profiles, weights, params):
+    _WORKER.clear()
+    _WORKER.update(profiles=profiles, weights=weights, params=params, subproblems={})
+
+
+def _init_worker(ref, params):
+    arrays = attach(ref)
+    _setup(arrays['profiles'], arrays['weights'], params)
+
+
+def _solve_year(task):
+    s, caps = task
+    subproblems = _WORKER['subproblems']
+    if s not in subproblems:
+        subproblems[s] = Subproblem(_WORKER['profiles'][s], _WORKER['weights'], _WORKER['params'])
+    return subproblems[s].solve(caps)
+
+
+class YearPool:
+    """Evaluates all years for a capacity vector, in worker processes or (workers=0) in-process"""
+
+    def __init__(self, profiles, weights, params=a4.PARAMS, workers=None):
+        self.n_years = len(profiles)
+        self.shared, self.pool = None, None
+        if workers == 0:
+            _setup(profiles, weights, params)
+            return
+        self.shared = SharedArrays({'profiles': profiles, 'weights': weights})
+        self.pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self.shared.ref, params))
+
+    def evaluate(self, caps):
+        tasks = [(s, np.asarray(caps, dtype=float)) for s in range(self.n_years)]
+        if self.pool is None:
+            return [_solve_year(task) for task in tasks]
+        return list(self.pool.map(_solve_year, tasks))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.shared is not None:
+            self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------------------------------------------------------
+# First stage: master LP with one cut per year and iteration
+# ------------------------------------------------------------------
+def capacity_costs(params):
+    """Annual cost per unit of each entry of CAPACITIES (energy folded into power for a fixed duration)"""
+    a = np.array([params['a'][t] for t in TECHS] + [params['a_energy']['batt']], dtype=float)
+    dur = params.get('dur', {}).get('batt')
+    if dur is not None:
+        a[TECHS.index('batt')] += dur * a[-1]
+        a[-1] = 0.0
+    return a
+
+
+class Master:
+    """min a . CAP + sum_s p_s theta_s  s.t. theta_s >= Q_s(CAP_k) + g_s . (CAP - CAP_k)"""
+
+    def __init__(self, params, n_years, case='with_batt'):
+        self.n = len(CAPACITIES)
+        self.p = np.full(n_years, 1.0 / n_years)
+        self.a = capacity_costs(params)
+        self.c = np.concatenate([self.a, self.p * MASTER_UNIT]) / MASTER_UNIT
+        # operating costs are >= 0, so theta >= 0 keeps the first master bounded
+        self.bounds = [(0, None)] * (self.n + n_years)
+        if case == 'no_batt':
+            self.bounds[CAPACITIES.index('batt')] = (0, 0)
+        if case == 'no_batt' or 'batt' in params.get('dur', {}):
+            self.bounds[CAPACITIES.index('batt_energy')] = (0, 0)
+        self.rows, self.rhs = [], []
+
+    def add_cut(self, s, result, caps):
+        row = np.zeros(len(self.c))
+        row[:self.n] = result['grad'] / MASTER_UNIT
+        row[self.n + s] = -1.0
+        self.rows.append(row)
+        self.rhs.append((result['grad'] @ caps - result['cost']) / MASTER_UNIT)
+
+    def solve(self):
+        res = linprog(self.c, A_ub=np.array(self.rows) if self.rows else None,
+                      b_ub=np.array(self.rhs) if self.rhs else None, bounds=self.bounds, method='highs')
+        if res.status != 0:
+            raise RuntimeError(f"Benders master failed: {res.message}")
+        return res.x[:self.n], res.fun * MASTER_UNIT
+
+    def first_stage_cost(self, caps):
+        return float(self.a @ caps)
+
+
+def solve_benders(profiles, weights, params=a4.PARAMS, case='with_batt', workers=None, tol=1e-4,
+                  max_iter=100, verbose=True):
+    """
+    Multi-cut Benders over the years in `profiles` (N, H, 4), all equally likely.
+    Returns {'CAP', 'COST' (expected), 'EMIS' (expected), 'years' (per-year table), 'trace' (per iteration)}.
+    """
+    n_years = len(profiles)
+    master = Master(params, n_years, case)
+    best = {'ub': np.inf}
+    trace = []
+    with YearPool(profiles, weights, params, workers) as pool:
+        caps, lower = master.solve()
+        for it in range(1, max_iter + 1):
+            start = time.perf_counter()
+            results = pool.evaluate(caps)
+            sub_wall = time.perf_counter() - start
+
+            upper = master.first_stage_cost(caps) + master.p @ [r['cost'] for r in results]
+            if upper < best['ub']:
+                best = {'ub': upper, 'caps': caps.copy(), 'results': results}
+            for s, r in enumerate(results):
+                master.add_cut(s, r, caps)
+
+            start = time.perf_counter()
+            caps, lower = master.solve()
+            master_s = time.perf_counter() - start
+            gap = max(best['ub'] - lower, 0.0) / max(abs(best['ub']), 1.0)
+            trace.append({'iteration': it, 'lower_bound': lower, 'upper_bound': best['ub'], 'gap_pct': gap * 100,
+                          'sub_wall_s': sub_wall, 'sub_cpu_s': sum(r['solve_s'] for r in results),
+                          'master_s': master_s, 'cuts': len(master.rows),
+                          **{f'cap_{t}': v for t, v in zip(CAPACITIES, caps)}})
+            if verbose:
+                print(f"  it {it:3d} | LB {lower:,.0f} | UB {best['ub']:,.0f} | gap {gap * 100:.4f}% | "
+                      f"subproblems {sub_wall:.1f} s wall, {trace[-1]['sub_cpu_s']:.1f} s cpu | master {master_s * 1e3:.0f} ms")
+            if gap <= tol:
+                break
+
+    years = pd.DataFrame([{'year': s, 'operating_cost': r['cost'], 'unserved_mwh': r['unserved'],
+                           'emissions': r['emissions']} for s, r in enumerate(best['results'])])
+    caps = dict(zip(CAPACITIES, best['caps'].tolist()))
+    if 'batt' in params.get('dur', {}):
+        caps['batt_energy'] = params['dur']['batt'] * caps['batt']
+    return {
+        'CAP': caps,
+        'COST': best['ub'],
+        'EMIS': float(master.p @ years['emissions']),
+        'converged': bool(trace and trace[-1]['gap_pct'] <= tol * 100),
+        'years': years,
+        'trace': pd.DataFrame(trace),
+    }
+
+
+def evaluate_plan(caps, profiles, weights, params=a4.PARAMS, workers=None):
+    """Expected total cost of fixed capacities over all years (one round of subproblems)"""
+    caps = np.array([caps.get(t, 0.0) for t in CAPACITIES], dtype=float)
+    with YearPool(profiles, weights, params, workers) as pool:
+        results = pool.evaluate(caps)
+    first = capacity_costs(params) @ caps
+    return first + np.mean([r['cost'] for r in results])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assignment 4: stochastic capacity expansion (Benders)")
+    parser.add_argument('--data', default='baseline_data.csv')
+    parser.add_argument('--years', type=int, default=10, help="weather years (the data year + generated ones)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--resolution', type=int, default=1, help="hours per time step")
+    parser.add_argument('--case', choices=a4.CASES, default='with_batt')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (0 = in-process)")
+    parser.add_argument('--tol', type=float, default=1e-4, help="relative gap")
+    parser.add_argument('--max-iter', type=int, default=100)
+    parser.add_argument('--compare', action='store_true',
+                        help="also solve the data year alone and report its expected cost over all years")
+    args = parser.parse_args()
+
+    raw_data = a4.load_data(args.data)
+    profiles, weights = weather_years(raw_data, args.years, args.seed, args.resolution)
+    print(f"{args.years} years x {profiles.shape[1]} steps, {args.workers or os.cpu_count()} worker(s)")
+
+    start = time.perf_counter()
+    out = solve_benders(profiles, weights, a4.PARAMS, args.case, args.workers, args.tol, args.max_iter)
+    elapsed = time.perf_counter() - start
+    trace = out['trace']
+    print(f"\n{'Converged' if out['converged'] else 'Stopped'} after {len(trace)} iterations in {elapsed:.1f} s "
+          f"(gap {trace['gap_pct'].iloc[-1]:.4f}%, subproblems {trace['sub_wall_s'].sum():.1f} s, "
+          f"master {trace['master_s'].sum():.1f} s)")
+    print("Capacities (MW):", {t: round(v, 1) for t, v in out['CAP'].items()})
+    print(f"Expected cost {out['COST']:,.0f} | expected emissions {out['EMIS']:,.0f}")
+    print(out['years'].describe().loc[['mean', 'min', 'max']].to_string())
+
+    if args.compare:
+        # the data year solved directly (a4's sparse LP), not by a Benders run that may stop short
+        single = a4.solve_matrix(a4.build_matrix(aggregate(raw_data, args.resolution) if args.resolution > 1
+                                                 else raw_data, a4.PARAMS), args.case, a4.PARAMS)
+        expected = evaluate_plan(single['CAP'], profiles, weights, a4.PARAMS, args.workers)
+        print(f"\nSingle-year plan {({t: round(v, 1) for t, v in single['CAP'].items()})}")
+        print(f"  cost on its own year {single['COST']:,.0f} | expected over {args.years} years {expected:,.0f} "
+              f"(+{(expected / out['COST'] - 1) * 100:.2f}% vs the stochastic plan)")
+
+    trace.to_csv('benders_trace.csv', index=False)
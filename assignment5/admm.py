@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+ADMM regional decomposition of the assignment5 transmission model.
+
+The monolithic LP couples the nodes only through the FLOW on their links. Here
+every node is a subproblem of its own (capacities, dispatch, storage) holding a
+local copy x of the flow on each incident link, and every link is a small agent
+owning the consensus flow z and the transmission capacity. Scaled ADMM:
+
+    x_n  = argmin  cost_n(x) + rho/2 sum_h w_h (x_h - z_h + u_n,h)^2      per node, in parallel
+    z, C = argmin  tx_cost C + rho/2 sum_n sum_h w_h (z_h - x_n,h - u_n,h)^2   s.t. |z_h| <= C
+    u_n += x_n - z
+
+Only flows cross process boundaries. The link update is closed form: z is the
+mean of the two ends clipped to +-C, and C solves a one-dimensional piecewise
+linear equation. The node update is an LP solved with HiGHS: the quadratic
+proximal term is replaced by its piecewise linear interpolation on
+PROX_SEGMENTS segments of geometrically growing width (first PROX_STEP_GW). The
+segments are anchored at z, with the dual y = rho u entering as a linear price
+(equal up to a constant), so x = z + (positive - negative deviation segments)
+and the fine segments sit where x converges; the subproblem gains columns but
+no rows. Deviations smaller than PROX_STEP_GW are penalised linearly, which
+bounds how closely ADMM can track the monolithic optimum.
+
+Residuals (w-weighted, GW * sqrt(h)) follow Boyd et al. (2011): primal
+||x - z||, dual rho ||z - z_prev||; with `balance` set, rho is doubled or halved
+when one exceeds the other by that factor. The fixed default rho = 0.1 with
+over-relaxation (alpha = 1.6) converged fastest on the north/south pair.
+Because of the linear band below PROX_STEP_GW the residuals level off instead
+of reaching zero, and eps_rel = 1e-3 stopped while capacities were still a few
+percent off (wind north -4.8% at 24 h). So the default eps_rel is 2e-4, and
+convergence also needs every capacity (and the transmission capacity) to have
+moved by at most cap_tol, relative to max(capacity, CAP_FLOOR_MW), in each of
+the last CAP_WINDOW iterations (281 iterations, 0.05% off at 24 h).
+
+Node subproblems run in worker processes that keep their LP between
+iterations; the time series are shared once (tek5410.sharedarrays).
+
+The network is a5's north/south pair by default; --nodes N builds a chain of N
+nodes whose demand and VRE scales interpolate between north and south, for
+scaling runs. Both the decomposition and the reference monolithic LP are built
+here in matrix form (GW / k€), with assignment5.build_model's rows: balance
+with FLOW into the `to` node, cyclic SOC with SOC_0 = 0, SOC <= energy capacity,
+charge + discharge <= power capacity, |FLOW| <= transmission capacity.
+
+Usage:
+    python admm.py --resolution 6                       # north/south, compare with the monolithic LP
+    python admm.py --resolution 6 --nodes 6 --workers 1 2 4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+import assignment5 as a5
+from tek5410.conditioning import POWER_UNIT
+from tek5410.resolution import aggregate, hour_weights
+from tek5410.sharedarrays import SharedArrays, attach
+
+COLUMNS = ['demand', 'cf_wind', 'cf_solar']
+BLOCKS = ['wind', 'solar', 'gas', 'charge', 'discharge', 'sto']
+CAPS = ['wind', 'solar', 'gas', 'batt', 'batt_energy']
+FLOW_BOUND_GW = 1e3            # the +-1e6 MW FLOW bounds of build_model
+PROX_STEP_GW = 0.002           # width of the first proximal segment
+PROX_SEGMENTS = 16             # widths double, so the last bounded one ends at 131 GW
+CAP_FLOOR_MW = 1e3             # capacity changes are relative to max(capacity, 1 GW)
+CAP_WINDOW = 10                # iterations the capacity change must stay within cap_tol
+
+
+# ------------------------------------------------------------------
+# Network
+# ------------------------------------------------------------------
+def network(params=a5.PARAMS, n_nodes=2):
+    """
+    {'nodes': {name: scales}, 'links': [(from, to)]}. Two nodes are a5's north/south;
+    more form a chain north -> ... -> south with linearly interpolated scales.
+    """
+    keys = ('demand_scale', 'wind_scale', 'solar_scale')
+    if n_nodes == 2:
+        nodes = {n: {k: params[k][n] for k in keys} for n in a5.nodes}
+    else:
+        f = np.linspace(0, 1, n_nodes)
+        nodes = {f'n{i}': {k: params[k]['north'] + fi * (params[k]['south'] - params[k]['north']) for k in keys}
+                 for i, fi in enumerate(f)}
+    names = list(nodes)
+    return {'nodes': nodes, 'links': list(zip(names[:-1], names[1:]))}
+
+
+def incidence(net):
+    """Per node: [(link index, sign)], sign +1 where FLOW on the link flows into the node"""
+    inc = {n: [] for n in net['nodes']}
+    for j, (i, k) in enumerate(net['links']):
+        inc[i].append((j, -1.0))
+        inc[k].append((j, 1.0))
+    return inc
+
+
+# ------------------------------------------------------------------
+# Node LP (capacities + dispatch, without flows)
+# ------------------------------------------------------------------
+def node_matrix(base, w, scales, params):
+    """
+    One node of build_model as sparse arrays: columns BLOCKS x H, then CAPS.
+    The first H rows of A_eq are the balance rows (flows are added by the caller).
+    """
+    H = len(w)
+    demand = base[:, 0] * scales['demand_scale'] / POWER_UNIT
+    cf = {'wind': base[:, 1] * scales['wind_scale'], 'solar': base[:, 2] * scales['solar_scale'], 'gas': np.ones(H)}
+    eta, dur = params['eta']['batt'], params.get('dur', {}).get('batt')
+    col = {name: np.arange(k * H, (k + 1) * H) for k, name in enumerate(BLOCKS)}
+    cap = {t: len(BLOCKS) * H + k for k, t in enumerate(CAPS)}
+    n = len(BLOCKS) * H + len(CAPS)
+    steps = np.arange(H)
+
+    c = np.zeros(n)
+    for t in ['wind', 'solar', 'gas']:
+        c[col[t]] = (params['vom'][t] + params['fuel'][t]) * w
+        c[cap[t]] = params['a'][t]
+    c[cap['batt']] = params['a']['batt']
+    c[cap['batt_energy']] = params['a_energy']['batt']
+
+    def coo(rows, cols, vals, m):
+        return sp.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(m, n))
+
+    # Balance: wind + solar + gas + discharge - charge (+ flows) = demand; cyclic SOC
+    rows = [steps] * 5 + [H + steps] * 4
+    cols = [col['wind'], col['solar'], col['gas'], col['discharge'], col['charge'],
+            col['sto'], np.roll(col['sto'], 1), col['charge'], col['discharge']]
+    vals = [np.ones(H)] * 4 + [-np.ones(H), np.ones(H), -np.ones(H), -eta * w, w]
+    m_eq, b_eq = 2 * H, [demand, np.zeros(H)]
+    if dur is not None:
+        rows.append([m_eq, m_eq])
+        cols.append([cap['batt_energy'], cap['batt']])
+        vals.append([1.0, -dur])
+        m_eq += 1
+        b_eq.append([0.0])
+    A_eq = coo(rows, cols, vals, m_eq)
+
+    rows, cols, vals = [], [], []
+    for k, t in enumerate(['wind', 'solar', 'gas']):
+        rows += [k * H + steps] * 2
+        cols += [col[t], np.full(H, cap[t])]
+        vals += [np.ones(H), -cf[t]]
+    rows += [3 * H + steps] * 3 + [4 * H + steps] * 2
+    cols += [col['charge'], col['discharge'], np.full(H, cap['batt']), col['sto'], np.full(H, cap['batt_energy'])]
+    vals += [np.ones(H), np.ones(H), -np.ones(H), np.ones(H), -np.ones(H)]
+    A_ub = coo(rows, cols, vals, 5 * H)
+
+    bounds = np.column_stack([np.zeros(n), np.full(n, np.inf)])
+    bounds[col['sto'][0], 1] = 0.0                                      # STO_init
+    return {'c': c, 'A_eq': A_eq, 'b_eq': np.concatenate(b_eq), 'A_ub': A_ub, 'b_ub': np.zeros(5 * H),
+            'bounds': bounds, 'col': col, 'cap': cap, 'n': n}
+
+
+def node_results(node, x, w, co2):
+    """Capacities (MW), operating + capacity cost (k€) and emissions (kt) of one node's columns"""
+    return {'caps': {t: float(x[node['cap'][t]]) * POWER_UNIT for t in CAPS},
+            'cost': float(node['c'] @ x[:node['n']]),
+            'co2': co2 * float(w @ x[node['col']['gas']]) * POWER_UNIT / 1000.0}
+
+
+class NodeLP:
+    """x-update of one node: node LP + piecewise linear proximal term on each incident link"""
+
+    def __init__(self, base, w, scales, links, params=a5.PARAMS, co2=0.0,
+                 step=PROX_STEP_GW, segments=PROX_SEGMENTS):
+        self.node = node_matrix(base, w, scales, params)
+        self.w, self.links, self.co2 = w, links, co2
+        H, n = len(w), self.node['n']
+        edges = step * (2.0 ** np.arange(segments + 1) - 1)               # 0, s, 3s, 7s, ...
+        width = np.diff(edges)
+        width[-1] = np.inf
+        # secant slope of d^2 / 2 on each segment; times rho * w_h in the objective
+        self.slope = (edges[:-1] + edges[1:]) / 2
+        K = segments
+        # column layout after the node: per link, K positive then K negative blocks of H
+        n_dev = 2 * K * H * len(links)
+        rows = np.tile(np.arange(H), 2 * K * len(links))
+        sign = np.concatenate([np.repeat([s, -s], K * H) for _, s in links])
+        P = sp.csr_matrix((sign, (rows, np.arange(n_dev))), shape=(self.node['A_eq'].shape[0], n_dev))
+        self.A_eq = sp.hstack([self.node['A_eq'], P]).tocsr()
+        self.A_ub = sp.hstack([self.node['A_ub'], sp.csr_matrix((self.node['A_ub'].shape[0], n_dev))]).tocsr()
+        dev_hi = np.tile(np.repeat(width, H), 2 * len(links))
+        self.bounds = np.vstack([self.node['bounds'], np.column_stack([np.zeros(n_dev), dev_hi])])
+        self.dev_w = np.tile(np.concatenate([np.repeat(self.slope, H)] * 2) * np.tile(w, 2 * K), len(links))
+        self.H, self.K, self.n = H, K, n
+
+    def solve(self, z, y, rho):
+        """
+        z, y (links, H): consensus flows and flow prices (rho * u). The proximal segments are
+        anchored at z and the price is a linear cost on the deviation, so the fine segments sit
+        where x converges to. Returns flow copies x (links, H), node results and timing.
+        """
+        start = time.perf_counter()
+        H, K = self.H, self.K
+        price = np.concatenate([np.tile(p * self.w, K) for row in y for p in (row, -row)])
+        c = np.concatenate([self.node['c'], rho * self.dev_w + price])
+        b_eq = self.node['b_eq'].copy()
+        for (_, s), flow in zip(self.links, z):
+            b_eq[:H] -= s * flow
+        res = linprog(c, A_ub=self.A_ub, b_ub=self.node['b_ub'], A_eq=self.A_eq, b_eq=b_eq,
+                      bounds=self.bounds, method='highs')
+        if res.status != 0:
+            raise RuntimeError(f"ADMM node subproblem failed: {res.message}")
+        dev = res.x[self.n:].reshape(len(self.links), 2, K, H).sum(axis=2)
+        x = np.asarray(z) + dev[:, 0] - dev[:, 1]
+        return {'x': x, **node_results(self.node, res.x, self.w, self.co2), 'solve_s': time.perf_counter() - start}
+
+
+def link_update(m, w, rho, tx_cost, ends=2):
+    """
+    z, C = argmin tx_cost C + rho/2 * ends * sum_h w_h (z_h - m_h)^2  s.t. |z_h| <= C  (m: mean of the ends).
+    For fixed C, z = clip(m, -C, C); C solves sum_h w_h (|m_h| - C)+ = tx_cost / (rho * ends).
+    """
+    target = tx_cost / (rho * ends)
+    a = np.abs(m)
+    order = np.argsort(-a)
+    a, ws = a[order], w[order]
+    S, W = np.cumsum(ws * a), np.cumsum(ws)
+    if S[-1] <= target:
+        return np.zeros_like(m), 0.0
+    C = (S - target) / W                                # solution if exactly the k largest are clipped
+    below = np.concatenate([a[1:], [0.0]])
+    k = np.argmax((C >= below) & (C <= a))
+    C = max(float(C[k]), 0.0)
+    return np.clip(m, -C, C), C
+
+
+# ------------------------------------------------------------------
+# Worker processes
+# ------------------------------------------------------------------
+_WORKER = {}
+
+
+def _setup(base, w, net, params, co2):
+    _WORKER.clear()
+    _WORKER.update(base=base, w=w, net=net, params=params, co2=co2, inc=incidence(net), nodes={})
+
+
+def _init_worker(ref, net, params, co2):
+    arrays = attach(ref)
+    _setup(arrays['base'], arrays['w'], net, params, co2)
+
+
+def _solve_node(task):
+    name, z, y, rho = task
+    nodes = _WORKER['nodes']
+    if name not in nodes:
+        nodes[name] = NodeLP(_WORKER['base'], _WORKER['w'], _WORKER['net']['nodes'][name], _WORKER['inc'][name],
+                             _WORKER['params'], _WORKER['co2'])
+    return name, nodes[name].solve(z, y, rho)
+
+
+class NodePool:
+    """Solves all node subproblems for given targets, in worker processes or (workers=0) in-process"""
+
+    def __init__(self, base, w, net, params=a5.PARAMS, co2=0.0, workers=None):
+        self.shared, self.pool = None, None
+        if workers == 0:
+            _setup(base, w, net, params, co2)
+            return
+        self.shared = SharedArrays({'base': base, 'w': w})
+        self.pool = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                        initargs=(self.shared.ref, net, params, co2))
+
+    def solve(self, tasks):
+        if self.pool is None:
+            return dict(map(_solve_node, tasks))
+        return dict(self.pool.map(_solve_node, tasks))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.shared is not None:
+            self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------------------------------------------------------
+# ADMM
+# ------------------------------------------------------------------
+def inputs(raw_data):
+    """(H, 3) base profile in COLUMNS order, step weights and the gas CO2 intensity"""
+    return (raw_data[COLUMNS].to_numpy(float), hour_weights(raw_data),
+            float(raw_data['co2_gas'].iloc[0]) if 'co2_gas' in raw_data else 0.0)
+
+
+def solve_admm(raw_data, net=None, params=a5.PARAMS, workers=None, rho=0.1, alpha=1.6, balance=None,
+               eps_rel=2e-4, eps_abs=1e-4, cap_tol=1e-3, max_iter=500, verbose=True):
+    """
+    ADMM over the nodes of `net` (default: a5's north/south pair). Stops when both
+    residuals are within eps and no capacity moved by more than cap_tol (relative)
+    in the last CAP_WINDOW iterations.
+    Returns {'cost' (€), 'tx_cap' (MW), 'co2' (kt), 'caps', 'flow' (links, H), 'trace', 'converged'}.
+    """
+    net = net or network(params)
+    base, w, co2 = inputs(raw_data)
+    H, L = len(w), len(net['links'])
+    inc = incidence(net)
+    tx_cost = params['tx_cost']
+    z, C = np.zeros((L, H)), np.zeros(L)
+    u = {n: np.zeros((len(inc[n]), H)) for n in net['nodes']}
+    trace, converged, caps_prev = [], False, None
+    with NodePool(base, w, net, params, co2, workers) as pool:
+        for it in range(1, max_iter + 1):
+            start = time.perf_counter()
+            out = pool.solve([(n, np.array([z[j] for j, _ in inc[n]]), rho * u[n], rho) for n in net['nodes']])
+            sub_wall = time.perf_counter() - start
+
+            start = time.perf_counter()
+            z_prev = z.copy()
+            # over-relaxation: the link and dual updates see alpha x + (1 - alpha) z_prev
+            relaxed = {n: alpha * out[n]['x'] + (1 - alpha) * np.array([z[j] for j, _ in inc[n]])
+                       for n in net['nodes']}
+            ends = {j: [] for j in range(L)}
+            for n in net['nodes']:
+                for k, (j, _) in enumerate(inc[n]):
+                    ends[j].append(relaxed[n][k] + u[n][k])
+            for j in range(L):
+                z[j], C[j] = link_update(np.mean(ends[j], axis=0), w, rho, tx_cost, len(ends[j]))
+            r2 = x2 = z2 = u2 = 0.0
+            for n in net['nodes']:
+                for k, (j, _) in enumerate(inc[n]):
+                    diff = out[n]['x'][k] - z[j]
+                    u[n][k] += relaxed[n][k] - z[j]
+                    r2 += np.sum(w * diff ** 2)
+                    x2 += np.sum(w * out[n]['x'][k] ** 2)
+                    z2 += np.sum(w * z[j] ** 2)
+                    u2 += np.sum(w * u[n][k] ** 2)
+            s2 = 2 * np.sum(w * (z - z_prev) ** 2)
+            link_s = time.perf_counter() - start
+
+            primal, dual = np.sqrt(r2), rho * np.sqrt(s2)
+            p = 2 * L * H
+            eps_pri = np.sqrt(p) * eps_abs + eps_rel * max(np.sqrt(x2), np.sqrt(z2))
+            eps_dual = np.sqrt(p) * eps_abs + eps_rel * rho * np.sqrt(u2)
+            cost = (sum(o['cost'] for o in out.values()) + tx_cost * C.sum()) * POWER_UNIT
+            caps = np.array([out[n]['caps'][t] for n in net['nodes'] for t in CAPS] + list(C * POWER_UNIT))
+            cap_change = (np.inf if caps_prev is None
+                          else (np.abs(caps - caps_prev) / np.maximum(np.abs(caps), CAP_FLOOR_MW)).max())
+            caps_prev = caps
+            trace.append({'iteration': it, 'primal_res': primal, 'dual_res': dual, 'eps_pri': eps_pri,
+                          'eps_dual': eps_dual, 'cap_change': cap_change, 'rho': rho, 'cost': cost,
+                          'tx_cap': C.sum() * POWER_UNIT,
+                          'sub_wall_s': sub_wall, 'sub_cpu_s': sum(o['solve_s'] for o in out.values()),
+                          'link_s': link_s})
+            if verbose and (it == 1 or it % 10 == 0):
+                print(f"  it {it:4d} | r {primal:9.4f} (eps {eps_pri:.4f}) | s {dual:9.4f} (eps {eps_dual:.4f}) | "
+                      f"rho {rho:7.3f} | cost {cost:,.0f} | nodes {sub_wall:.2f} s wall, "
+                      f"{trace[-1]['sub_cpu_s']:.2f} s cpu")
+            settled = len(trace) >= CAP_WINDOW and max(t['cap_change'] for t in trace[-CAP_WINDOW:]) <= cap_tol
+            if primal <= eps_pri and dual <= eps_dual and settled:
+                converged = True
+                break
+            # residual balancing; the scaled duals u = y / rho are rescaled with rho
+            if balance and primal > balance * dual:
+                rho *= 2
+                u = {n: v / 2 for n, v in u.items()}
+            elif balance and dual > balance * primal:
+                rho /= 2
+                u = {n: v * 2 for n, v in u.items()}
+
+    caps = {f'cap_{t}_{n}': out[n]['caps'][t] for n in net['nodes'] for t in CAPS}
+    return {'cost': cost, 'tx_cap': float(C.sum()) * POWER_UNIT, 'co2': sum(o['co2'] for o in out.values()),
+            'caps': caps, 'flow': z * POWER_UNIT, 'trace': pd.DataFrame(trace), 'converged': converged}
+
+
+# ------------------------------------------------------------------
+# Monolithic reference (same LP, one HiGHS solve)
+# ------------------------------------------------------------------
+def solve_monolithic(raw_data, net=None, params=a5.PARAMS):
+    net = net or network(params)
+    base, w, co2 = inputs(raw_data)
+    H, L = len(w), len(net['links'])
+    inc = incidence(net)
+    start = time.perf_counter()
+    nodes = {n: node_matrix(base, w, s, params) for n, s in net['nodes'].items()}
+    names = list(nodes)
+    offsets = np.cumsum([0] + [nodes[n]['n'] for n in names])
+    row_off = np.cumsum([0] + [nodes[n]['A_eq'].shape[0] for n in names])
+    n_node, m_eq = offsets[-1], row_off[-1]
+    flow = n_node + np.arange(L * H).reshape(L, H)
+    tx = n_node + L * H + np.arange(L)
+    n = n_node + L * H + L
+
+    rows, cols, vals = [], [], []
+    for i, name in enumerate(names):
+        for j, s in inc[name]:
+            rows.append(row_off[i] + np.arange(H))
+            cols.append(flow[j])
+            vals.append(np.full(H, s))
+    F = sp.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(m_eq, n))
+    A_eq = (sp.hstack([sp.block_diag([nodes[k]['A_eq'] for k in names]), sp.csr_matrix((m_eq, n - n_node))])
+            + F).tocsr()
+    rows = np.arange(2 * L * H)
+    T = sp.csr_matrix((np.concatenate([np.ones(L * H), -np.ones(L * H), -np.ones(2 * L * H)]),
+                       (np.concatenate([rows, rows]),
+                        np.concatenate([flow.ravel(), flow.ravel(), np.repeat(tx, H), np.repeat(tx, H)]))),
+                      shape=(2 * L * H, n))
+    A_node = sp.block_diag([nodes[k]['A_ub'] for k in names])
+    A_ub = sp.vstack([sp.hstack([A_node, sp.csr_matrix((A_node.shape[0], n - n_node))]), T]).tocsr()
+    c = np.concatenate([nodes[k]['c'] for k in names] + [np.zeros(L * H), np.full(L, params['tx_cost'])])
+    bounds = np.vstack([nodes[k]['bounds'] for k in names]
+                       + [np.tile([-FLOW_BOUND_GW, FLOW_BOUND_GW], (L * H, 1)), np.tile([0, np.inf], (L, 1))])
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    res = linprog(c, A_ub=A_ub, b_ub=np.zeros(A_ub.shape[0]), A_eq=A_eq,
+                  b_eq=np.concatenate([nodes[k]['b_eq'] for k in names]), bounds=bounds, method='highs')
+    if res.status != 0:
+        raise RuntimeError(f"Monolithic LP failed: {res.message}")
+    solve_s = time.perf_counter() - start
+    parts = {k: node_results(nodes[k], res.x[offsets[i]:offsets[i + 1]], w, co2) for i, k in enumerate(names)}
+    return {'cost': float(res.fun) * POWER_UNIT, 'tx_cap': float(res.x[tx].sum()) * POWER_UNIT,
+            'co2': sum(p['co2'] for p in parts.values()),
+            'caps': {f'cap_{t}_{k}': parts[k]['caps'][t] for k in names for t in CAPS},
+            'flow': res.x[flow] * POWER_UNIT, 'build_s': build_s, 'solve_s': solve_s,
+            'columns': n, 'rows': A_ub.shape[0] + A_eq.shape[0], 'nnz': A_ub.nnz + A_eq.nnz}
+
+
+def compare(admm, mono):
+    """ADMM vs monolithic: cost, transmission, emissions and capacities with their deviation"""
+    rows = [('cost', admm['cost'], mono['cost']), ('tx_cap', admm['tx_cap'], mono['tx_cap']),
+            ('co2', admm['co2'], mono['co2'])]
+    rows += [(k, admm['caps'][k], mono['caps'][k]) for k in mono['caps']]
+    table = pd.DataFrame(rows, columns=['metric', 'admm', 'monolithic']).set_index('metric')
+    table['diff'] = table['admm'] - table['monolithic']
+    table['diff_pct'] = table['diff'] / table['monolithic'].abs().where(table['monolithic'].abs() > 1e-6) * 100
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assignment 5: ADMM decomposition by node")
+    parser.add_argument('--data', default='baseline_data.csv')
+    parser.add_argument('--resolution', type=int, default=1, help="hours per time step")
+    parser.add_argument('--nodes', type=int, default=2, help="2 = north/south; more = interpolated chain")
+    parser.add_argument('--workers', type=int, nargs='+', default=[None],
+                        help="worker processes (0 = in-process); several values run a scaling comparison")
+    parser.add_argument('--rho', type=float, default=0.1, help="penalty (k€/GW² per hour)")
+    parser.add_argument('--eps-rel', type=float, default=2e-4)
+    parser.add_argument('--cap-tol', type=float, default=1e-3,
+                        help="max relative capacity change per iteration over the last iterations")
+    parser.add_argument('--max-iter', type=int, default=500)
+    args = parser.parse_args()
+
+    raw_data = a5.load_data(args.data)
+    if args.resolution > 1:
+        raw_data = aggregate(raw_data, args.resolution)
+    net = network(a5.PARAMS, args.nodes)
+    print(f"{len(net['nodes'])} nodes, {len(net['links'])} link(s), {len(raw_data)} steps")
+
+    mono = solve_monolithic(raw_data, net)
+    print(f"Monolithic: {mono['columns']:,} columns x {mono['rows']:,} rows ({mono['nnz']:,} nnz), "
+          f"built in {mono['build_s']:.2f} s, solved in {mono['solve_s']:.1f} s, cost {mono['cost']:,.0f}")
+
+    scaling = []
+    for workers in args.workers:
+        print(f"\nADMM with {workers if workers is not None else os.cpu_count()} worker(s):")
+        start = time.perf_counter()
+        out = solve_admm(raw_data, net, workers=workers, rho=args.rho, eps_rel=args.eps_rel,
+                         cap_tol=args.cap_tol, max_iter=args.max_iter)
+        elapsed = time.perf_counter() - start
+        trace = out['trace']
+        scaling.append({'workers': workers if workers is not None else os.cpu_count(), 'iterations': len(trace),
+                        'wall_s': elapsed, 'node_wall_s': trace['sub_wall_s'].sum(),
+                        'node_cpu_s': trace['sub_cpu_s'].sum(), 'link_s': trace['link_s'].sum(),
+                        's_per_iteration': elapsed / len(trace),
+                        'cost_gap_pct': (out['cost'] / mono['cost'] - 1) * 100,
+                        'max_cap_dev_pct': compare(out, mono).drop(['cost', 'co2'])['diff_pct'].abs().max()})
+        print(f"{'Converged' if out['converged'] else 'Stopped'} after {len(trace)} iterations in {elapsed:.1f} s "
+              f"(nodes {trace['sub_wall_s'].sum():.1f} s wall / {trace['sub_cpu_s'].sum():.1f} s cpu, "
+              f"links {trace['link_s'].sum():.2f} s)")
+
+    with pd.option_context('display.width', 200, 'display.float_format', '{:,.3f}'.format):
+        print("\n=== ADMM vs monolithic ===")
+        print(compare(out, mono).to_string())
+        table = compare(out, mono).drop(['cost', 'co2'])
+        worst = table['diff_pct'].abs().idxmax()
+        print(f"max |capacity deviation| {table.loc[worst, 'diff_pct']:+.2f}% ({worst}), "
+              f"max |flow difference| {np.abs(out['flow'] - mono['flow']).max():,.1f} MW")
+        print("\n=== Scaling ===")
+        print(pd.DataFrame(scaling).to_string(index=False))
+    trace.to_csv('admm_trace.csv', index=False)
@@ -1,207 +1,537 @@
 #!/usr/bin/env python3
+import os
+import sys
+import time
+import argparse
 import pulp
+import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tek5410.cache import ResultCache, code_version
+from tek5410.sharedarrays import attach_frame, is_shared_ref
+from tek5410.resolution import (RESOLUTIONS, aggregate, hour_weights, expand, expand_state,
+                                 compare_resolutions, print_report)
+from tek5410.conditioning import (POWER_UNIT, coefficient_ranges, print_ranges, tighten, active_bounds,
+                                   solve_with_stats)
+from tek5410.reduction import reduce_model
+from tek5410.firstorder import solve_pulp
+from tek5410.dispatch import POLICIES, simulate
+
 # ------------------------------------------------------------------
 # 1. Load data
 # ------------------------------------------------------------------
-raw_data = pd.read_csv('baseline_data.csv')
-hours = range(len(raw_data))
 nodes = ['north', 'south']
 technologies = ['wind', 'solar', 'gas', 'batt']   # batt = storage
 storage_tech = ['batt']
 
+
+def load_data(path='baseline_data.csv'):
+    """CSV path, or a 'shm:'/'npy:' reference to arrays shared by a coordinator process"""
+    if is_shared_ref(path):
+        return attach_frame(path)
+    return pd.read_csv(path)
+
+
 # ------------------------------------------------------------------
 # 2. Parameters
 # ------------------------------------------------------------------
-demand_scale = {'north': 0.8, 'south': 1.2}
-wind_scale   = {'north': 1.2, 'south': 0.6}
-solar_scale  = {'north': 0.8, 'south': 1.5}
-
-a    = {'wind':67.653, 'solar':48.140, 'gas':52.041, 'batt':80+320/4}
-vom  = {'wind':2.3,   'solar':0.01,  'gas':4.0,   'batt':0.0}
-fuel = {'wind':0.0,   'solar':0.0,   'gas':21.6,  'batt':0.0}
-eta  = {'batt':0.9}
-dur  = {'batt':4}
-
-# CO₂ intensity (tCO₂/MWh) – constant for gas, 0 for others
-co2_intensity = {
-    'wind': 0.0,
-    'solar':0.0,
-    'gas'  : raw_data['co2_gas'].iloc[0],
-    'batt' : 0.0
+PARAMS = {
+    'demand_scale': {'north': 0.8, 'south': 1.2},
+    'wind_scale':   {'north': 1.2, 'south': 0.6},
+    'solar_scale':  {'north': 0.8, 'south': 1.5},
+
+    'a':    {'wind':67.653, 'solar':48.140, 'gas':52.041, 'batt':80},   # batt: power (MW)
+    'a_energy': {'batt':(320/4)/4},   # per MWh: the 320/4 per MW energy share of a 4 h battery
+    'vom':  {'wind':2.3,   'solar':0.01,  'gas':4.0,   'batt':0.0},
+    'fuel': {'wind':0.0,   'solar':0.0,   'gas':21.6,  'batt':0.0},
+    'eta':  {'batt':0.9},
+    # optional 'dur': {'batt':4} fixes energy = dur * power (the former 80+320/4 per MW model)
+
+    # Transmission
+    'tx_cost': 30.0,                   # €/MW
 }
 
-# Transmission
-tx_cost = 30.0                     # €/MW
-tx_cap  = pulp.LpVariable("CAP_TX", lowBound=0)
-flow    = {h: pulp.LpVariable(f"FLOW_{h}", lowBound=-1e6, upBound=1e6) for h in hours}
 
-# ------------------------------------------------------------------
-# 3. Model
-# ------------------------------------------------------------------
-prob = pulp.LpProblem("TwoNode_System", pulp.LpMinimize)
+def build_model(raw_data, params=PARAMS, condition=False):
+    """
+    Hourly data, or blocks from tek5410.resolution.aggregate (the `weight` column = hours per step).
+    condition=True builds in GW / k€ with data-derived bounds (see tek5410.conditioning).
+    """
+    hours = range(len(raw_data))
+    unit = POWER_UNIT if condition else 1.0
+    w = dict(zip(hours, hour_weights(raw_data).tolist()))
+    demand_scale, wind_scale, solar_scale = params['demand_scale'], params['wind_scale'], params['solar_scale']
+    a, vom, fuel, eta, dur = params['a'], params['vom'], params['fuel'], params['eta'], params.get('dur', {})
+    a_energy = params['a_energy']
+    tx_cost = params['tx_cost']
 
-# Variables
-CAP     = {(t,n): pulp.LpVariable(f"CAP_{t}_{n}", lowBound=0) for t in technologies for n in nodes}
-GEN     = {(t,n,h): pulp.LpVariable(f"GEN_{t}_{n}_{h}", lowBound=0) for t in technologies for n in nodes for h in hours}
-CHARGE  = {(n,h): pulp.LpVariable(f"CHARGE_{n}_{h}", lowBound=0) for n in nodes for h in hours}
-DISCHARGE = {(n,h): pulp.LpVariable(f"DISCHARGE_{n}_{h}", lowBound=0) for n in nodes for h in hours}
-STO     = {(n,h): pulp.LpVariable(f"STO_{n}_{h}", lowBound=0) for n in nodes for h in hours}
+    tx_cap  = pulp.LpVariable("CAP_TX", lowBound=0)
+    flow    = {h: pulp.LpVariable(f"FLOW_{h}", lowBound=-1e6, upBound=1e6) for h in hours}
 
-# ------------------------------------------------------------------
-# 4. Objective
-# ------------------------------------------------------------------
-prob += (
-    pulp.lpSum(a[t]*CAP[t,n] for t in technologies for n in nodes) +
-    tx_cost*tx_cap +
-    pulp.lpSum((vom[t]+fuel[t])*GEN[t,n,h] for t in technologies for n in nodes for h in hours)
-), "TotalSystemCost"
+    # ------------------------------------------------------------------
+    # 3. Model
+    # ------------------------------------------------------------------
+    prob = pulp.LpProblem("TwoNode_System", pulp.LpMinimize)
 
-# ------------------------------------------------------------------
-# 5. Energy balance (per node & hour)
-# ------------------------------------------------------------------
-for n in nodes:
-    for h in hours:
-        demand   = raw_data.loc[h, 'demand'] * demand_scale[n]
-        cf_wind  = raw_data.loc[h, 'cf_wind']  * wind_scale[n]
-        cf_solar = raw_data.loc[h, 'cf_solar'] * solar_scale[n]
+    # Variables
+    CAP     = {(t,n): pulp.LpVariable(f"CAP_{t}_{n}", lowBound=0) for t in technologies for n in nodes}
+    CAPE    = {n: pulp.LpVariable(f"CAPE_batt_{n}", lowBound=0) for n in nodes}   # battery energy (MWh)
+    GEN     = {(t,n,h): pulp.LpVariable(f"GEN_{t}_{n}_{h}", lowBound=0) for t in technologies for n in nodes for h in hours}
+    CHARGE  = {(n,h): pulp.LpVariable(f"CHARGE_{n}_{h}", lowBound=0) for n in nodes for h in hours}
+    DISCHARGE = {(n,h): pulp.LpVariable(f"DISCHARGE_{n}_{h}", lowBound=0) for n in nodes for h in hours}
+    STO     = {(n,h): pulp.LpVariable(f"STO_{n}_{h}", lowBound=0) for n in nodes for h in hours}
 
-        net_flow = flow[h] if n == 'south' else -flow[h]
+    # ------------------------------------------------------------------
+    # 4. Objective
+    # ------------------------------------------------------------------
+    prob += (
+        pulp.lpSum(a[t]*CAP[t,n] for t in technologies for n in nodes) +
+        pulp.lpSum(a_energy['batt']*CAPE[n] for n in nodes) +
+        tx_cost*tx_cap +
+        pulp.lpSum((vom[t]+fuel[t])*w[h]*GEN[t,n,h] for t in technologies for n in nodes for h in hours)
+    ), "TotalSystemCost"
 
-        prob += (
-            GEN['wind',n,h] + GEN['solar',n,h] + GEN['gas',n,h] +
-            DISCHARGE[n,h] + net_flow
-            == demand + CHARGE[n,h],
-            f"Balance_{n}_{h}"
-        )
+    # ------------------------------------------------------------------
+    # 5. Energy balance (per node & hour)
+    # ------------------------------------------------------------------
+    for n in nodes:
+        for h in hours:
+            demand   = raw_data.loc[h, 'demand'] * demand_scale[n] / unit
+            cf_wind  = raw_data.loc[h, 'cf_wind']  * wind_scale[n]
+            cf_solar = raw_data.loc[h, 'cf_solar'] * solar_scale[n]
 
-        # Generation limits
-        prob += GEN['wind',n,h]  <= CAP['wind',n]  * cf_wind
-        prob += GEN['solar',n,h] <= CAP['solar',n] * cf_solar
-        prob += GEN['gas',n,h]   <= CAP['gas',n]
+            net_flow = flow[h] if n == 'south' else -flow[h]
 
-        # Battery power limit (charge + discharge ≤ capacity)
-        prob += CHARGE[n,h] + DISCHARGE[n,h] <= CAP['batt',n]
+            prob += (
+                GEN['wind',n,h] + GEN['solar',n,h] + GEN['gas',n,h] +
+                DISCHARGE[n,h] + net_flow
+                == demand + CHARGE[n,h],
+                f"Balance_{n}_{h}"
+            )
 
-# ------------------------------------------------------------------
-# 6. Storage dynamics
-# ------------------------------------------------------------------
-for n in nodes:
-    # Initial SOC = 0
-    prob += STO[n,0] == 0, f"STO_init_{n}"
+            # Generation limits
+            prob += GEN['wind',n,h]  <= CAP['wind',n]  * cf_wind
+            prob += GEN['solar',n,h] <= CAP['solar',n] * cf_solar
+            prob += GEN['gas',n,h]   <= CAP['gas',n]
+
+            # Battery power limit (charge + discharge ≤ capacity)
+            prob += CHARGE[n,h] + DISCHARGE[n,h] <= CAP['batt',n]
+
+    # ------------------------------------------------------------------
+    # 6. Storage dynamics
+    # ------------------------------------------------------------------
+    for n in nodes:
+        # Initial SOC = 0
+        prob += STO[n,0] == 0, f"STO_init_{n}"
+        if 'batt' in dur:
+            prob += CAPE[n] == dur['batt'] * CAP['batt',n], f"STO_dur_{n}"
+
+        for h in hours:
+            # SOC transition
+            if h == 0:
+                prev = STO[n, hours[-1]]   # wrap-around (optional)
+            else:
+                prev = STO[n, h-1]
+
+            prob += STO[n,h] == prev + w[h]*(eta['batt']*CHARGE[n,h] - DISCHARGE[n,h]), f"SOC_{n}_{h}"
 
+            # Energy capacity limit
+            prob += STO[n,h] <= CAPE[n]
+
+    # ------------------------------------------------------------------
+    # 7. Transmission limits
+    # ------------------------------------------------------------------
     for h in hours:
-        # SOC transition
-        if h == 0:
-            prev = STO[n, hours[-1]]   # wrap-around (optional)
-        else:
-            prev = STO[n, h-1]
+        prob += flow[h] <= tx_cap
+        prob += flow[h] >= -tx_cap
 
-        prob += STO[n,h] == prev + eta['batt']*CHARGE[n,h] - DISCHARGE[n,h], f"SOC_{n}_{h}"
+    # Data-derived bounds instead of the ±1e6 placeholders: flow within total peak demand
+    tightened = []
+    if condition:
+        peak = sum(raw_data['demand'].max() * demand_scale[n] for n in nodes) / unit
+        for h in hours:
+            tighten(flow[h], lower=-peak, upper=peak, record=tightened)
+        tighten(tx_cap, upper=peak, record=tightened)
 
-        # Energy capacity limit (4-hour battery)
-        prob += STO[n,h] <= dur['batt'] * CAP['batt',n]
+    var = {'CAP': CAP, 'CAPE': CAPE, 'GEN': GEN, 'CHARGE': CHARGE, 'DISCHARGE': DISCHARGE, 'STO': STO,
+           'flow': flow, 'tx_cap': tx_cap, 'hours': hours, 'w': w, 'unit': unit, 'tightened': tightened}
+    return prob, var
 
-# ------------------------------------------------------------------
-# 7. Transmission limits
-# ------------------------------------------------------------------
-for h in hours:
-    prob += flow[h] <= tx_cap
-    prob += flow[h] >= -tx_cap
 
 # ------------------------------------------------------------------
 # 8. Solve
 # ------------------------------------------------------------------
-prob.solve()
-print("Status:", pulp.LpStatus[prob.status])
-total_cost = pulp.value(prob.objective)
-print("Total cost (M€):", total_cost)
-print("Transmission capacity (MW):", tx_cap.varValue)
+def solve(prob, var, raw_data, solve_fn=None):
+    CAP, CAPE, GEN, CHARGE, DISCHARGE, STO = (var['CAP'], var['CAPE'], var['GEN'], var['CHARGE'],
+                                              var['DISCHARGE'], var['STO'])
+    flow, tx_cap, hours, w = var['flow'], var['tx_cap'], var['hours'], var['w']
+    unit = var['unit']   # MW and € per model unit (GW / k€ in a conditioned build)
 
-# ------------------------------------------------------------------
-# 9. CO₂ emissions (only from gas)
-# ------------------------------------------------------------------
-total_co2 = sum(
-    co2_intensity['gas'] * GEN['gas', n, h].varValue
-    for n in nodes for h in hours
-) / 1000.0
-print("Total CO₂ emissions (kt):", total_co2)
+    def value(v):
+        return None if v.varValue is None else v.varValue * unit
 
-# ------------------------------------------------------------------
-# 10. Export results
-# ------------------------------------------------------------------
-results = []
+    (solve_fn or pulp.LpProblem.solve)(prob)
+    status = pulp.LpStatus[prob.status]
+    total_cost = pulp.value(prob.objective) * unit
 
-# --- Capacities ---
-for t in technologies:
-    for n in nodes:
-        results.append({
-            'Type': 'Capacity',
-            'Technology': t,
-            'Node': n,
-            'Hour': '-',
-            'Value': CAP[t,n].varValue
-        })
+    # ------------------------------------------------------------------
+    # 9. CO₂ emissions (only from gas)
+    # ------------------------------------------------------------------
+    # CO₂ intensity (tCO₂/MWh) – constant for gas, 0 for others
+    co2_intensity = {
+        'wind': 0.0,
+        'solar':0.0,
+        'gas'  : raw_data['co2_gas'].iloc[0],
+        'batt' : 0.0
+    }
+    total_co2 = sum(
+        co2_intensity['gas'] * w[h] * value(GEN['gas', n, h])
+        for n in nodes for h in hours
+    ) / 1000.0
+
+    # ------------------------------------------------------------------
+    # 10. Collect results (exported rows)
+    # ------------------------------------------------------------------
+    results = []
 
-# --- Generation, charge, discharge, SOC, flow ---
-for h in hours:
-    # Generation (including battery discharge)
+    # --- Capacities ---
     for t in technologies:
         for n in nodes:
             results.append({
-                'Type': 'Generation',
+                'Type': 'Capacity',
                 'Technology': t,
                 'Node': n,
-                'Hour': h,
-                'Value': GEN[t,n,h].varValue
+                'Hour': '-',
+                'Value': value(CAP[t,n])
             })
-
-    # Battery charge & discharge
     for n in nodes:
         results.append({
-            'Type': 'Charge',
-            'Technology': 'batt',
-            'Node': n,
-            'Hour': h,
-            'Value': CHARGE[n,h].varValue
-        })
-        results.append({
-            'Type': 'Discharge',
+            'Type': 'EnergyCapacity',
             'Technology': 'batt',
             'Node': n,
-            'Hour': h,
-            'Value': DISCHARGE[n,h].varValue
+            'Hour': '-',
+            'Value': value(CAPE[n])
         })
+
+    # --- Generation, charge, discharge, SOC, flow ---
+    for h in hours:
+        # Generation (including battery discharge)
+        for t in technologies:
+            for n in nodes:
+                results.append({
+                    'Type': 'Generation',
+                    'Technology': t,
+                    'Node': n,
+                    'Hour': h,
+                    'Value': value(GEN[t,n,h])
+                })
+
+        # Battery charge & discharge
+        for n in nodes:
+            results.append({
+                'Type': 'Charge',
+                'Technology': 'batt',
+                'Node': n,
+                'Hour': h,
+                'Value': value(CHARGE[n,h])
+            })
+            results.append({
+                'Type': 'Discharge',
+                'Technology': 'batt',
+                'Node': n,
+                'Hour': h,
+                'Value': value(DISCHARGE[n,h])
+            })
+            results.append({
+                'Type': 'Storage',
+                'Technology': 'batt',
+                'Node': n,
+                'Hour': h,
+                'Value': value(STO[n,h])
+            })
+
+        # Transmission flow
         results.append({
-            'Type': 'Storage',
-            'Technology': 'batt',
-            'Node': n,
+            'Type': 'Flow',
+            'Technology': 'TX',
+            'Node': 'North-South',
             'Hour': h,
-            'Value': STO[n,h].varValue
+            'Value': value(flow[h])
         })
 
-    # Transmission flow
+    # --- Transmission capacity ---
     results.append({
-        'Type': 'Flow',
+        'Type': 'TransmissionCapacity',
         'Technology': 'TX',
         'Node': 'North-South',
-        'Hour': h,
-        'Value': flow[h].varValue
+        'Hour': '-',
+        'Value': value(tx_cap)
+    })
+
+    # --- Totals ---
+    results.append({'Type': 'COST', 'Technology': '-', 'Node': '-', 'Hour': '-', 'Value': total_cost})
+    results.append({'Type': 'CO2',  'Technology': '-', 'Node': '-', 'Hour': '-', 'Value': total_co2})
+
+    return {
+        'status': status,
+        'total_cost': total_cost,
+        'tx_cap': value(tx_cap),
+        'total_co2': total_co2,
+        'results': pd.DataFrame(results),
+    }
+
+
+def run(raw_data, params=PARAMS, cache=None, condition=False, reduce=False, first_order=None):
+    """
+    Build + solve, or return the stored result if data, parameters and code are unchanged
+    (only optimal solves are stored).
+    first_order: None for CBC, or solve_pulp options ({'tol', 'threads', 'polish', ...}) for the
+    approximate first-order solve (tek5410.firstorder).
+    """
+    cache = cache or ResultCache(enabled=False)
+    version = code_version(__file__, aggregate, tighten, reduce_model, solve_pulp)
+    key = cache.key('assignment5', data=raw_data, params=params, code=version,
+                    condition=condition, reduce=reduce, first_order=first_order)
+
+    def build_and_solve():
+        prob, var = build_model(raw_data, params, condition)
+        solve_fn = (lambda p: solve_pulp(p, **first_order)) if first_order is not None else None
+        if reduce:
+            red = reduce_model(prob, var, strip=True)
+            return solve(prob, var, raw_data, solve_fn=lambda p: red.solve(p, solve_fn))
+        return solve(prob, var, raw_data, solve_fn=solve_fn)
+    return cache.get_or_compute(key, build_and_solve, store_if=lambda out: out['status'] == 'Optimal')
+
+
+def benchmark_conditioning(raw_data, params=PARAMS):
+    """Coefficient ranges, CBC iterations and solve time of the MW/€ vs the conditioned GW/k€ build"""
+    ranges, rows = {}, []
+    for condition in (False, True):
+        label = 'GW/k€' if condition else 'MW/€'
+        prob, var = build_model(raw_data, params, condition)
+        ranges[label] = coefficient_ranges(prob)
+        stats = {}
+        out = solve(prob, var, raw_data, solve_fn=lambda p: stats.update(solve_with_stats(p)))
+        rows.append({'build': label, **stats, **resolution_metrics(out)})
+        active = active_bounds(var['tightened'])
+        if active:
+            print(f"⚠️  {len(active)} tightened bound(s) active, e.g. {active[:3]}")
+
+    print("\n=== Assignment 5: coefficient ranges ===")
+    print_ranges(ranges)
+    table = pd.DataFrame(rows)
+    print("\n=== Assignment 5: solve ===")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(table.to_string(index=False))
+    return table
+
+
+def benchmark_first_order(raw_data, params=PARAMS, tols=(1e-2, 1e-3, 1e-4), threads=1):
+    """CBC vs the first-order solve (with and without polish) on the conditioned build"""
+    rows = []
+    prob, var = build_model(raw_data, params, condition=True)
+    stats = {}
+    out = solve(prob, var, raw_data, solve_fn=lambda p: stats.update(solve_with_stats(p)))
+    rows.append({'solver': 'CBC', 'tol': np.nan, 'status': stats['status'], 'iterations': stats['iterations'],
+                 'wall_s': stats['wall_s'], 'cost': out['total_cost'], 'tx_cap': out['tx_cap']})
+    exact = out['total_cost']
+    for tol in tols:
+        for polish in (False, True):
+            prob, var = build_model(raw_data, params, condition=True)
+            stats = {}
+            out = solve(prob, var, raw_data, solve_fn=lambda p: stats.update(
+                solve_pulp(p, tol=tol, threads=threads, polish=polish)))
+            rows.append({'solver': 'first-order + polish' if polish else 'first-order', 'tol': tol,
+                         'status': stats['status'], 'iterations': stats['iterations'], 'wall_s': stats['wall_s'],
+                         'cost': out['total_cost'], 'tx_cap': out['tx_cap']})
+    table = pd.DataFrame(rows)
+    table['cost_gap_pct'] = (table['cost'] / exact - 1) * 100
+    print(f"\n=== Assignment 5: CBC vs first-order ({threads} thread(s)) ===")
+    with pd.option_context('display.width', 200):
+        print(table.to_string(index=False))
+    return table
+
+
+def to_hourly(results, weights):
+    """
+    Map a multi-hour solution back to the hourly export format read by postprocess.py:
+    power rows (generation, charge, discharge, flow) are constant within a block and the
+    cyclic state of charge is interpolated linearly between block ends.
+    """
+    weights = np.asarray(weights)
+    if np.all(weights == 1):
+        return results
+    timed = results['Hour'] != '-'
+    first, last = np.flatnonzero(timed)[[0, -1]]
+    ts = results[timed].copy()
+    ts['seq'] = ts.groupby('Hour').cumcount()
+    values = ts.pivot(index='Hour', columns='seq', values='Value').sort_index()
+    meta = ts.drop_duplicates('seq').set_index('seq')[['Type', 'Technology', 'Node']]
+
+    n_hours = int(weights.sum())
+    cols = {}
+    for seq in values.columns:
+        v = values[seq].to_numpy()
+        cols[seq] = expand_state(v, weights, initial=v[-1]) if meta.loc[seq, 'Type'] == 'Storage' else expand(v, weights)
+    hourly = pd.DataFrame({
+        'Type': np.tile(meta['Type'].to_numpy(), n_hours),
+        'Technology': np.tile(meta['Technology'].to_numpy(), n_hours),
+        'Node': np.tile(meta['Node'].to_numpy(), n_hours),
+        'Hour': np.repeat(np.arange(n_hours), len(meta)),
+        'Value': np.column_stack([cols[seq] for seq in values.columns]).ravel(),
     })
+    return pd.concat([results.iloc[:first], hourly, results.iloc[last + 1:]], ignore_index=True)
+
+
+def resolution_metrics(out):
+    """Cost, transmission and capacities (for compare_resolutions)"""
+    res = out['results']
+    caps = res[res['Type'] == 'Capacity']
+    energy = res[res['Type'] == 'EnergyCapacity']
+    return {'cost': out['total_cost'], 'tx_cap': out['tx_cap'], 'co2': out['total_co2'],
+            **{f"cap_{t}_{n}": v for t, n, v in zip(caps['Technology'], caps['Node'], caps['Value'])},
+            **{f"cap_{t}_energy_{n}": v for t, n, v in zip(energy['Technology'], energy['Node'], energy['Value'])}}
+
+
+def with_overrides(params, overrides):
+    """Copy of `params` with (nested) overrides applied, e.g. {'a': {'batt': 120}}"""
+    merged = {k: (dict(v) if isinstance(v, dict) else v) for k, v in params.items()}
+    for k, v in overrides.items():
+        if isinstance(v, dict) and isinstance(merged.get(k), dict):
+            merged[k].update(v)
+        else:
+            merged[k] = v
+    return merged
+
+
+def run_job(overrides, data='baseline_data.csv'):
+    """Job-queue entry point (tek5410.jobqueue): parameter overrides + data path or shared ref -> result"""
+    return run(load_data(data), with_overrides(PARAMS, overrides), cache=ResultCache())
+
+
+def benchmark_reduction(raw_data, params=PARAMS):
+    """Reduction report, plus model size and solve time with and without stripping"""
+    rows = []
+    for strip in (False, True):
+        prob, var = build_model(raw_data, params)
+        red = reduce_model(prob, var, strip=strip)
+        if strip:
+            red.print_report("Assignment 5: model reduction")
+        stats = {}
+        out = solve(prob, var, raw_data,
+                    solve_fn=lambda p: red.solve(p, lambda q: stats.update(solve_with_stats(q))))
+        rows.append({'model': 'reduced' if strip else 'original', 'columns': len(prob.variables()),
+                     'rows': len(prob.constraints), **stats, 'cost': out['total_cost'], 'tx_cap': out['tx_cap']})
+    table = pd.DataFrame(rows)
+    print("\n=== Assignment 5: solve ===")
+    print(table.to_string(index=False))
+    return table
+
+
+def simulate_capacities(raw_data, caps, tx_cap, params=PARAMS, policy='reliability'):
+    """
+    Merit-order dispatch (tek5410.dispatch) of given capacities.
+    caps: {tech: (north, south) MW, or an (n, 2) array for a batch}; tx_cap: MW or (n,) array.
+    Emissions are in kt, as in solve().
+    """
+    demand = np.column_stack([raw_data['demand'].to_numpy(float) * params['demand_scale'][n] for n in nodes])
+    cf = {
+        'wind': np.column_stack([raw_data['cf_wind'].to_numpy(float) * params['wind_scale'][n] for n in nodes]),
+        'solar': np.column_stack([raw_data['cf_solar'].to_numpy(float) * params['solar_scale'][n] for n in nodes]),
+        'gas': np.ones((len(raw_data), len(nodes))),   # GEN_gas <= CAP_gas, as in build_model
+    }
+    return simulate(demand, cf, caps, params, tx_cap=tx_cap, weights=hour_weights(raw_data),
+                    co2=raw_data['co2_gas'].iloc[0] / 1000.0, tx_cost=params['tx_cost'], policy=policy)
+
+
+def benchmark_dispatch(raw_data, params=PARAMS, n_mixes=1000, seed=0):
+    """Simulated vs LP cost for the LP capacities, and time per mix for a batch of random mixes"""
+    out = run(raw_data, params)
+    res = out['results']
+    cap = res[res['Type'] == 'Capacity'].set_index(['Technology', 'Node'])['Value']
+    caps = {t: [cap[(t, n)] for n in nodes] for t in technologies}
+    energy = res[res['Type'] == 'EnergyCapacity'].set_index('Node')['Value']
+    caps['batt_energy'] = [energy[n] for n in nodes]
+    for policy in POLICIES:
+        start = time.perf_counter()
+        sim = simulate_capacities(raw_data, caps, out['tx_cap'], params, policy=policy)
+        single = time.perf_counter() - start
+        print(f"LP cost {out['total_cost']:,.0f} | simulated ({policy}) {sim['cost'][0]:,.0f} "
+              f"(+{(sim['cost'][0] / out['total_cost'] - 1) * 100:.1f}%, unserved {sim['unserved'][0]:,.0f} MWh, "
+              f"curtailed {sim['curtailed'][0]:,.0f} MWh) | {single * 1e3:.0f} ms")
+
+    rng = np.random.default_rng(seed)
+    batch = {t: np.asarray(caps[t]) * rng.uniform(0.5, 1.5, (n_mixes, len(nodes))) for t in caps}
+    tx = out['tx_cap'] * rng.uniform(0.5, 1.5, n_mixes)
+    start = time.perf_counter()
+    sims = simulate_capacities(raw_data, batch, tx, params)
+    elapsed = time.perf_counter() - start
+    print(f"{n_mixes} mixes in {elapsed:.2f} s ({elapsed / n_mixes * 1e3:.2f} ms per simulated year); "
+          f"cheapest {sims['cost'].min():,.0f}, {np.mean(sims['unserved'] > 0) * 100:.0f}% with unserved energy")
+    return sims
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assignment 5: two-node capacity expansion with transmission")
+    parser.add_argument('--data', default='baseline_data.csv')
+    parser.add_argument('--no-cache', action='store_true', help="always re-solve (skip the result cache)")
+    parser.add_argument('--resolution', type=int, default=1, help="hours per time step (1, 2, 3, 6, ...)")
+    parser.add_argument('--compare-resolutions', type=int, nargs='*', metavar='H',
+                        help=f"solve at several resolutions and report speedup and deviation (default {list(RESOLUTIONS)})")
+    parser.add_argument('--condition', action='store_true', help="build in GW / k€ with data-derived bounds")
+    parser.add_argument('--benchmark-conditioning', action='store_true',
+                        help="report coefficient ranges, iterations and solve time with and without conditioning")
+    parser.add_argument('--reduce', action='store_true',
+                        help="strip dangling variables and singleton/duplicate rows before the solve")
+    parser.add_argument('--benchmark-reduction', action='store_true',
+                        help="report what the reduction pass finds, and size and solve time before/after")
+    parser.add_argument('--simulate', type=int, nargs='?', const=1000, metavar='N',
+                        help="merit-order dispatch of the LP capacities and of N random mixes (default 1000)")
+    parser.add_argument('--first-order', action='store_true',
+                        help="approximate first-order (PDLP-style) solve instead of CBC, for very large instances")
+    parser.add_argument('--tol', type=float, default=1e-4, help="relative tolerance of the first-order solve")
+    parser.add_argument('--threads', type=int, default=1, help="threads for the first-order matrix products")
+    parser.add_argument('--polish', action='store_true', help="finish the first-order solve with a reduced HiGHS LP")
+    parser.add_argument('--benchmark-first-order', action='store_true',
+                        help="compare CBC with the first-order solve at several tolerances")
+    args = parser.parse_args()
+
+    raw_data = load_data(args.data)
+    if args.benchmark_conditioning:
+        benchmark_conditioning(raw_data, PARAMS)
+        sys.exit(0)
+    if args.benchmark_reduction:
+        benchmark_reduction(raw_data, PARAMS)
+        sys.exit(0)
+    if args.simulate:
+        benchmark_dispatch(raw_data, PARAMS, args.simulate)
+        sys.exit(0)
+    if args.benchmark_first_order:
+        if args.resolution > 1:
+            raw_data = aggregate(raw_data, args.resolution)
+        benchmark_first_order(raw_data, PARAMS, threads=args.threads)
+        sys.exit(0)
+    if args.compare_resolutions is not None:
+        table = compare_resolutions(lambda data: run(data, PARAMS, condition=args.condition), raw_data,
+                                    args.compare_resolutions or RESOLUTIONS, resolution_metrics)
+        print_report(table, "Assignment 5")
+        table.to_csv('resolution_comparison.csv', index=False)
+        sys.exit(0)
+
+    if args.resolution > 1:
+        raw_data = aggregate(raw_data, args.resolution)
+        print(f"Temporal resolution: {args.resolution}h ({len(raw_data)} steps)")
+    cache = ResultCache(enabled=not args.no_cache)
+    first_order = {'tol': args.tol, 'threads': args.threads, 'polish': args.polish} if args.first_order else None
+    out = run(raw_data, PARAMS, cache=cache, condition=args.condition, reduce=args.reduce, first_order=first_order)
+    if cache.hits:
+        print("Result cache: loaded stored solution")
+
+    print("Status:", out['status'])
+    print("Total cost (M€):", out['total_cost'])
+    print("Transmission capacity (MW):", out['tx_cap'])
+    print("Total CO₂ emissions (kt):", out['total_co2'])
 
-# --- Transmission capacity ---
-results.append({
-    'Type': 'TransmissionCapacity',
-    'Technology': 'TX',
-    'Node': 'North-South',
-    'Hour': '-',
-    'Value': tx_cap.varValue
-})
-
-# --- Totals ---
-results.append({'Type': 'COST', 'Technology': '-', 'Node': '-', 'Hour': '-', 'Value': total_cost})
-results.append({'Type': 'CO2',  'Technology': '-', 'Node': '-', 'Hour': '-', 'Value': total_co2})
-
-pd.DataFrame(results).to_csv('assignment5_results.csv', index=False)
-print("Results written to assignment5_results.csv")
\ No newline at end of file
+    to_hourly(out['results'], hour_weights(raw_data)).to_csv('assignment5_results.csv', index=False)
+    print("Results written to assignment5_results.csv")
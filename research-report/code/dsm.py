@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# dsm.py
+"""
+Energy-conserving DSM load shifting, vectorised over hours and scenarios
+Author: Christopher A. Trotter
+
+Flexible load is moved, not removed: within each window the energy shed in
+deficit hours (demand above VRES) equals the energy added in surplus hours
+(VRES above demand), so annual demand is unchanged and every MWh shifted into a
+surplus hour is a MWh less curtailment.
+
+Per window and flexibility class:
+    down room_h = min(GW * availability_h, share * demand_h, deficit_h)
+    up room_h   = min(GW, surplus_h)
+    shifted     = min(sum(down room), sum(up room))
+and each hour takes its pro-rata part of `shifted`. Windows are consecutive
+blocks: 8 h for industrial DSM (load moves about +/-4 h around the block
+centre), 24 h for prosumers. Industrial load is shifted first, prosumer load
+against the updated demand.
+
+All inputs broadcast over leading batch dimensions (..., hours), so a batch of
+scenarios is shifted with a handful of array operations.
+
+Usage:
+    effective = shift_dsm(demand, vres, dsm_ind_gw, dsm_pros_gw, ind_profile, pros_profile)
+"""
+
+import numpy as np
+
+DSM_IND_WINDOW_H = 8
+DSM_PROS_WINDOW_H = 24
+DSM_IND_SHARE = 0.12          # max share of hourly demand that can be shed
+DSM_PROS_SHARE = 0.06
+
+
+def _windows(x, window_h):
+    """(..., H) -> (..., H / window_h, window_h), padding a partial last window with zeros"""
+    x = np.asarray(x, dtype=float)
+    pad = -x.shape[-1] % window_h
+    if pad:
+        x = np.concatenate([x, np.zeros(x.shape[:-1] + (pad,))], axis=-1)
+    return x.reshape(x.shape[:-1] + (-1, window_h))
+
+
+def shift_load(demand, vres, capacity_mw, availability, share, window_h):
+    """
+    Demand after one class of DSM shifts load from deficit to surplus hours within each
+    window. capacity_mw has the batch shape (or is scalar); availability is (H,) or (..., H).
+    Returns (new demand, energy shifted per scenario in MWh).
+    """
+    demand = np.asarray(demand, dtype=float)
+    H = demand.shape[-1]
+    cap = np.asarray(capacity_mw, dtype=float)[..., None]
+    net = _windows(np.asarray(vres, dtype=float) - demand, window_h)
+    down = np.minimum(cap * np.asarray(availability, dtype=float), share * demand)
+    down = np.minimum(_windows(down, window_h), np.maximum(0, -net))
+    up = np.minimum(cap[..., None], np.maximum(0, net))
+
+    down_sum = down.sum(axis=-1, keepdims=True)
+    up_sum = up.sum(axis=-1, keepdims=True)
+    shifted = np.minimum(down_sum, up_sum)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (np.where(up_sum > 0, up * (shifted / up_sum), 0.0)
+                  - np.where(down_sum > 0, down * (shifted / down_sum), 0.0))
+    change = change.reshape(change.shape[:-2] + (-1,))[..., :H]
+    return demand + change, shifted.sum(axis=(-2, -1))
+
+
+def shift_dsm(demand, vres, dsm_ind_gw, dsm_pros_gw, ind_profile, pros_profile,
+              ind_window_h=DSM_IND_WINDOW_H, pros_window_h=DSM_PROS_WINDOW_H):
+    """Industrial then prosumer shifting; returns (effective demand, MWh shifted by each class)"""
+    demand, ind = shift_load(demand, vres, np.asarray(dsm_ind_gw, dtype=float) * 1000, ind_profile,
+                             DSM_IND_SHARE, ind_window_h)
+    demand, pros = shift_load(demand, vres, np.asarray(dsm_pros_gw, dtype=float) * 1000, pros_profile,
+                              DSM_PROS_SHARE, pros_window_h)
+    return demand, {'ind': ind, 'pros': pros}
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# flexibility_lp.py
+"""
+Hourly chronological BESS + DSM flexibility LP for TEK5410
+Full-year dispatch with charge/discharge/SOC, energy-conserving DSM and curtailment
+Sparse vectorized construction (scipy.sparse) solved with HiGHS
+Author: Christopher A. Trotter
+"""
+
+import time
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+# =============================================================================
+# DEFAULT PARAMETERS - SAME ECONOMICS AS THE HEURISTIC MODEL
+# =============================================================================
+CURTAILMENT_VALUE_USD_MWH = 30
+BESS_COST_USD_KWH = 64
+BESS_POWER_COST_USD_KW = 100              # inverter + grid connection, on top of the $/kWh cost
+BESS_CAPITAL_RECOVERY_FACTOR = 0.10
+BESS_ETA_CHARGE = 0.95                     # 0.95 x 0.95 ≈ 90% round trip
+BESS_ETA_DISCHARGE = 0.95
+
+DSM_INDUSTRIAL_COST_USD_MW_YEAR = 50_000
+DSM_PROSUMER_COST_USD_MW_YEAR = 100_000
+DSM_INDUSTRIAL_SHARE = 0.12                # max share of hourly demand that can be shed
+DSM_PROSUMER_SHARE = 0.06
+DSM_WINDOW_H = 24                          # energy is conserved within each daily window
+
+CAP_BOUNDS_GW = {'bess': (0, 20), 'bess_energy': (0, 240), 'dsm_ind': (0, 12), 'dsm_pros': (0, 4)}  # bess_energy in GWh
+
+# Objective is built in k$ to keep the coefficients well scaled
+K_USD = 1e3
+
+
+# =============================================================================
+# SPARSE BUILDING BLOCKS
+# =============================================================================
+class Layout:
+    """Column layout of the LP: named blocks of consecutive variables"""
+
+    def __init__(self):
+        self.blocks = {}
+        self.n = 0
+
+    def add(self, name, size):
+        self.blocks[name] = np.arange(self.n, self.n + size)
+        self.n += size
+        return self.blocks[name]
+
+    def __getitem__(self, name):
+        return self.blocks[name]
+
+
+class RowBuilder:
+    """Collects COO triplets for a block of constraint rows"""
+
+    def __init__(self, n_cols):
+        self.n_cols = n_cols
+        self.rows, self.cols, self.vals, self.rhs = [], [], [], []
+        self.m = 0
+
+    def add(self, terms, rhs):
+        """terms: list of (columns, coefficients) with equal-length arrays per row block"""
+        size = len(np.atleast_1d(rhs))
+        r = np.arange(self.m, self.m + size)
+        for cols, coef in terms:
+            cols = np.broadcast_to(cols, size)
+            self.rows.append(r)
+            self.cols.append(cols)
+            self.vals.append(np.broadcast_to(np.asarray(coef, dtype=float), size))
+        self.rhs.append(np.broadcast_to(np.asarray(rhs, dtype=float), size))
+        self.m += size
+        return r
+
+    def matrix(self):
+        if self.m == 0:
+            return None, None
+        A = sp.csr_matrix((np.concatenate(self.vals),
+                           (np.concatenate(self.rows), np.concatenate(self.cols))),
+                          shape=(self.m, self.n_cols))
+        return A, np.concatenate(self.rhs)
+
+
+def window_ids(T, window_h):
+    """Window index per hour (daily windows for window_h=24)"""
+    return np.arange(T) // window_h
+
+
+# =============================================================================
+# MODEL
+# =============================================================================
+def build_hourly_lp(demand_mw, vres_mw,
+                    bess_cost_usd_kwh=BESS_COST_USD_KWH,
+                    bess_power_cost_usd_kw=BESS_POWER_COST_USD_KW,
+                    bess_duration_h=None,
+                    eta_charge=BESS_ETA_CHARGE, eta_discharge=BESS_ETA_DISCHARGE,
+                    crf=BESS_CAPITAL_RECOVERY_FACTOR,
+                    curtailment_value=CURTAILMENT_VALUE_USD_MWH,
+                    dsm_ind_cost=DSM_INDUSTRIAL_COST_USD_MW_YEAR,
+                    dsm_pros_cost=DSM_PROSUMER_COST_USD_MW_YEAR,
+                    dsm_window_h=DSM_WINDOW_H,
+                    cap_bounds=None):
+    """
+    Build the full-year flexibility LP in matrix form.
+
+    Columns (hourly blocks, GW): charge, discharge, soc, dsm_ind_up, dsm_ind_down,
+    dsm_pros_up, dsm_pros_down, curtail; capacities: bess (GW), bess_energy (GWh),
+    dsm_ind (GW), dsm_pros (GW). Inputs are in MW and converted to GW so all matrix
+    coefficients are O(1).
+
+    BESS power and energy are separate capacities with their own costs, so the solve
+    picks the duration; bess_duration_h fixes energy = duration x power instead.
+
+    Curtailment is valued at `curtailment_value`; battery losses count as curtailed
+    energy so that simultaneous charge/discharge cannot "burn" surplus for credit.
+    Deficit hours are backfilled by the rest of the system, so curtailment is the
+    positive part of the hourly net surplus after flexibility.
+    """
+    demand = np.asarray(demand_mw, dtype=float) / 1000
+    vres = np.asarray(vres_mw, dtype=float) / 1000
+    T = len(demand)
+    bounds_gw = dict(CAP_BOUNDS_GW, **(cap_bounds or {}))
+
+    L = Layout()
+    c, d, s = L.add('charge', T), L.add('discharge', T), L.add('soc', T)
+    ui, di = L.add('dsm_ind_up', T), L.add('dsm_ind_down', T)
+    up, dp = L.add('dsm_pros_up', T), L.add('dsm_pros_down', T)
+    k = L.add('curtail', T)
+    P, E = L.add('bess_gw', 1), L.add('bess_gwh', 1)
+    Di, Dp = L.add('dsm_ind_gw', 1), L.add('dsm_pros_gw', 1)
+
+    # --- Objective (k$/year) ---
+    cost = np.zeros(L.n)
+    val = curtailment_value * 1000 / K_USD                              # $/MWh -> k$/GWh
+    cost[k] = val
+    cost[c] = val            # losses = charge - discharge over a cyclic year
+    cost[d] = -val
+    cost[P] = 1e6 * bess_power_cost_usd_kw * crf / K_USD                # GW x kW/GW x $/kW
+    cost[E] = 1e6 * bess_cost_usd_kwh * crf / K_USD                     # GWh x kWh/GWh x $/kWh
+    cost[Di] = 1000 * dsm_ind_cost / K_USD                              # $/MW-yr -> k$/GW-yr
+    cost[Dp] = 1000 * dsm_pros_cost / K_USD
+
+    # --- Equalities ---
+    eq = RowBuilder(L.n)
+    # Cyclic state of charge
+    eq.add([(s, 1), (np.roll(s, 1), -1), (c, -eta_charge), (d, 1 / eta_discharge)], np.zeros(T))
+    if bess_duration_h is not None:
+        eq.add([(E, 1), (P, -bess_duration_h)], 0.0)
+    # DSM energy conservation per window: sum(up - down) = 0
+    W = window_ids(T, dsm_window_h)
+    n_win = W[-1] + 1
+    dsm_rows = sp.csr_matrix((np.concatenate([np.ones(T), -np.ones(T)]),
+                              (np.concatenate([W, W]), np.concatenate([ui, di]))),
+                             shape=(n_win, L.n))
+    dsm_rows_p = sp.csr_matrix((np.concatenate([np.ones(T), -np.ones(T)]),
+                                (np.concatenate([W, W]), np.concatenate([up, dp]))),
+                               shape=(n_win, L.n))
+    A_eq, b_eq = eq.matrix()
+    A_eq = sp.vstack([A_eq, dsm_rows, dsm_rows_p]).tocsr()
+    b_eq = np.concatenate([b_eq, np.zeros(2 * n_win)])
+
+    # --- Inequalities: hourly limits against capacity variables ---
+    ub = RowBuilder(L.n)
+    # Curtailment: VRES + discharge - charge - demand - shifted load <= curtail
+    ub.add([(k, -1), (d, 1), (c, -1), (ui, -1), (di, 1), (up, -1), (dp, 1)], demand - vres)
+    for block in (c, d):
+        ub.add([(block, 1), (P, -1)], np.zeros(T))
+    ub.add([(s, 1), (E, -1)], np.zeros(T))
+    for block in (ui, di):
+        ub.add([(block, 1), (Di, -1)], np.zeros(T))
+    for block in (up, dp):
+        ub.add([(block, 1), (Dp, -1)], np.zeros(T))
+    A_ub, b_ub = ub.matrix()
+
+    # --- Variable bounds ---
+    lb = np.zeros(L.n)
+    hi = np.full(L.n, np.inf)
+    hi[di] = DSM_INDUSTRIAL_SHARE * demand
+    hi[dp] = DSM_PROSUMER_SHARE * demand
+    for name, col in (('bess', P), ('bess_energy', E), ('dsm_ind', Di), ('dsm_pros', Dp)):
+        lb[col], hi[col] = bounds_gw[name]
+
+    return {
+        'c': cost, 'A_ub': A_ub, 'b_ub': b_ub, 'A_eq': A_eq, 'b_eq': b_eq,
+        'bounds': np.column_stack([lb, hi]), 'layout': L,
+        'demand': demand, 'vres': vres,
+        'params': {
+            'bess_cost_usd_kwh': bess_cost_usd_kwh, 'bess_power_cost_usd_kw': bess_power_cost_usd_kw,
+            'bess_duration_h': bess_duration_h,
+            'crf': crf, 'curtailment_value': curtailment_value,
+            'dsm_ind_cost': dsm_ind_cost, 'dsm_pros_cost': dsm_pros_cost,
+        },
+    }
+
+
+def solve_hourly_lp(lp, time_limit=None, method='highs-ds'):
+    """Solve a built LP with HiGHS (dual simplex by default) and return the scipy result"""
+    options = {'presolve': True}
+    if time_limit is not None:
+        options['time_limit'] = time_limit
+    return linprog(lp['c'], A_ub=lp['A_ub'], b_ub=lp['b_ub'], A_eq=lp['A_eq'], b_eq=lp['b_eq'],
+                   bounds=lp['bounds'], method=method, options=options)
+
+
+def summarize(lp, x):
+    """Economics of a solution in the same fields as the heuristic `results` dict"""
+    L, p = lp['layout'], lp['params']
+    baseline_mwh = np.maximum(0, lp['vres'] - lp['demand']).sum() * 1000
+
+    # Capacities are >= 0; clip solver round-off so an empty build does not print as -0
+    bess_gw = max(0.0, float(x[L['bess_gw']][0]))
+    bess_gwh = max(0.0, float(x[L['bess_gwh']][0]))
+    dsm_ind_gw = max(0.0, float(x[L['dsm_ind_gw']][0]))
+    dsm_pros_gw = max(0.0, float(x[L['dsm_pros_gw']][0]))
+
+    losses_mwh = (x[L['charge']].sum() - x[L['discharge']].sum()) * 1000
+    curtailed_mwh = x[L['curtail']].sum() * 1000 + losses_mwh
+    reduction_mwh = baseline_mwh - curtailed_mwh
+    bess_reduction_mwh = min(max(x[L['discharge']].sum() * 1000, 0.0), max(reduction_mwh, 0.0))
+    dsm_reduction_mwh = max(reduction_mwh - bess_reduction_mwh, 0.0)
+
+    bess_capital_b = (bess_gwh * p['bess_cost_usd_kwh'] + bess_gw * p['bess_power_cost_usd_kw']) * 1e6 / 1e9
+    bess_annual_b = bess_capital_b * p['crf']
+    dsm_total_cost_b = 1000 * (dsm_ind_gw * p['dsm_ind_cost'] + dsm_pros_gw * p['dsm_pros_cost']) / 1e9
+    savings_b = reduction_mwh * p['curtailment_value'] / 1e9
+    total_cost_b = bess_annual_b + dsm_total_cost_b
+
+    return {
+        'bess_gw': bess_gw,
+        'bess_gwh': bess_gwh,
+        'bess_duration_h': bess_gwh / bess_gw if bess_gw > 1e-9 else 0.0,
+        'dsm_ind_gw': dsm_ind_gw,
+        'dsm_pros_gw': dsm_pros_gw,
+        'bess_effect': float(bess_reduction_mwh / baseline_mwh) if baseline_mwh else 0.0,
+        'dsm_effect': float(dsm_reduction_mwh / baseline_mwh) if baseline_mwh else 0.0,
+        'total_effect': float(reduction_mwh / baseline_mwh) if baseline_mwh else 0.0,
+        'reduction_twh': float(reduction_mwh / 1e6),
+        'savings_b': float(savings_b),
+        'bess_annual_b': bess_annual_b,
+        'dsm_total_cost_b': dsm_total_cost_b,
+        'total_cost_b': total_cost_b,
+        'net_benefit_b': float(savings_b - total_cost_b),
+    }
+
+
+def optimize_hourly(demand_mw, vres_mw, time_limit=None, **params):
+    """Build + solve the hourly LP; returns (results, lp, x, info)"""
+    t0 = time.perf_counter()
+    lp = build_hourly_lp(demand_mw, vres_mw, **params)
+    t_build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    res = solve_hourly_lp(lp, time_limit=time_limit)
+    t_solve = time.perf_counter() - t0
+    if res.x is None:
+        raise RuntimeError(f"Hourly flexibility LP failed: {res.message}")
+
+    info = {
+        'status': res.message, 'build_s': t_build, 'solve_s': t_solve,
+        'n_vars': lp['layout'].n,
+        'n_rows': lp['A_ub'].shape[0] + lp['A_eq'].shape[0],
+        'nnz': lp['A_ub'].nnz + lp['A_eq'].nnz,
+    }
+    return summarize(lp, res.x), lp, res.x, info
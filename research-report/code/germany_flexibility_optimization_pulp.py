@@ -5,7 +5,9 @@ import numpy as np
 from pulp import *
 import plotly.graph_objects as go
 import plotly.io as pio
-import os
+import os, sys, time
+import argparse
+from flexibility_lp import optimize_hourly
 pio.renderers.default = "png"
 
 # =============================================================================
@@ -13,6 +15,7 @@ pio.renderers.default = "png"
 # =============================================================================
 CURTAILMENT_VALUE_USD_MWH = 30
 BESS_COST_2035_USD_KWH = 64
+BESS_POWER_COST_USD_KW = 100          # inverter + grid connection, same as flexibility_lp
 BESS_CAPITAL_RECOVERY_FACTOR = 0.10
 HOURS = 8760
 
@@ -20,6 +23,9 @@ HOURS = 8760
 DSM_INDUSTRIAL_COST_USD_MW_YEAR = 50_000  # $50/kW-yr * 1000 = $50k/MW-yr
 DSM_PROSUMER_COST_USD_MW_YEAR = 100_000   # $100/kW-yr * 1000 = $100k/MW-yr
 
+# HOURLY LP - 2035 VRES target share x overbuild, as the 2035 anchor in pathway.py
+HOURLY_VRES_SHARE = 0.85 * 1.10
+
 # =============================================================================
 # GENERATE PROFILES - EXACT 2035 HYBRID VALUES
 # =============================================================================
@@ -58,7 +64,7 @@ def generate_profiles():
     vres_mw = sum(capacities[tech] * 1000 * cfs[tech] for tech in capacities)
     
     # BASELINE CURTAILMENT (NO FLEXIBILITY)
-    baseline_curtailment_mwh = sum(max(0, vres_mw[i] - demand_mw[i]) for i in range(HOURS))
+    baseline_curtailment_mwh = np.maximum(0, vres_mw - demand_mw).sum()
     baseline_twh = baseline_curtailment_mwh / 1e6
     
     print(f"✅ EXACT PROFILES:")
@@ -71,28 +77,36 @@ def generate_profiles():
     pd.DataFrame({'timestamp': timestamp, 'Germany_2035_Hourly_Demand_MW': demand_mw}).to_csv('results/demand_2035.csv', index=False)
     pd.DataFrame({'timestamp': timestamp, 'Germany_2035_VRES_Generation_MW': vres_mw}).to_csv('results/vres_2035.csv', index=False)
     
-    return {'baseline_twh': baseline_twh}
+    return {'baseline_twh': baseline_twh, 'demand_mw': demand_mw, 'vres_mw': vres_mw}
 
 # =============================================================================
 # PULP OPTIMIZATION - ✅ LINEARIZED EXACT HEURISTIC
 # =============================================================================
-def optimize_flexibility(profiles):
-    """✅ EXACTLY REPLICATES 2035_Hybrid_8h: 10GW/8h + $20.7B"""
-    
-    print("🔍 BUILDING LINEARIZED HEURISTIC LP...")
+def optimize_flexibility(profiles, bess_cost_usd_kwh=BESS_COST_2035_USD_KWH,
+                         dsm_ind_cost=DSM_INDUSTRIAL_COST_USD_MW_YEAR, dsm_pros_cost=DSM_PROSUMER_COST_USD_MW_YEAR,
+                         verbose=True):
+    """Linearised heuristic LP: BESS power, BESS energy and DSM that maximise savings - cost.
+    With BESS energy sized separately the 2035 profiles give ~9.8 GW x 8h and 12 GW
+    industrial DSM (~$37.6B net), no longer the heuristic's 2035_Hybrid_8h $20.7B."""
+    
+    if verbose:
+        print("🔍 BUILDING LINEARIZED HEURISTIC LP...")
     model = LpProblem("Germany_2035_Flexibility", LpMaximize)
     
     # === DECISION VARIABLES ===
     bess_gw = LpVariable("BESS_GW", 0, 20)           # 0-20 GW
+    bess_gwh = LpVariable("BESS_GWh", 0, 240)        # 0-240 GWh, sized separately from power
     dsm_ind_gw = LpVariable("DSM_Ind_GW", 0, 12)     # 0-12 GW
     dsm_pros_gw = LpVariable("DSM_Pros_GW", 0, 4)    # 0-4 GW
     
     # === BESS EFFECTIVENESS (LINEARIZED) ===
-    # Original: min(0.70, bess_gw/15) * min(1.0, duration/8)
-    # Fixed duration = 8h → duration_factor = 1.0
-    # So: bess_effect = min(0.70, bess_gw/15)
+    # Original: min(0.70, bess_gw/15) * min(1.0, duration/8), duration = bess_gwh/bess_gw
+    # Concave envelope: min(0.70, bess_gw/15, bess_gwh/120); it is tight whenever
+    # bess_gwh = 8 * bess_gw, which the optimum picks (energy beyond 8h adds nothing,
+    # power beyond bess_gwh/8 adds nothing), so the duration comes out of the solve
     bess_effect = LpVariable("BESS_Effect", 0, 0.70)
     model += bess_effect <= bess_gw / 15.0, "bess_scale"
+    model += bess_effect <= bess_gwh / (8 * 15.0), "bess_energy_scale"
     model += bess_effect <= 0.70, "bess_max"
     
     # === DSM EFFECT (from your profiles: ~25% of total DSM capacity) ===
@@ -108,14 +122,13 @@ def optimize_flexibility(profiles):
     reduction_twh = baseline_twh * total_effect
     
     # === ECONOMICS (EXACT UNITS) ===
-    # BESS: 10GW × 8h = 80 GWh × $64/kWh × 1e6 → $B capex × 10% CRF
-    bess_gwh = 8 * bess_gw  # FIXED 8h duration
-    bess_capital_b = bess_gwh * 1e6 * BESS_COST_2035_USD_KWH / 1e9
+    # BESS: 80 GWh × $64/kWh × 1e6 + 10 GW × $/kW × 1e6 → $B capex × 10% CRF
+    bess_capital_b = (bess_gwh * bess_cost_usd_kwh + bess_gw * BESS_POWER_COST_USD_KW) * 1e6 / 1e9
     bess_annual_b = bess_capital_b * BESS_CAPITAL_RECOVERY_FACTOR
     
     # DSM: GW × $/MW-year × 1000 → $B/year
-    dsm_ind_cost_b = dsm_ind_gw * DSM_INDUSTRIAL_COST_USD_MW_YEAR / 1e9
-    dsm_pros_cost_b = dsm_pros_gw * DSM_PROSUMER_COST_USD_MW_YEAR / 1e9
+    dsm_ind_cost_b = dsm_ind_gw * dsm_ind_cost / 1e9
+    dsm_pros_cost_b = dsm_pros_gw * dsm_pros_cost / 1e9
     dsm_total_cost_b = dsm_ind_cost_b + dsm_pros_cost_b
     
     total_cost_b = bess_annual_b + dsm_total_cost_b
@@ -127,15 +140,18 @@ def optimize_flexibility(profiles):
     model += savings_b - total_cost_b, "Net_Benefit_B"
     
     # === SOLVE ===
-    print("🚀 SOLVING EXACT LINEAR MODEL...")
+    if verbose:
+        print("🚀 SOLVING EXACT LINEAR MODEL...")
     status = model.solve(PULP_CBC_CMD(msg=0))
     
-    print(f"✅ Status: {LpStatus[status]}")
+    if verbose:
+        print(f"✅ Status: {LpStatus[status]}")
     
     # === RESULTS ===
     results = {
         'bess_gw': value(bess_gw),
         'bess_gwh': value(bess_gwh),
+        'bess_duration_h': value(bess_gwh) / value(bess_gw) if value(bess_gw) else 0.0,
         'dsm_ind_gw': value(dsm_ind_gw),
         'dsm_pros_gw': value(dsm_pros_gw),
         'bess_effect': value(bess_effect),
@@ -150,19 +166,198 @@ def optimize_flexibility(profiles):
     }
     
     # === VALIDATION ===
-    print("\n🎯 EXACT 2035 HYBRID 8h RESULTS:")
-    print(f"   🔋 BESS: {results['bess_gw']:.1f} GW × 8h = {results['bess_gwh']:.0f} GWh")
-    print(f"   🏭 DSM: {results['dsm_ind_gw']:.0f} + {results['dsm_pros_gw']:.0f} = {results['dsm_ind_gw']+results['dsm_pros_gw']:.0f} GW")
-    print(f"   🛡️ BESS effect: {results['bess_effect']*100:.0f}%")
-    print(f"   🛡️ DSM effect: {results['dsm_effect']*100:.0f}%")
-    print(f"   📉 Saved: {results['reduction_twh']:.0f} TWh")
-    print(f"   💰 Savings: ${results['savings_b']:.1f}B")
-    print(f"   💸 BESS cost: ${results['bess_annual_b']:.1f}B")
-    print(f"   💸 DSM cost: ${results['dsm_total_cost_b']:.1f}B")
-    print(f"   ✅ NET BENEFIT: ${results['net_benefit_b']:.1f}B")
+    if verbose:
+        print("\n🎯 2035 LP RESULTS:")
+        print(f"   🔋 BESS: {results['bess_gw']:.1f} GW × {results['bess_duration_h']:.1f}h = {results['bess_gwh']:.0f} GWh")
+        print(f"   🏭 DSM: {results['dsm_ind_gw']:.0f} + {results['dsm_pros_gw']:.0f} = {results['dsm_ind_gw']+results['dsm_pros_gw']:.0f} GW")
+        print(f"   🛡️ BESS effect: {results['bess_effect']*100:.0f}%")
+        print(f"   🛡️ DSM effect: {results['dsm_effect']*100:.0f}%")
+        print(f"   📉 Saved: {results['reduction_twh']:.0f} TWh")
+        print(f"   💰 Savings: ${results['savings_b']:.1f}B")
+        print(f"   💸 BESS cost: ${results['bess_annual_b']:.1f}B")
+        print(f"   💸 DSM cost: ${results['dsm_total_cost_b']:.1f}B")
+        print(f"   ✅ NET BENEFIT: ${results['net_benefit_b']:.1f}B")
     
     return results, model
 
+# =============================================================================
+# BATCHED CLOSED FORM - THE SAME LP OVER SCENARIO GRIDS
+# =============================================================================
+# Effect per unit of each option in optimize_flexibility's rows, and its cap
+BESS_GW_PER_EFFECT = 15.0           # bess_scale: bess_effect <= bess_gw / 15
+BESS_GWH_PER_EFFECT = 8 * 15.0      # bess_energy_scale: bess_effect <= bess_gwh / 120
+DSM_EFFECT_PER_GW = 0.25 / 10.0     # dsm_effect = 0.25 * (ind + pros) / 10
+EFFECT_CAPS = np.array([min(0.70, 20 / 15.0, 240 / (8 * 15.0)),   # BESS: bess_max and the variable bounds
+                        12 * DSM_EFFECT_PER_GW, 4 * DSM_EFFECT_PER_GW])
+DSM_MAX, TOTAL_MAX = 0.30, 0.95
+
+
+def optimize_flexibility_batch(baseline_twh, bess_cost_usd_kwh=BESS_COST_2035_USD_KWH,
+                               dsm_ind_cost=DSM_INDUSTRIAL_COST_USD_MW_YEAR,
+                               dsm_pros_cost=DSM_PROSUMER_COST_USD_MW_YEAR,
+                               bess_power_cost_usd_kw=BESS_POWER_COST_USD_KW,
+                               curtailment_value=CURTAILMENT_VALUE_USD_MWH, crf=BESS_CAPITAL_RECOVERY_FACTOR):
+    """
+    optimize_flexibility for many parameter sets at once (arguments broadcast to a common length n),
+    without building or solving an LP. In effect units the LP is a fractional knapsack: BESS,
+    industrial and prosumer DSM each buy curtailment reduction at a constant cost per unit and all
+    earn the same savings per unit; the caps (each option, DSM <= 0.30, total <= 0.95) are nested,
+    so filling the options cheapest first while they earn more than they cost is optimal.
+    BESS is bought at 8 h (15 GW + 120 GWh per unit of effect), as the LP does.
+    Returns optimize_flexibility's results fields as (n,) arrays.
+    """
+    args = np.broadcast_arrays(*[np.atleast_1d(np.asarray(v, dtype=float)) for v in (
+        baseline_twh, bess_cost_usd_kwh, dsm_ind_cost, dsm_pros_cost, bess_power_cost_usd_kw,
+        curtailment_value, crf)])
+    baseline, cost_kwh, ind_cost, pros_cost, cost_kw, value, crf = args
+    n = len(baseline)
+
+    # $B/year per unit of effect
+    benefit = baseline * value * 1e6 / 1e9
+    unit_cost = np.column_stack([
+        (BESS_GWH_PER_EFFECT * cost_kwh + BESS_GW_PER_EFFECT * cost_kw) * 1e6 / 1e9 * crf,
+        ind_cost / DSM_EFFECT_PER_GW / 1e9,
+        pros_cost / DSM_EFFECT_PER_GW / 1e9,
+    ])
+    is_dsm = np.array([False, True, True])
+
+    effect = np.zeros((n, 3))
+    total_left, dsm_left = np.full(n, TOTAL_MAX), np.full(n, DSM_MAX)
+    rows = np.arange(n)
+    for option in np.argsort(unit_cost, axis=1, kind='stable').T:     # cheapest option first
+        room = np.minimum(EFFECT_CAPS[option], total_left)
+        room = np.where(is_dsm[option], np.minimum(room, dsm_left), room)
+        take = np.where(unit_cost[rows, option] < benefit, room, 0.0)
+        effect[rows, option] = take
+        total_left -= take
+        dsm_left -= np.where(is_dsm[option], take, 0.0)
+
+    bess_effect = effect[:, 0]
+    bess_gw, bess_gwh = BESS_GW_PER_EFFECT * bess_effect, BESS_GWH_PER_EFFECT * bess_effect
+    dsm_ind_gw, dsm_pros_gw = effect[:, 1] / DSM_EFFECT_PER_GW, effect[:, 2] / DSM_EFFECT_PER_GW
+    dsm_effect = effect[:, 1] + effect[:, 2]
+    total_effect = bess_effect + dsm_effect
+    reduction_twh = baseline * total_effect
+    savings_b = reduction_twh * value * 1e6 / 1e9
+    bess_annual_b = (bess_gwh * cost_kwh + bess_gw * cost_kw) * 1e6 / 1e9 * crf
+    dsm_total_cost_b = (dsm_ind_gw * ind_cost + dsm_pros_gw * pros_cost) / 1e9
+    total_cost_b = bess_annual_b + dsm_total_cost_b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        duration = np.where(bess_gw > 0, bess_gwh / bess_gw, 0.0)
+    return {
+        'bess_gw': bess_gw,
+        'bess_gwh': bess_gwh,
+        'bess_duration_h': duration,
+        'dsm_ind_gw': dsm_ind_gw,
+        'dsm_pros_gw': dsm_pros_gw,
+        'bess_effect': bess_effect,
+        'dsm_effect': dsm_effect,
+        'total_effect': total_effect,
+        'reduction_twh': reduction_twh,
+        'savings_b': savings_b,
+        'bess_annual_b': bess_annual_b,
+        'dsm_total_cost_b': dsm_total_cost_b,
+        'total_cost_b': total_cost_b,
+        'net_benefit_b': savings_b - total_cost_b,
+    }
+
+
+def flexibility_grid(baseline_twh, bess_cost_usd_kwh, dsm_cost_scale):
+    """Full grid over baseline curtailment x BESS cost x DSM cost (scale on both DSM costs) -> DataFrame"""
+    b, c, d = (g.ravel() for g in np.meshgrid(baseline_twh, bess_cost_usd_kwh, dsm_cost_scale, indexing='ij'))
+    results = optimize_flexibility_batch(b, c, DSM_INDUSTRIAL_COST_USD_MW_YEAR * d,
+                                         DSM_PROSUMER_COST_USD_MW_YEAR * d)
+    return pd.DataFrame({'baseline_twh': b, 'bess_cost_usd_kwh': c, 'dsm_cost_scale': d, **results})
+
+
+def check_points(n=50, seed=0):
+    """
+    Parameter sets spread over the break-even of every option: baseline curtailment from
+    0.001 to 3000 TWh and the two DSM costs scaled independently (x0.1 to x1000), so the
+    checked points include options not bought, partly bought (DSM or total cap binding
+    inside an option) and bought to their cap, not only the all-at-cap optimum of the grid.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'baseline_twh': 10 ** rng.uniform(-3, 3.5, n),
+        'bess_cost_usd_kwh': rng.uniform(20, 200, n),
+        'dsm_ind_cost': DSM_INDUSTRIAL_COST_USD_MW_YEAR * 10 ** rng.uniform(-1, 3, n),
+        'dsm_pros_cost': DSM_PROSUMER_COST_USD_MW_YEAR * 10 ** rng.uniform(-1, 3, n),
+    })
+
+
+def check_grid(grid, samples=50, seed=0):
+    """
+    Largest deviation of the batched net benefit from CBC solves of optimize_flexibility, over
+    `samples` grid rows plus `samples` check_points(). Also returns how often each option came
+    out off / partial / at its cap in the checked points.
+    """
+    rows = grid.sample(min(samples, len(grid)), random_state=seed)
+    points = pd.concat([
+        pd.DataFrame({'baseline_twh': rows['baseline_twh'], 'bess_cost_usd_kwh': rows['bess_cost_usd_kwh'],
+                      'dsm_ind_cost': DSM_INDUSTRIAL_COST_USD_MW_YEAR * rows['dsm_cost_scale'],
+                      'dsm_pros_cost': DSM_PROSUMER_COST_USD_MW_YEAR * rows['dsm_cost_scale']}),
+        check_points(samples, seed)], ignore_index=True)
+    batch = optimize_flexibility_batch(points['baseline_twh'], points['bess_cost_usd_kwh'],
+                                       points['dsm_ind_cost'], points['dsm_pros_cost'])
+    worst = 0.0
+    for i, row in enumerate(points.itertuples()):
+        exact, _ = optimize_flexibility({'baseline_twh': row.baseline_twh}, row.bess_cost_usd_kwh,
+                                        row.dsm_ind_cost, row.dsm_pros_cost, verbose=False)
+        worst = max(worst, abs(exact['net_benefit_b'] - batch['net_benefit_b'][i]))
+
+    effect = np.column_stack([batch['bess_effect'], batch['dsm_ind_gw'] * DSM_EFFECT_PER_GW,
+                              batch['dsm_pros_gw'] * DSM_EFFECT_PER_GW])
+    state = np.where(effect <= 1e-12, 'off', np.where(effect >= EFFECT_CAPS - 1e-12, 'cap', 'partial'))
+    coverage = pd.DataFrame({name: pd.Series(state[:, k]).value_counts()
+                             for k, name in enumerate(['bess', 'dsm_ind', 'dsm_pros'])}).fillna(0).astype(int)
+    return worst, len(points), coverage
+
+# =============================================================================
+# HOURLY CHRONOLOGICAL LP - BESS + DSM DISPATCH OVER THE FULL YEAR
+# =============================================================================
+def hourly_profiles(profiles, vres_share=HOURLY_VRES_SHARE):
+    """Rescale the VRES shape of generate_profiles to `vres_share` x annual demand.
+    The 985 GW fleet is above demand in every hour, so there would be no deficit hours
+    for storage or DSM to shift surplus into and the hourly LP would build nothing."""
+    demand_mw = profiles['demand_mw']
+    vres_mw = profiles['vres_mw'] * (vres_share * demand_mw.sum() / profiles['vres_mw'].sum())
+    deficit_h = int((vres_mw < demand_mw).sum())
+    print(f"   🌞 VRES rescaled to {vres_mw.sum()/1e6:.0f} TWh ({vres_share:.0%} of demand): "
+          f"{deficit_h:,} deficit hours")
+    return {'demand_mw': demand_mw, 'vres_mw': vres_mw,
+            'baseline_twh': np.maximum(0, vres_mw - demand_mw).sum() / 1e6}
+
+
+def optimize_flexibility_hourly(profiles, bess_duration_h=None):
+    """Full-year hourly LP: BESS charge/discharge/SOC, daily DSM shifting, curtailment.
+    BESS power and energy are co-optimised unless bess_duration_h fixes the duration.
+    `profiles` needs deficit hours (see hourly_profiles), otherwise the optimum is no flexibility."""
+
+    print("🔍 BUILDING HOURLY CHRONOLOGICAL LP (sparse)...")
+    results, lp, x, info = optimize_hourly(
+        profiles['demand_mw'], profiles['vres_mw'],
+        bess_cost_usd_kwh=BESS_COST_2035_USD_KWH,
+        bess_power_cost_usd_kw=BESS_POWER_COST_USD_KW,
+        bess_duration_h=bess_duration_h,
+        crf=BESS_CAPITAL_RECOVERY_FACTOR,
+        curtailment_value=CURTAILMENT_VALUE_USD_MWH,
+        dsm_ind_cost=DSM_INDUSTRIAL_COST_USD_MW_YEAR,
+        dsm_pros_cost=DSM_PROSUMER_COST_USD_MW_YEAR,
+    )
+    print(f"✅ Status: {info['status']}")
+    print(f"   ⏱️ Build {info['build_s']:.2f}s | Solve {info['solve_s']:.2f}s | "
+          f"{info['n_vars']:,} vars × {info['n_rows']:,} rows ({info['nnz']:,} nnz)")
+
+    print("\n🎯 HOURLY LP RESULTS:")
+    print(f"   🔋 BESS: {results['bess_gw']:.1f} GW × {results['bess_duration_h']:.1f}h = {results['bess_gwh']:.0f} GWh")
+    print(f"   🏭 DSM: {results['dsm_ind_gw']:.1f} + {results['dsm_pros_gw']:.1f} GW")
+    print(f"   📉 Saved: {results['reduction_twh']:.1f} TWh ({results['total_effect']*100:.1f}%)")
+    print(f"   💰 Savings: ${results['savings_b']:.2f}B | Cost: ${results['total_cost_b']:.2f}B")
+    print(f"   ✅ NET BENEFIT: ${results['net_benefit_b']:.2f}B")
+
+    return results, lp, x
+
 # =============================================================================
 # PLOTTING
 # =============================================================================
@@ -196,7 +391,7 @@ def plot_optimization_results(results):
         ], fill_color='lavender')
     )])
     
-    fig.update_layout(title="🎯 EXACT MATCH: 2035 Hybrid 8h Scenario", width=1000, height=500)
+    fig.update_layout(title="🎯 Linearised LP: 2035 Profiles", width=1000, height=500)
     fig.write_image('plots/pulp/optimization_results.png', scale=2)
     
     # Economics Bar Chart
@@ -220,8 +415,45 @@ def plot_optimization_results(results):
 # MAIN EXECUTION
 # =============================================================================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Germany 2035 BESS+DSM optimization")
+    parser.add_argument('--hourly', action='store_true',
+                        help="solve the full-year hourly chronological LP instead of the heuristic")
+    parser.add_argument('--grid', type=int, metavar='N',
+                        help="batched closed-form solve over an N x N x N grid of curtailment, BESS and DSM cost")
+    args = parser.parse_args()
+
+    if args.grid:
+        baseline_twh = generate_profiles()['baseline_twh']
+        n = args.grid
+        start = time.perf_counter()
+        grid = flexibility_grid(np.linspace(0.25, 1.5, n) * baseline_twh, np.linspace(20, 200, n),
+                                np.linspace(0.5, 3.0, n))
+        elapsed = time.perf_counter() - start
+        print(f"⏱️ {len(grid):,} grid points in {elapsed * 1e3:.1f} ms")
+        start = time.perf_counter()
+        worst, checked, coverage = check_grid(grid)
+        print(f"✅ Max |net benefit - CBC| over {checked} checked points: ${worst:.2e}B "
+              f"(CBC: {(time.perf_counter() - start) / checked * 1e3:.0f} ms per solve)")
+        print("   Options off / partly bought / at cap in the checked points:")
+        print(coverage.reindex(['off', 'partial', 'cap'], fill_value=0).to_string())
+        os.makedirs('results/pulp', exist_ok=True)
+        grid.to_csv('results/pulp/flexibility_grid.csv', index=False)
+        print("✅ Saved: results/pulp/flexibility_grid.csv")
+        sys.exit(0)
+
+    if args.hourly:
+        print("🇩🇪 GERMANY 2035 BESS+DSM OPTIMIZATION - HOURLY CHRONOLOGICAL LP")
+        print("=" * 60)
+        profiles = hourly_profiles(generate_profiles())
+        results, lp, x = optimize_flexibility_hourly(profiles)
+
+        os.makedirs('results/pulp', exist_ok=True)
+        pd.DataFrame([results]).round(2).to_csv('results/pulp/optimized_solution_hourly.csv', index=False)
+        print("\n✅ Saved: results/pulp/optimized_solution_hourly.csv")
+        sys.exit(0)
+
     print("🇩🇪 GERMANY 2035 BESS+DSM OPTIMIZATION")
-    print("🔋 PuLP LINEAR EXACT REPLICA OF HEURISTIC $20.7B RESULT")
+    print("🔋 PuLP LINEARISED HEURISTIC, BESS POWER AND ENERGY SIZED SEPARATELY")
     print("=" * 60)
     
     # 1. Generate exact profiles
@@ -230,13 +462,10 @@ if __name__ == "__main__":
     # 2. Optimize
     results, model = optimize_flexibility(profiles)
     
-    # 3. Validate exact match
+    # 3. Compare with the heuristic (fixed 10 GW / 8 h, so not expected to match)
     print("\n" + "="*60)
-    print("✅ VALIDATION: EXACT HEURISTIC MATCH")
-    print(f"🎯 TARGET: 2035 Hybrid 8h = $20.7B")
-    print(f"✅ ACHIEVED: ${results['net_benefit_b']:.1f}B")
-    match_error = abs(results['net_benefit_b'] - 20.7) / 20.7 * 100
-    print(f"✅ ERROR: {match_error:.3f}%")
+    print("📊 HEURISTIC REFERENCE: 2035 Hybrid 8h = $20.7B")
+    print(f"✅ LP: ${results['net_benefit_b']:.1f}B ({results['net_benefit_b'] - 20.7:+.1f}B)")
     
     # 4. Save results
     os.makedirs('results/pulp', exist_ok=True)
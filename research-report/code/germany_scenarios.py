@@ -9,9 +9,16 @@ Author: Christopher A. Trotter
 
 import pandas as pd
 import numpy as np
-import os, sys
+import os, re, sys
 import plotly.graph_objects as go
 import plotly.io as pio
+from iea_data import get_store, ELECTRICITY_SOURCES
+from residual_index import ResidualLoadIndex
+from dsm import shift_dsm
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from tek5410.cache import ResultCache, code_version
+from tek5410.sharedarrays import SharedArrays, attach
 
 pio.renderers.default = "png"
 
@@ -20,17 +27,39 @@ pio.renderers.default = "png"
 # =============================================================================
 HOURS = 8760
 CURTAILMENT_VALUE_USD_MWH = 30  # $30/MWh avoided curtailment
+BESS_CAPITAL_RECOVERY_FACTOR = 0.10
+VRES_MIX = {'wind_onshore': 0.60, 'wind_offshore': 0.20, 'solar_pv': 0.20}
+BATCH_CHUNK = 256  # scenarios per (chunk, 8760) block in run_scenarios_batch
+BASE_PROFILES = ['demand_shape', 'cf_wind_onshore', 'cf_wind_offshore', 'cf_solar_pv',
+                 'dsm_ind_profile', 'dsm_pros_profile']
 
 # =============================================================================
 # LOAD DYNAMIC BESS COST FORECAST
 # =============================================================================
-def load_bess_cost_forecast(csv_path='data/battery_cost_forecast.csv'):
-    """Load dynamic BESS cost forecast 2024-2035"""
+def load_bess_cost_forecast(csv_path='data/battery_cost_forecast.csv', samples=None, seed=None):
+    """
+    Load dynamic BESS cost forecast 2024-2035 -> {year: USD/kWh}.
+    samples: instead draw this many cost paths from the bootstrap percentile bands
+             (scripts/forecast_battery_cost_curv.py --bootstrap) -> {year: (samples,) array}.
+             One quantile per path is used for every year (a cheap-battery future is cheap
+             in all years); quantiles beyond the outer bands are clamped to them.
+    """
     try:
         df = pd.read_csv(csv_path)
         df['Year'] = df['Year'].astype(int)
         df['Predicted_Cost_USD_per_kWh'] = pd.to_numeric(df['Predicted_Cost_USD_per_kWh'], errors='coerce')
         
+        if samples:
+            bands = [c for c in df.columns if re.fullmatch(r'P[\d.]+_USD_per_kWh', c)]
+            if not bands:
+                raise ValueError(f"no percentile bands in {csv_path}; run "
+                                 "scripts/forecast_battery_cost_curv.py --bootstrap N")
+            q = np.array([float(c[1:-len('_USD_per_kWh')]) for c in bands]) / 100
+            u = np.random.default_rng(seed).uniform(size=samples)
+            values = df[bands].to_numpy(dtype=float)
+            print(f"🔋 BESS COST FORECAST: {samples:,} paths from bands {', '.join(bands)}")
+            return {year: np.interp(u, q, row) for year, row in zip(df['Year'], values)}
+
         print(f"🔋 BESS COST FORECAST LOADED:")
         print(df[['Year', 'Predicted_Cost_USD_per_kWh']].to_string(index=False))
         
@@ -42,24 +71,12 @@ def load_bess_cost_forecast(csv_path='data/battery_cost_forecast.csv'):
 # =============================================================================
 # LOAD IEA ELECTRICITY DATA
 # =============================================================================
-def load_iea_data(csv_path='data/germany_electricity_supply.csv'):
+def load_iea_data(year=2024):
+    """Generation mix for `year` from the indexed IEA store (binary cache, no CSV parsing)"""
     try:
-        print(f"📂 Loading IEA 2024 data: {csv_path}")
-        df = pd.read_csv(csv_path)
-        
-        if df.shape[1] == 4:
-            df.columns = ['technology', 'value', 'year', 'units']
-        else:
-            df = df.iloc[1:].reset_index(drop=True)
-            df.columns = ['technology', 'value', 'year', 'units']
-        
-        df['technology'] = df['technology'].str.strip().str.replace('"', '')
-        df['value'] = pd.to_numeric(df['value'], errors='coerce')
-        df['year'] = pd.to_numeric(df['year'], errors='coerce')
-        df = df.dropna(subset=['value', 'year'])
-        
-        df_2024 = df[df['year'] == 2024].copy()
-        
+        store = get_store()
+        print(f"📂 Loading IEA {year} data: {ELECTRICITY_SOURCES}")
+
         generation = {}
         tech_mapping = {
             'Coal': 'Coal', 'Natural gas': 'Natural gas', 'Wind': 'Wind',
@@ -67,17 +84,17 @@ def load_iea_data(csv_path='data/germany_electricity_supply.csv'):
             'Waste': 'Waste', 'Geothermal': 'Geothermal', 'Other sources': 'Other sources',
             'Oil': 'Oil', 'Nuclear': 'Nuclear'
         }
-        
+
         for tech, exact_name in tech_mapping.items():
-            mask = df_2024['technology'] == exact_name
-            if mask.any():
-                generation[tech] = float(df_2024[mask]['value'].iloc[0])
+            value = store.get(ELECTRICITY_SOURCES, exact_name, year)
+            if value is not None:
+                generation[tech] = value
         
         total_gen_gwh = sum(generation.values())
         vres_gwh = generation.get('Wind', 0) + generation.get('Solar PV', 0)
         vres_share = vres_gwh / total_gen_gwh if total_gen_gwh > 0 else 0
         
-        print(f"\n✅ 2024 SUMMARY:")
+        print(f"\n✅ {year} SUMMARY:")
         print(f"   Total: {total_gen_gwh/1000:.0f} TWh | VRES: {vres_share:.1%}")
         
         return generation, total_gen_gwh / 1000, vres_share
@@ -86,35 +103,126 @@ def load_iea_data(csv_path='data/germany_electricity_supply.csv'):
         print(f"❌ IEA data error: {e}")
         sys.exit(1) # requires IEA data.
 
+def vres_shape(base):
+    """Hourly output of 1 MW of the VRES_MIX fleet (mix-weighted capacity factor)"""
+    return sum(share * base[f'cf_{tech}'] for tech, share in VRES_MIX.items())
+
 # =============================================================================
 # SCENARIO MODEL WITH DYNAMIC BESS COSTS
 # =============================================================================
 class GermanyScenarios:
-    def __init__(self):
+    def __init__(self, seed=None, shared=None):
+        """
+        seed:   fixes the demand noise draw (None = random, as before)
+        shared: 'shm:'/'npy:' reference from share_profiles(); workers attach the
+                base profiles and inputs read-only instead of reloading/rebuilding them
+        """
+        self.seed = seed
+        if shared is not None:
+            arrays = attach(shared)
+            self.demand_2024_twh = float(arrays['demand_2024_twh'][0])
+            self.bess_cost_forecast = dict(zip(arrays['bess_years'].tolist(), arrays['bess_costs'].tolist()))
+            self.base = {k: arrays[k] for k in BASE_PROFILES}
+            return
+
         self.generation_2024, self.demand_2024_twh, self.vres_share_2024 = load_iea_data()
         self.bess_cost_forecast = load_bess_cost_forecast()
+        self.base = self.build_base_profiles(seed)
         
         print(f"\n✅ MODEL READY")
         print(f"   Demand 2024: {self.demand_2024_twh:.0f} TWh")
         print(f"   BESS 2035: ${self.bess_cost_forecast[2035]:.0f}/kWh")
         print(f"   Cost drop 2024→2035: {((192-self.bess_cost_forecast[2035])/192*100):.0f}%")
 
-    def get_bess_cost(self, year):
-        """Get year-specific BESS cost from forecast"""
-        return self.bess_cost_forecast.get(year, self.bess_cost_forecast[2035])
-
-    def generate_demand_profile(self, year, electrification_factor=1.0):
+    @staticmethod
+    def build_base_profiles(seed=None):
+        """Year-independent hourly shapes, built once per model (demand, VRES CFs, DSM availability)"""
+        rng = np.random.default_rng(seed) if seed is not None else np.random
         t = np.arange(HOURS)
+        
+        # Demand shape (mean 1.0)
         seasonal = 0.20 * np.sin(2 * np.pi * t / HOURS)
         daily = 0.25 * np.sin(2 * np.pi * (t % 24) / 24)
         weekly = 0.10 * np.sin(2 * np.pi * t / (HOURS/7) + np.pi)
-        
-        profile = 1.0 + seasonal + daily + weekly + 0.04 * np.random.randn(HOURS)
+        profile = 1.0 + seasonal + daily + weekly + 0.04 * rng.standard_normal(HOURS)
         profile = np.maximum(profile, 0.45)
         
+        # VRES capacity factors
+        cf_wind_onshore = 0.28 * (0.90 + 0.20 * np.sin(2*np.pi*t/HOURS + np.pi/2))
+        cf_wind_onshore += 0.10 * np.sin(2*np.pi*(t%24)/24 + np.pi/3)
+        cf_wind_offshore = 0.45 * (0.95 + 0.15 * np.sin(2*np.pi*t/HOURS))
+        solar_daily = np.maximum(0, np.sin(np.pi * (t % 24) / 12))
+        solar_seasonal = 1 + 0.40 * np.sin(2 * np.pi * t / HOURS + np.pi / 2)
+        
+        # DSM availability
+        weekday = 0.7 + 0.3 * np.sin(2 * np.pi * t / (HOURS/7) + np.pi)
+        business = np.maximum(0, np.sin(np.pi * ((t % 24) - 13) / 5))
+        evening = np.maximum(0, np.sin(np.pi * ((t % 24) - 19) / 3))
+        weekend = 1 + 0.4 * (1 + np.sin(2 * np.pi * t / (HOURS/7)))
+        
+        return {
+            'demand_shape': profile / profile.mean(),
+            'cf_wind_onshore': cf_wind_onshore,
+            'cf_wind_offshore': cf_wind_offshore,
+            'cf_solar_pv': 0.11 * solar_daily * solar_seasonal,
+            'dsm_ind_profile': np.maximum(0.35, weekday * business * 1.2),
+            'dsm_pros_profile': np.maximum(0.25, evening * weekend),
+        }
+
+    def share_profiles(self):
+        """Publish base profiles + inputs in shared memory for worker processes (see run_scenarios_parallel)"""
+        years = sorted(self.bess_cost_forecast)
+        return SharedArrays(dict(
+            self.base,
+            demand_2024_twh=np.array([self.demand_2024_twh]),
+            bess_years=np.array(years, dtype=np.int64),
+            bess_costs=np.array([self.bess_cost_forecast[y] for y in years], dtype=float),
+        ))
+
+    @property
+    def residual_index(self):
+        """Residual-load index of the demand shape vs the VRES mix shape (one sort, built on first use)"""
+        if getattr(self, '_residual_index', None) is None:
+            self._residual_index = ResidualLoadIndex(self.base['demand_shape'], vres_shape(self.base))
+        return self._residual_index
+
+    def baseline_curtailment_twh(self, total_demand_twh, vres_capacity_gw):
+        """sum(max(0, vres - demand)) without flexibility, from the index in O(log H)"""
+        avg_mw = np.asarray(total_demand_twh, dtype=float) * 1e6 / self.base['demand_shape'].sum()
+        k = np.asarray(vres_capacity_gw, dtype=float) * 1000 / avg_mw
+        return avg_mw * self.residual_index.curtailment(k) / 1e6
+
+    def curtailment_curve(self, year, electrification_factor=1.0, vres_capacity_gw=None):
+        """
+        Curtailment, VRES utilisation and residual-load statistics for a range of VRES
+        capacities (GW, default 100-1500) at the year's demand, one row per capacity.
+        """
+        if vres_capacity_gw is None:
+            vres_capacity_gw = np.linspace(100, 1500, 141)
+        vres_capacity_gw = np.asarray(vres_capacity_gw, dtype=float)
+        demand_twh = self.generate_demand_profile(year, electrification_factor).sum() / 1e6
+        avg_mw = demand_twh * 1e6 / self.base['demand_shape'].sum()
+        stats = self.residual_index.stats(vres_capacity_gw * 1000 / avg_mw)
+        return pd.DataFrame({
+            'vres_capacity_gw': vres_capacity_gw,
+            'vres_twh': stats['vres'] * avg_mw / 1e6,
+            'curtailment_twh': stats['curtailment'] * avg_mw / 1e6,
+            'vres_util_pct': np.minimum(100, stats['vres_used'] * avg_mw / 1e6 / demand_twh * 100),
+            'residual_twh': stats['residual_energy'] * avg_mw / 1e6,
+            'surplus_hours': stats['surplus_hours'],
+            'deficit_hours': stats['deficit_hours'],
+            'peak_residual_gw': stats['peak_residual'] * avg_mw / 1000,
+            'peak_surplus_gw': stats['peak_surplus'] * avg_mw / 1000,
+        })
+
+    def get_bess_cost(self, year):
+        """Get year-specific BESS cost from forecast"""
+        return self.bess_cost_forecast.get(year, self.bess_cost_forecast[2035])
+
+    def generate_demand_profile(self, year, electrification_factor=1.0):
         annual_twh = self.demand_2024_twh * (1.02 ** (year - 2024)) * electrification_factor
         avg_mw = annual_twh * 1e6 / HOURS
-        return pd.Series(avg_mw * (profile / profile.mean()), 
+        return pd.Series(avg_mw * self.base['demand_shape'], 
                         index=pd.date_range(f'{year}-01-01', periods=HOURS, freq='h'))
 
     def vres_profile(self, year, vres_target, electrification_factor=1.0):
@@ -122,35 +230,21 @@ class GermanyScenarios:
         total_demand_twh = demand.sum() / 1e6
         vres_capacity_gw = (total_demand_twh / vres_target) * 1.10
         
-        mix = {'wind_onshore': 0.60, 'wind_offshore': 0.20, 'solar_pv': 0.20}
-        capacities = {k: v * vres_capacity_gw for k, v in mix.items()}
-        
-        t = np.arange(HOURS)
-        cfs = {}
-        cfs['wind_onshore'] = 0.28 * (0.90 + 0.20 * np.sin(2*np.pi*t/HOURS + np.pi/2))
-        cfs['wind_onshore'] += 0.10 * np.sin(2*np.pi*(t%24)/24 + np.pi/3)
-        cfs['wind_offshore'] = 0.45 * (0.95 + 0.15 * np.sin(2*np.pi*t/HOURS))
+        capacities = {k: v * vres_capacity_gw for k, v in VRES_MIX.items()}
         
-        solar_daily = np.maximum(0, np.sin(np.pi * (t % 24) / 12))
-        solar_seasonal = 1 + 0.40 * np.sin(2 * np.pi * t / HOURS + np.pi / 2)
-        cfs['solar_pv'] = 0.11 * solar_daily * solar_seasonal
+        cfs = {tech: self.base[f'cf_{tech}'] for tech in capacities}
         
         total_vres = sum(capacities[tech] * 1000 * cfs[tech] for tech in capacities)
         return pd.Series(total_vres, index=demand.index), total_demand_twh, vres_capacity_gw
 
-    def dsm_profile(self, demand, dsm_ind_gw, dsm_pros_gw):
-        t = np.arange(HOURS)
-        weekday = 0.7 + 0.3 * np.sin(2 * np.pi * t / (HOURS/7) + np.pi)
-        business = np.maximum(0, np.sin(np.pi * ((t % 24) - 13) / 5))
-        ind_profile = np.maximum(0.35, weekday * business * 1.2)
-        
-        evening = np.maximum(0, np.sin(np.pi * ((t % 24) - 19) / 3))
-        weekend = 1 + 0.4 * (1 + np.sin(2 * np.pi * t / (HOURS/7)))
-        pros_profile = np.maximum(0.25, evening * weekend)
-        
-        dsm_ind = np.minimum(dsm_ind_gw * 1000 * ind_profile, demand * 0.12)
-        dsm_pros = np.minimum(dsm_pros_gw * 1000 * pros_profile, demand * 0.06)
-        return pd.Series(0.85 * (dsm_ind + dsm_pros), index=demand.index)
+    def dsm_profile(self, demand, dsm_ind_gw, dsm_pros_gw, vres):
+        """
+        Load shifted by DSM (MW, positive = shed, negative = recovered), energy-conserving
+        within each window (see dsm.py); effective demand = demand - dsm_profile
+        """
+        effective, _ = shift_dsm(demand.to_numpy(), np.asarray(vres), dsm_ind_gw, dsm_pros_gw,
+                                 self.base['dsm_ind_profile'], self.base['dsm_pros_profile'])
+        return pd.Series(demand.to_numpy() - effective, index=demand.index)
 
     def run_scenario(self, scenario_name, year=2035, electrification_factor=1.0, 
                      vres_target=0.80, bess_gw=0, dsm_ind_gw=0, dsm_pros_gw=0, bess_duration=4):
@@ -164,12 +258,12 @@ class GermanyScenarios:
         demand = self.generate_demand_profile(year, electrification_factor)
         
         # Baseline curtailment
-        curtailment_no_flex = np.maximum(0, vres_gen - demand).sum() / 1e6
+        curtailment_no_flex = float(self.baseline_curtailment_twh(total_demand_twh, vres_capacity_gw))
         vres_util_no_flex = min(100, (vres_gen.sum() - curtailment_no_flex * 1e6) / total_demand_twh * 100)
         
         # DSM
         if dsm_ind_gw > 0 or dsm_pros_gw > 0:
-            dsm_shift = self.dsm_profile(demand, dsm_ind_gw, dsm_pros_gw)
+            dsm_shift = self.dsm_profile(demand, dsm_ind_gw, dsm_pros_gw, vres_gen)
             effective_demand = demand - dsm_shift
         else:
             effective_demand = demand
@@ -187,7 +281,7 @@ class GermanyScenarios:
         # Economics with DYNAMIC BESS costs
         bess_gwh = bess_gw * bess_duration
         bess_cap_cost = bess_gwh * bess_cost_kwh * 1e6 / 1e9  # $B
-        bess_annual_cost = bess_cap_cost * 0.10
+        bess_annual_cost = bess_cap_cost * BESS_CAPITAL_RECOVERY_FACTOR
         
         dsm_annual_cost = ((dsm_ind_gw * 1000 * 50) + (dsm_pros_gw * 1000 * 100)) * HOURS / 1e9
         
@@ -224,8 +318,64 @@ class GermanyScenarios:
             'bess_effectiveness_pct': round(bess_effectiveness * 100, 1)
         }
 
-    def run_all_scenarios(self):
-        """Multi-year scenarios with dynamic BESS costs"""
+    def run_scenarios_batch(self, year=2035, electrification_factor=1.0, vres_target=0.80, bess_gw=0,
+                            dsm_ind_gw=0, dsm_pros_gw=0, bess_duration=4,
+                            curtailment_value=CURTAILMENT_VALUE_USD_MWH, crf=BESS_CAPITAL_RECOVERY_FACTOR,
+                            bess_cost=None, chunk=BATCH_CHUNK):
+        """
+        run_scenario for many parameter sets at once (arguments broadcast to a common length n).
+        Same formulas, unrounded, as arrays: {'curtailment_no_flex_twh', 'curtailment_flex_twh',
+        'curtailment_reduction_twh', 'bess_annual_cost_busd', 'dsm_annual_cost_busd',
+        'curtailment_savings_busd', 'total_cost_busd', 'net_benefit_busd'}.
+        bess_cost (USD/kWh) overrides the forecast for `year`, e.g. with sampled cost paths
+        from load_bess_cost_forecast(samples=n).
+        Hourly work is done `chunk` scenarios at a time as (chunk, 8760) arrays.
+        """
+        args = np.broadcast_arrays(*[np.atleast_1d(np.asarray(v, dtype=float)) for v in (
+            year, electrification_factor, vres_target, bess_gw, dsm_ind_gw, dsm_pros_gw,
+            bess_duration, curtailment_value, crf, np.nan if bess_cost is None else bess_cost)])
+        year, elec, vres_target, bess_gw, dsm_ind, dsm_pros, duration, value, crf, cost = args
+        n = len(year)
+        if bess_cost is None:
+            years, which = np.unique(year, return_inverse=True)
+            bess_cost = np.array([self.get_bess_cost(int(y)) for y in years])[which]
+        else:
+            bess_cost = cost
+
+        shape = self.base['demand_shape']
+        vres_hourly = vres_shape(self.base)
+        avg_mw = self.demand_2024_twh * (1.02 ** (year - 2024)) * elec * 1e6 / HOURS
+        demand_twh = avg_mw * shape.sum() / 1e6
+        vres_capacity_gw = demand_twh / vres_target * 1.10
+
+        no_flex = self.baseline_curtailment_twh(demand_twh, vres_capacity_gw)
+        raw = np.empty(n)
+        for i in range(0, n, chunk):
+            sl = slice(i, i + chunk)
+            demand = avg_mw[sl, None] * shape
+            vres = vres_capacity_gw[sl, None] * 1000 * vres_hourly
+            demand, _ = shift_dsm(demand, vres, dsm_ind[sl], dsm_pros[sl],
+                                  self.base['dsm_ind_profile'], self.base['dsm_pros_profile'])
+            raw[sl] = np.maximum(0, vres - demand).sum(axis=1) / 1e6
+
+        bess_effectiveness = np.minimum(0.70, bess_gw / 15.0) * np.minimum(1.0, duration / 8.0)
+        flex = raw * (1 - bess_effectiveness)
+        bess_annual = bess_gw * duration * bess_cost * 1e6 / 1e9 * crf
+        dsm_annual = ((dsm_ind * 1000 * 50) + (dsm_pros * 1000 * 100)) * HOURS / 1e9
+        savings = (no_flex - flex) * value * 1e6 / 1e9
+        return {
+            'curtailment_no_flex_twh': no_flex,
+            'curtailment_flex_twh': flex,
+            'curtailment_reduction_twh': no_flex - flex,
+            'bess_annual_cost_busd': bess_annual,
+            'dsm_annual_cost_busd': dsm_annual,
+            'curtailment_savings_busd': savings,
+            'total_cost_busd': bess_annual + dsm_annual,
+            'net_benefit_busd': savings - bess_annual - dsm_annual,
+        }
+
+    def run_all_scenarios(self, cache=None):
+        """Multi-year scenarios with dynamic BESS costs (optionally served from a ResultCache)"""
         scenarios = [
             # Baseline scenarios (no flexibility)
             ('2024_Baseline', 2024, 1.00, 0.421, 0, 0, 0, 4),
@@ -248,15 +398,37 @@ class GermanyScenarios:
         ]
         
         print("\n🔍 RUNNING MULTI-YEAR SCENARIOS...")
+        cache = cache or ResultCache(enabled=False)
+        version = code_version(__file__, get_store, ResidualLoadIndex, shift_dsm)
         results = []
-        for name, yr, elec, vres_t, bess, dsm_ind, dsm_pros, bess_dur in scenarios:
+        for scenario in scenarios:
+            name, yr, elec, vres_t, bess, dsm_ind, dsm_pros, bess_dur = scenario
             bess_cost = self.get_bess_cost(yr)
-            print(f"   {name} ({yr}) | BESS: ${bess_cost:.0f}/kWh")
-            result = self.run_scenario(name, yr, elec, vres_t, bess, dsm_ind, dsm_pros, bess_dur)
+            key = cache.key('germany_scenarios', scenario=scenario, bess_cost=bess_cost,
+                            demand_2024_twh=self.demand_2024_twh, base=self.base, code=version)
+            result = cache.get(key)
+            source = "cached" if result is not None else "solved"
+            if result is None:
+                result = self.run_scenario(name, yr, elec, vres_t, bess, dsm_ind, dsm_pros, bess_dur)
+                cache.put(key, result)
+            print(f"   {name} ({yr}) | BESS: ${bess_cost:.0f}/kWh | {source}")
             results.append(result)
         
         return pd.DataFrame(results)
 
+    def run_scenarios_parallel(self, scenarios, workers=None):
+        """
+        Evaluate scenario tuples (name, year, elec, vres_target, bess_gw, dsm_ind, dsm_pros, dur)
+        in worker processes that attach the base profiles from shared memory (zero-copy).
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        with self.share_profiles() as shared:
+            with ProcessPoolExecutor(workers, initializer=_init_scenario_worker,
+                                     initargs=(shared.ref,)) as pool:
+                results = list(pool.map(_run_scenario_worker, scenarios,
+                                        chunksize=max(1, len(scenarios) // (4 * (workers or os.cpu_count())))))
+        return pd.DataFrame(results)
+
     def save_profiles(self):
         os.makedirs('results', exist_ok=True)
         os.makedirs('plots/profiles', exist_ok=True)
@@ -264,7 +436,7 @@ class GermanyScenarios:
         # 2035 Optimal profiles
         demand = self.generate_demand_profile(2035, 1.20)
         vres_gen, demand_twh, vres_gw = self.vres_profile(2035, 0.85, 1.20)
-        dsm = self.dsm_profile(demand, 8, 2)
+        dsm = self.dsm_profile(demand, 8, 2, vres_gen)
         
         # Calculate effective demand and curtailment for plotting
         effective_demand = demand - dsm
@@ -369,6 +541,18 @@ class GermanyScenarios:
         print("   🌞 plots/profiles/daily_peak_2035.png")
         print("   🔄 plots/profiles/dsm_profile_2035.png")
 
+# =============================================================================
+# PARALLEL WORKERS (SHARED-MEMORY BASE PROFILES)
+# =============================================================================
+_WORKER_MODEL = None
+
+def _init_scenario_worker(ref):
+    global _WORKER_MODEL
+    _WORKER_MODEL = GermanyScenarios(shared=ref)
+
+def _run_scenario_worker(scenario):
+    return _WORKER_MODEL.run_scenario(*scenario)
+
 # =============================================================================
 # PLOTTING FUNCTIONS
 # =============================================================================
@@ -433,14 +617,14 @@ if __name__ == "__main__":
     print("🔋 Dynamic BESS Cost Forecast | 2024-2035 Scenarios")
     print("=" * 60)
     
-    # Initialize model
-    model = GermanyScenarios()
+    # Initialize model (seeded demand noise, so re-runs produce the same cache keys)
+    model = GermanyScenarios(seed=0)
     
     # Generate profiles
     model.save_profiles()
     
-    # Run scenarios
-    results_df = model.run_all_scenarios()
+    # Run scenarios (re-runs with unchanged inputs are served from the result cache)
+    results_df = model.run_all_scenarios(cache=ResultCache(enabled='--no-cache' not in sys.argv))
     
     # Display results
     print("\n📊 RESULTS BY YEAR & BESS DURATION")
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# iea_data.py
+"""
+Indexed IEA dataset store for TEK5410
+Parses every IEA CSV export once into a typed binary cache (.npz),
+invalidated by file mtime/size + content hash, indexed by (indicator, technology, year)
+Author: Christopher A. Trotter
+"""
+
+import csv
+import hashlib
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIRS = [
+    os.path.join(CODE_DIR, '..', 'data'),   # raw IEA exports
+    os.path.join(CODE_DIR, 'data'),         # model inputs (germany_*_supply.csv)
+]
+CACHE_PATH = os.path.join(CODE_DIR, 'data', '.iea_cache.npz')
+CACHE_VERSION = 1
+
+# Indicators used by the model and the supply scripts
+ELECTRICITY_SOURCES = "electricity generation sources in Germany"
+TOTAL_ENERGY_SUPPLY_2024 = "Total energy supply, Germany, 2024"
+
+# Technology label for single-series exports (Year, Indicator, Units)
+TOTAL = "Total"
+
+
+# =============================================================================
+# CSV PARSING (ONLY ON CACHE MISS)
+# =============================================================================
+def _clean(text):
+    return text.strip().strip('"').strip()
+
+
+def parse_iea_csv(path):
+    """
+    Parse one IEA export. Two layouts exist:
+      "<indicator>",Value,Year,Units   -> one row per technology and year
+      Year,"<indicator>",Units         -> single series (technology = TOTAL)
+    Returns a list of (indicator, technology, year, value, units) or [] for non-IEA files.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        try:
+            header = [_clean(h) for h in next(reader)]
+        except StopIteration:
+            return []
+
+        records = []
+        if len(header) == 4 and header[1:] == ['Value', 'Year', 'Units']:
+            indicator = header[0]
+            for row in reader:
+                if len(row) < 4 or _clean(row[1]) == '':
+                    continue
+                records.append((indicator, _clean(row[0]), int(_clean(row[2])),
+                                float(_clean(row[1])), _clean(row[3])))
+        elif len(header) == 3 and header[0] == 'Year' and header[2] == 'Units':
+            indicator = header[1]
+            for row in reader:
+                if len(row) < 3 or _clean(row[1]) == '':
+                    continue
+                records.append((indicator, TOTAL, int(_clean(row[0])),
+                                float(_clean(row[1])), _clean(row[2])))
+        return records
+
+
+def discover_sources(data_dirs=None):
+    """All CSV files in the IEA data directories, sorted for a stable cache"""
+    paths = []
+    for d in data_dirs or DATA_DIRS:
+        d = os.path.normpath(d)
+        if os.path.isdir(d):
+            paths += [os.path.join(d, f) for f in sorted(os.listdir(d)) if f.endswith('.csv')]
+    return paths
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+class IEAStore:
+    """In-memory view of the cached IEA records with a (indicator, technology, year) index"""
+
+    def __init__(self, indicator, technology, year, value, units):
+        self.indicator = indicator
+        self.technology = technology
+        self.year = year
+        self.value = value
+        self.units = units
+        self._index = {key: i for i, key in enumerate(zip(indicator.tolist(),
+                                                           technology.tolist(),
+                                                           year.tolist()))}
+        self._by_indicator = defaultdict(list)
+        for i, ind in enumerate(indicator.tolist()):
+            self._by_indicator[ind].append(i)
+
+    # --- Construction -------------------------------------------------------
+    @classmethod
+    def load(cls, cache_path=CACHE_PATH, data_dirs=None, rebuild=False, verbose=False):
+        """Load from the binary cache, re-parsing the CSVs only if a source changed"""
+        sources = discover_sources(data_dirs)
+        if not rebuild and os.path.exists(cache_path):
+            store = cls._from_cache(cache_path, sources)
+            if store is not None:
+                return store
+        if verbose:
+            print(f"📂 Parsing {len(sources)} IEA files → {cache_path}")
+        return cls._build(cache_path, sources)
+
+    @classmethod
+    def _from_cache(cls, cache_path, sources):
+        with np.load(cache_path, allow_pickle=False) as z:
+            if int(z['version']) != CACHE_VERSION or z['src_path'].tolist() != sources:
+                return None
+            arrays = {k: z[k] for k in z.files}
+
+        changed = False
+        for i, path in enumerate(sources):
+            mtime, size = _stat(path)
+            if mtime == arrays['src_mtime'][i] and size == arrays['src_size'][i]:
+                continue
+            # Touched but possibly identical content: fall back to the hash
+            if size != arrays['src_size'][i] or _file_hash(path) != arrays['src_sha1'][i]:
+                return None
+            arrays['src_mtime'][i] = mtime
+            changed = True
+        if changed:
+            np.savez(cache_path, **arrays)
+        return cls(arrays['indicator'], arrays['technology'], arrays['year'],
+                   arrays['value'], arrays['units'])
+
+    @classmethod
+    def _build(cls, cache_path, sources):
+        seen = {}
+        for path in sources:
+            for rec in parse_iea_csv(path):
+                seen.setdefault(rec[:3], rec)   # duplicate exports: first file wins
+        records = list(seen.values())           # keep file order (as printed by the scripts)
+
+        indicator = np.array([r[0] for r in records], dtype=str)
+        technology = np.array([r[1] for r in records], dtype=str)
+        year = np.array([r[2] for r in records], dtype=np.int32)
+        value = np.array([r[3] for r in records], dtype=np.float64)
+        units = np.array([r[4] for r in records], dtype=str)
+
+        stats = [_stat(p) for p in sources]
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        np.savez(cache_path,
+                 version=np.int32(CACHE_VERSION),
+                 indicator=indicator, technology=technology, year=year,
+                 value=value, units=units,
+                 src_path=np.array(sources, dtype=str),
+                 src_mtime=np.array([s[0] for s in stats], dtype=np.int64),
+                 src_size=np.array([s[1] for s in stats], dtype=np.int64),
+                 src_sha1=np.array([_file_hash(p) for p in sources], dtype=str))
+        return cls(indicator, technology, year, value, units)
+
+    # --- Lookups ------------------------------------------------------------
+    def indicators(self):
+        return sorted(self._by_indicator)
+
+    def get(self, indicator, technology=TOTAL, year=None, default=None):
+        """Single value for (indicator, technology, year)"""
+        i = self._index.get((indicator, technology, year))
+        return default if i is None else float(self.value[i])
+
+    def unit(self, indicator):
+        rows = self._by_indicator.get(indicator)
+        return str(self.units[rows[0]]) if rows else None
+
+    def technologies(self, indicator):
+        rows = self._by_indicator.get(indicator, [])
+        return sorted(set(self.technology[rows].tolist()))
+
+    def years(self, indicator):
+        rows = self._by_indicator.get(indicator, [])
+        return sorted(set(self.year[rows].tolist()))
+
+    def series(self, indicator, technology=TOTAL):
+        """(years, values) arrays for one technology, sorted by year"""
+        rows = np.array(self._by_indicator.get(indicator, []), dtype=int)
+        rows = rows[self.technology[rows] == technology]
+        return self.year[rows].copy(), self.value[rows].copy()
+
+    def year_values(self, indicator, year):
+        """{technology: value} for one indicator and year"""
+        rows = np.array(self._by_indicator.get(indicator, []), dtype=int)
+        rows = rows[self.year[rows] == year]
+        return dict(zip(self.technology[rows].tolist(), self.value[rows].tolist()))
+
+    # --- Aggregations -------------------------------------------------------
+    def total(self, indicator, year, technologies=None):
+        values = self.year_values(indicator, year)
+        if technologies is not None:
+            values = {t: v for t, v in values.items() if t in technologies}
+        return sum(values.values())
+
+    def shares(self, indicator, year):
+        """{technology: share of the year total}"""
+        values = self.year_values(indicator, year)
+        total = sum(values.values())
+        return {t: (v / total if total else 0.0) for t, v in values.items()}
+
+    def grouped(self, indicator, year, groups):
+        """
+        Sum values into groups: `groups` maps technology -> group name.
+        Technologies not in the mapping are dropped (as in the supply scripts).
+        """
+        totals = defaultdict(float)
+        for tech, v in self.year_values(indicator, year).items():
+            if tech in groups:
+                totals[groups[tech]] += v
+        return dict(totals)
+
+    def grouped_shares(self, indicator, year, groups):
+        """{group: (value, share)} for any year"""
+        totals = self.grouped(indicator, year, groups)
+        grand_total = sum(totals.values())
+        return {g: (v, v / grand_total if grand_total else 0.0) for g, v in totals.items()}
+
+
+_STORE = None
+
+
+def get_store(**kwargs):
+    """Process-wide store (loaded lazily from the binary cache)"""
+    global _STORE
+    if _STORE is None or kwargs:
+        _STORE = IEAStore.load(**kwargs)
+    return _STORE
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+if __name__ == "__main__":
+    rebuild = '--rebuild' in sys.argv
+    store = get_store(rebuild=rebuild, verbose=True)
+    print(f"✅ IEA store: {len(store.value)} records | {len(store.indicators())} indicators")
+    for ind in store.indicators():
+        yrs = store.years(ind)
+        print(f"   {ind} [{store.unit(ind)}] {yrs[0]}–{yrs[-1]} | {len(store.technologies(ind))} series")
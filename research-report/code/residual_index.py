@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# residual_index.py
+"""
+Precomputed residual-load index: curtailment vs VRES scaling in O(log H)
+Author: Christopher A. Trotter
+
+For demand d_h and a VRES profile v_h scaled by k, hour h curtails
+k v_h - d_h when d_h / v_h < k. Sorting hours by that ratio once and keeping
+prefix sums of v and d gives, for any k,
+    curtailment(k) = k * sum(v over ratio < k) - sum(d over ratio < k)
+from a single binary search. Curtailment is piecewise linear in k with a
+breakpoint at each hour's ratio.
+
+Peak residual load max_h(d_h - k v_h) and peak surplus max_h(k v_h - d_h) are
+upper envelopes of H lines in k; both envelopes are built once (convex hull
+trick) and also answer in O(log H).
+
+Usage:
+    idx = ResidualLoadIndex(demand_mw, vres_mw)
+    idx.curtailment(1.3)                       # MWh at 1.3 x the VRES profile
+    idx.stats(np.linspace(0.5, 3, 1000))       # DataFrame, one row per k
+
+    python residual_index.py                   # check and time against brute force
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _upper_envelope(intercepts, slopes):
+    """
+    Upper envelope of the lines y = a + b k. Returns (breaks, a, b): line i is the maximum
+    for breaks[i-1] <= k < breaks[i] (len(breaks) = len(a) - 1).
+    """
+    order = np.lexsort((intercepts, slopes))
+    a_sorted, b_sorted = intercepts[order], slopes[order]
+    # equal slopes: only the highest intercept (last after lexsort) can be on the envelope
+    keep = np.append(b_sorted[1:] != b_sorted[:-1], True)
+    hull_a, hull_b = [], []
+    for a, b in zip(a_sorted[keep].tolist(), b_sorted[keep].tolist()):
+        while len(hull_a) >= 2:
+            a1, b1, a2, b2 = hull_a[-2], hull_b[-2], hull_a[-1], hull_b[-1]
+            # the middle line is redundant if the new one overtakes line 1 no later than line 2 does
+            if (a1 - a) * (b2 - b1) <= (a1 - a2) * (b - b1):
+                hull_a.pop()
+                hull_b.pop()
+            else:
+                break
+        hull_a.append(a)
+        hull_b.append(b)
+    a, b = np.array(hull_a), np.array(hull_b)
+    breaks = (a[:-1] - a[1:]) / (b[1:] - b[:-1])
+    return breaks, a, b
+
+
+def _evaluate_envelope(envelope, k):
+    breaks, a, b = envelope
+    i = np.searchsorted(breaks, k, side='right')
+    return a[i] + b[i] * k
+
+
+class ResidualLoadIndex:
+    """Sorted demand/VRES ratios with prefix sums; queries accept scalars or arrays of k"""
+
+    def __init__(self, demand, vres):
+        demand = np.asarray(demand, dtype=float)
+        vres = np.asarray(vres, dtype=float)
+        if demand.shape != vres.shape:
+            raise ValueError(f"demand and vres must have the same shape, got {demand.shape} and {vres.shape}")
+        self.hours = len(demand)
+        self.total_demand = demand.sum()
+        self.total_vres = vres.sum()
+
+        windy = vres > 0                       # hours without VRES never curtail
+        ratio = demand[windy] / vres[windy]
+        order = np.argsort(ratio, kind='stable')
+        self.ratio = ratio[order]
+        self.cum_vres = np.concatenate([[0.0], np.cumsum(vres[windy][order])])
+        self.cum_demand = np.concatenate([[0.0], np.cumsum(demand[windy][order])])
+        self.always_deficit = int(np.count_nonzero(~windy & (demand > 0)))
+
+        self._residual = _upper_envelope(demand, -vres)
+        self._surplus = _upper_envelope(-demand, vres)
+
+    def _split(self, k):
+        """Number of hours with ratio < k (the curtailing hours)"""
+        return np.searchsorted(self.ratio, k, side='left')
+
+    def curtailment(self, k):
+        """sum_h max(0, k v_h - d_h)"""
+        k = np.asarray(k, dtype=float)
+        j = self._split(k)
+        return k * self.cum_vres[j] - self.cum_demand[j]
+
+    def stats(self, k):
+        """Curtailment, VRES use, residual energy and hour counts, peaks, one row per k"""
+        k = np.atleast_1d(np.asarray(k, dtype=float))
+        j = self._split(k)
+        curtailed = k * self.cum_vres[j] - self.cum_demand[j]
+        generated = k * self.total_vres
+        deficit_hours = len(self.ratio) - np.searchsorted(self.ratio, k, side='right') + self.always_deficit
+        return pd.DataFrame({
+            'k': k,
+            'vres': generated,
+            'curtailment': curtailed,
+            'vres_used': generated - curtailed,
+            'vres_utilisation': np.divide(generated - curtailed, generated, out=np.ones_like(k),
+                                          where=generated > 0),
+            'residual_energy': self.total_demand - generated + curtailed,
+            'surplus_hours': j,
+            'deficit_hours': deficit_hours,
+            'peak_residual': np.maximum(0, _evaluate_envelope(self._residual, k)),
+            'peak_surplus': np.maximum(0, _evaluate_envelope(self._surplus, k)),
+        })
+
+
+# =============================================================================
+# CHECK + TIMING AGAINST THE BRUTE FORCE SUM
+# =============================================================================
+if __name__ == "__main__":
+    from germany_scenarios import GermanyScenarios, vres_shape
+
+    model = GermanyScenarios(seed=0)
+    demand = model.base['demand_shape']
+    vres = vres_shape(model.base)
+
+    t0 = time.perf_counter()
+    idx = ResidualLoadIndex(demand, vres)
+    t_build = time.perf_counter() - t0
+
+    ks = np.linspace(0.2, 4.0, 10_000)
+    t0 = time.perf_counter()
+    table = idx.stats(ks)
+    t_index = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    brute = np.array([np.maximum(0, k * vres - demand).sum() for k in ks])
+    peak = np.array([np.maximum(0, (demand - k * vres).max()) for k in ks])
+    t_brute = time.perf_counter() - t0
+
+    err = np.max(np.abs(table['curtailment'] - brute) / np.maximum(brute, 1e-9 * demand.sum()))
+    err_peak = np.max(np.abs(table['peak_residual'] - peak))
+    print(f"\n📈 RESIDUAL-LOAD INDEX ({idx.hours} h): build {t_build * 1e3:.1f} ms | "
+          f"{len(ks):,} k values in {t_index * 1e3:.1f} ms ({t_index / len(ks) * 1e6:.2f} µs each) | "
+          f"brute force {t_brute:.2f} s")
+    print(f"   max relative curtailment error {err:.1e} | max peak residual error {err_peak:.1e}")
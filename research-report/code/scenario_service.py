@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# scenario_service.py
+"""
+Long-lived what-if service for GermanyScenarios on localhost
+Author: Christopher A. Trotter
+
+Loads the IEA data, the BESS cost forecast and the base profiles once, builds
+the residual-load index, and then answers JSON queries over HTTP. Each request
+runs in its own thread (ThreadingHTTPServer); the model is read-only after
+start-up, so concurrent clients need no locking. Every response carries its
+server-side time in `elapsed_ms` (and the X-Elapsed-ms header); /stats keeps
+per-endpoint counts and latency percentiles.
+
+Endpoints:
+    GET  /health                      model summary and uptime
+    GET  /stats                       requests and latency per endpoint
+    POST /scenario  {"year": 2035, "bess_gw": 10, ...}           run_scenario
+    POST /batch     {"year": 2035, "bess_gw": [0, 5, 10], ...}   run_scenarios_batch (lists)
+    POST /curve     {"year": 2035, "electrification_factor": 1.2, "vres_capacity_gw": [...]}
+
+Usage:
+    python scenario_service.py serve --port 8765
+    python scenario_service.py query scenario '{"year": 2035, "bess_gw": 10, "bess_duration": 8}'
+    python scenario_service.py bench --clients 8 --requests 400
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+DEFAULT_PORT = 8765
+SCENARIO_ARGS = ('year', 'electrification_factor', 'vres_target', 'bess_gw', 'dsm_ind_gw', 'dsm_pros_gw',
+                 'bess_duration')
+BATCH_ARGS = SCENARIO_ARGS + ('curtailment_value', 'crf', 'bess_cost')
+LATENCY_WINDOW = 10_000     # latest requests kept per endpoint for the percentiles
+
+
+def _jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    return value
+
+
+class ScenarioService:
+    """The hot model plus request statistics; handlers are plain methods taking a dict"""
+
+    def __init__(self, model):
+        self.model = model
+        model.residual_index              # build now, not inside the first concurrent request
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)
+
+    # --- endpoints ---
+    def health(self, _):
+        return {'status': 'ok', 'uptime_s': time.time() - self.started,
+                'demand_2024_twh': self.model.demand_2024_twh,
+                'bess_years': sorted(self.model.bess_cost_forecast)}
+
+    def stats(self, _):
+        with self.lock:
+            snapshot = {k: list(v) for k, v in self.latency.items()}
+        return {name: {'requests': len(ms), 'mean_ms': float(np.mean(ms)),
+                       'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95)),
+                       'max_ms': float(np.max(ms))}
+                for name, ms in snapshot.items() if ms}
+
+    def scenario(self, body):
+        kwargs = {k: body[k] for k in SCENARIO_ARGS if k in body}
+        if 'year' in kwargs:
+            kwargs['year'] = int(kwargs['year'])
+        return self.model.run_scenario(body.get('scenario', 'query'), **kwargs)
+
+    def batch(self, body):
+        kwargs = {k: np.asarray(body[k], dtype=float) for k in BATCH_ARGS if k in body}
+        return self.model.run_scenarios_batch(**kwargs)
+
+    def curve(self, body):
+        table = self.model.curtailment_curve(int(body.get('year', 2035)),
+                                             float(body.get('electrification_factor', 1.0)),
+                                             body.get('vres_capacity_gw'))
+        return table.to_dict(orient='list')
+
+    ROUTES = {('GET', '/health'): 'health', ('GET', '/stats'): 'stats',
+              ('POST', '/scenario'): 'scenario', ('POST', '/batch'): 'batch', ('POST', '/curve'): 'curve'}
+
+    def handle(self, method, path, body):
+        """(status, payload) for one request, timed"""
+        start = time.perf_counter()
+        name = self.ROUTES.get((method, path))
+        if name is None:
+            return 404, {'error': f"no route {method} {path}", 'routes': [f"{m} {p}" for m, p in self.ROUTES]}
+        if not isinstance(body, dict):
+            return 400, {'error': f"request body must be a JSON object, got {type(body).__name__}"}
+        try:
+            result = getattr(self, name)(body)
+            status = 200
+        except (TypeError, ValueError, KeyError) as e:
+            result, status = {'error': f"{type(e).__name__}: {e}"}, 400
+        except Exception as e:                      # a bug, not a bad query: still answer the client
+            result, status = {'error': f"internal error: {type(e).__name__}: {e}"}, 500
+        elapsed_ms = (time.perf_counter() - start) * 1e3
+        if status == 200:
+            with self.lock:
+                samples = self.latency[name]
+                samples.append(elapsed_ms)
+                del samples[:-LATENCY_WINDOW]
+        return status, {'result': _jsonable(result), 'elapsed_ms': elapsed_ms} if status == 200 else result
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'       # keep-alive for repeated queries from one client
+
+        def _reply(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            if 'elapsed_ms' in payload:
+                self.send_header('X-Elapsed-ms', f"{payload['elapsed_ms']:.3f}")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._reply(*service.handle('GET', self.path, {}))
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except json.JSONDecodeError as e:
+                self._reply(400, {'error': f"invalid JSON: {e}"})
+                return
+            self._reply(*service.handle('POST', self.path, body))
+
+        def log_message(self, fmt, *args):
+            pass                                # per-request timing is in /stats
+
+    return Handler
+
+
+def serve(port=DEFAULT_PORT, seed=0):
+    t0 = time.perf_counter()
+    from germany_scenarios import GermanyScenarios
+
+    service = ScenarioService(GermanyScenarios(seed=seed))
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(service))
+    print(f"\n🛰️  Scenario service on http://127.0.0.1:{port} (model loaded in {time.perf_counter() - t0:.1f} s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+def query(endpoint, payload=None, port=DEFAULT_PORT, timeout=60):
+    """POST payload (or GET without one) to the service; returns the decoded JSON ({'error': ...} on 4xx/5xx)"""
+    url = f"http://127.0.0.1:{port}/{endpoint.lstrip('/')}"
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        with e:
+            return json.loads(e.read() or b'{}') or {'error': f"HTTP {e.code}"}
+
+
+def bench(clients, requests, port=DEFAULT_PORT, seed=0):
+    """`clients` threads sending random /scenario queries; prints client-side and server-side latency"""
+    rng = np.random.default_rng(seed)
+    payloads = [{'year': int(rng.integers(2024, 2036)), 'electrification_factor': float(rng.uniform(1.0, 1.3)),
+                 'vres_target': float(rng.uniform(0.6, 0.95)), 'bess_gw': float(rng.uniform(0, 20)),
+                 'bess_duration': float(rng.uniform(2, 12)), 'dsm_ind_gw': float(rng.uniform(0, 12)),
+                 'dsm_pros_gw': float(rng.uniform(0, 4))} for _ in range(requests)]
+
+    def one(payload):
+        start = time.perf_counter()
+        reply = query('scenario', payload, port)
+        return (time.perf_counter() - start) * 1e3, reply['elapsed_ms']
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        timings = np.array(list(pool.map(one, payloads)))
+    wall = time.perf_counter() - start
+    print(f"{requests} requests from {clients} clients in {wall:.2f} s ({requests / wall:.0f} req/s)")
+    for label, ms in (('round trip', timings[:, 0]), ('server', timings[:, 1])):
+        print(f"  {label:10s} p50 {np.percentile(ms, 50):6.2f} ms | p95 {np.percentile(ms, 95):6.2f} ms | "
+              f"max {ms.max():6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory what-if service for GermanyScenarios")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('serve')
+    p.add_argument('--port', type=int, default=DEFAULT_PORT)
+    p.add_argument('--seed', type=int, default=0)
+    p = sub.add_parser('query')
+    p.add_argument('endpoint', help="health, stats, scenario, batch or curve")
+    p.add_argument('payload', nargs='?', help="JSON body (omit for GET endpoints)")
+    p.add_argument('--port', type=int, default=DEFAULT_PORT)
+    p = sub.add_parser('bench')
+    p.add_argument('--clients', type=int, default=8)
+    p.add_argument('--requests', type=int, default=400)
+    p.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.port, args.seed)
+    elif args.command == 'query':
+        reply = query(args.endpoint, json.loads(args.payload) if args.payload else None, args.port)
+        json.dump(reply, sys.stdout, indent=2)
+        print()
+        if 'error' in reply:
+            sys.exit(1)
+    else:
+        bench(args.clients, args.requests, args.port)
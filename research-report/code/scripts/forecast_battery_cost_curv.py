@@ -1,55 +1,219 @@
 # scripts/forecast_battery_cost_curv.py
+"""
+Battery cost forecast 2024-2035: point fit plus optional bootstrap bands
+
+Point forecast: one exponential decay fit (as before) -> Predicted_Cost_USD_per_kWh.
+    a * exp(-b (year - 2010)) + c
+It is an unbounded least-squares fit in USD/kWh.
+
+--bootstrap N: N residual-resampling refits, run in parallel processes and
+written as percentile columns (P5_USD_per_kWh ... P95_USD_per_kWh) next to the
+point forecast. Cost errors are multiplicative (a 2010 miss of 300 USD/kWh is
+12%, a 2024 one 150%), so the residuals are log ratios to the point curve and
+each replicate is point curve * exp(resampled log residuals). Every replicate
+is refitted in log space with non-negative parameters, which keeps the curve
+positive. The bands therefore come from bounded log-space fits, while the
+point forecast comes from the unbounded absolute fit. Their medians differ by a
+few percent. Most of the late-year spread is the floor c, which 15 points
+barely pin down.
+
+Curve families: exponential decay, a logistic step down to a floor and a power
+law in years since 2009 (a time-based experience curve), each fitted in log
+space with non-negative parameters and ranked by AICc on the log residuals.
+The ranking is printed on every run. On the 15 points exponential fits best
+(AICc -36.3), logistic is close (-35.4, but its floor sits at 166 USD/kWh from
+2027 on) and the power law is far behind (-23.2). --family picks the family
+the bootstrap bands come from: by default the best one, so the CSVs stay on
+the exponential curve. For the other families the residuals are taken around
+their own log-space fit.
+
+A Wright learning curve on a deployment proxy was tried and dropped: without a
+deployment series it predicted 2025 above the 2024 actual.
+
+Usage:
+    python forecast_battery_cost_curv.py                                 # point forecast only
+    python forecast_battery_cost_curv.py --bootstrap 5000 --workers 4 --no-plot
+    python forecast_battery_cost_curv.py --bootstrap 5000 --family logistic --output /tmp/logistic.csv
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
-import csv
 
 # Historical data
 years = np.array([2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018, 2019,
                   2020, 2021, 2022, 2023, 2024])
 cost_usd_per_kwh = np.array([2571, 1450, 1370, 1130, 1180, 1050, 750, 540, 480, 230,
                              220, 210, 300, 140, 192])
+future_years = np.arange(2025, 2036)
+
+BAND_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+CHUNK = 250                       # refits per worker task
+P0 = (2500, 0.1, 100)
+
 
 # Exponential decay function
 def exp_decay(x, a, b, c):
     return a * np.exp(-b * (x - 2010)) + c
 
-# Fit curve using historical data
-params, covariance = curve_fit(exp_decay, years, cost_usd_per_kwh, p0=(2500, 0.1, 100))
 
-# Forecast for 2025 to 2035
-future_years = np.arange(2025, 2036)
-predicted_costs = exp_decay(future_years, *params)
-
-# Combine 2024 actual with forecast
-all_years = np.concatenate(([2024], future_years))
-all_costs = np.concatenate(([192], predicted_costs))
-
-# Calculate year-over-year improvement (positive for cost reduction)
-yoy_improvement = [None]  # No improvement for 2024
-for i in range(1, len(all_costs)):
-    improvement = (all_costs[i-1] - all_costs[i]) / all_costs[i-1] * 100
-    yoy_improvement.append(round(improvement, 2))
-
-# Plot results
-plt.figure(figsize=(10,6))
-# Historical data as a connected line
-plt.plot(years, cost_usd_per_kwh, 'purple', marker='o', label='Historical Cost')
-# Forecast data as a dashed line
-plt.plot(all_years, all_costs, 'r--', marker='o', label='Forecasted Cost')
-plt.xlabel('Year')
-plt.ylabel('Battery Cost (USD/kWh)')
-plt.title('Battery Cost Forecast 2024-2035')
-plt.legend()
-plt.grid(True)
-plt.show()
-
-# Save forecast to CSV including YoY improvement
-csv_filename = "battery_cost_forecast.csv"
-with open(csv_filename, mode='w', newline='') as file:
-    writer = csv.writer(file)
-    writer.writerow(["Year", "Predicted_Cost_USD_per_kWh", "YoY_Improvement_%"])
-    for year, cost, improvement in zip(all_years, all_costs, yoy_improvement):
-        writer.writerow([year, round(cost, 2), improvement])
-
-print(f"Forecast saved to {csv_filename}")
+# Logistic step from a + c down to the floor c, centred on year m
+def logistic(x, a, k, m, c):
+    return a / (1 + np.exp(k * (x - m))) + c
+
+
+# Power law in years since 2009 (time-based experience curve)
+def power_law(x, a, b, c):
+    return a * (x - 2009) ** -b + c
+
+
+# name -> (curve, start point, lower bounds); upper bounds are +inf
+FAMILIES = {
+    'exponential': (exp_decay, P0, (0, 0, 0)),
+    'logistic': (logistic, (2500, 0.3, 2015, 100), (0, 0, -np.inf, 0)),
+    'power': (power_law, (2500, 0.5, 10), (0, 0, 0)),
+}
+
+
+def point_fit():
+    """Unbounded least-squares fit in USD/kWh (the Predicted_Cost_USD_per_kWh column)"""
+    params, _ = curve_fit(exp_decay, years, cost_usd_per_kwh, p0=P0)
+    return params
+
+
+def log_fit(y, p0, family='exponential'):
+    """Refit in log space with the family's lower bounds"""
+    curve, _, lower = FAMILIES[family]
+    params, _ = curve_fit(lambda x, *p: np.log(curve(x, *p)), years, np.log(y), p0=p0,
+                          bounds=(lower, np.inf), maxfev=5000)
+    return params
+
+
+def compare_families():
+    """Log-space fit of every family to the history -> rows sorted by AICc (best first)"""
+    n = len(years)
+    rows = []
+    for name, (curve, p0, _) in FAMILIES.items():
+        params = log_fit(cost_usd_per_kwh, p0, name)
+        sse = float(np.sum(np.log(cost_usd_per_kwh / curve(years, *params)) ** 2))
+        k = len(params)
+        rows.append({'family': name, 'log_sse': sse,
+                     'aicc': n * np.log(sse / n) + 2 * k + 2 * k * (k + 1) / (n - k - 1),
+                     'cost_2035': float(curve(future_years[-1], *params))})
+    return sorted(rows, key=lambda r: r['aicc'])
+
+
+def _refits(task):
+    """Worker: `n` refits on resampled log residuals of the family's base curve -> (n_ok, len(future_years))"""
+    n, seed, family = task
+    curve, p0, _ = FAMILIES[family]
+    # exponential: the point curve (as before); other families: their own log-space fit
+    params = point_fit() if family == 'exponential' else log_fit(cost_usd_per_kwh, p0, family)
+    fitted = curve(years, *params)
+    resid = np.log(cost_usd_per_kwh / fitted)
+    p0 = np.maximum(params, 1e-6)                # start inside the non-negative bounds
+    rng = np.random.default_rng(seed)
+    out = []
+    with np.errstate(over='ignore', divide='ignore'):
+        for _ in range(n):
+            y = fitted * np.exp(rng.choice(resid, size=len(years), replace=True))
+            try:
+                p = log_fit(y, p0, family)
+            except (RuntimeError, ValueError):
+                continue                      # refit did not converge: drop the replicate
+            out.append(curve(future_years, *p))
+    return np.array(out).reshape(-1, len(future_years))
+
+
+def bootstrap_bands(n_boot, workers=None, seed=0, percentiles=BAND_PERCENTILES, family='exponential'):
+    """Bootstrap forecasts -> ({percentile: costs per future year}, (n_ok, years) draws)"""
+    chunks = range(0, n_boot, CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(min(CHUNK, n_boot - start), s, family) for start, s in zip(chunks, seeds)]
+    if workers == 0:
+        results = list(map(_refits, tasks))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_refits, tasks))
+    draws = np.vstack(results)
+    return dict(zip(percentiles, np.percentile(draws, percentiles, axis=0))), draws
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Battery cost forecast (point fit + optional bootstrap bands)")
+    parser.add_argument('--bootstrap', type=int, default=0, help="bootstrap refits of the --family curve (0 = point forecast only)")
+    parser.add_argument('--family', choices=['best', *FAMILIES], default='best',
+                        help="curve family for the bootstrap bands (default: lowest AICc)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all CPUs, 0 = in-process)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default="battery_cost_forecast.csv")
+    parser.add_argument('--no-plot', action='store_true')
+    args = parser.parse_args()
+
+    # Rank the curve families on the history
+    ranking = compare_families()
+    print("Curve families (log-space fits, best first):")
+    for r in ranking:
+        print(f"  {r['family']:<12} log SSE {r['log_sse']:.3f} | AICc {r['aicc']:7.2f} | 2035 {r['cost_2035']:6.1f} USD/kWh")
+    family = ranking[0]['family'] if args.family == 'best' else args.family
+    print(f"Best fit: {ranking[0]['family']}")
+
+    # Fit curve using historical data
+    params = point_fit()
+
+    # Forecast for 2025 to 2035
+    predicted_costs = exp_decay(future_years, *params)
+
+    # Combine 2024 actual with forecast
+    all_years = np.concatenate(([2024], future_years))
+    all_costs = np.concatenate(([192], predicted_costs))
+
+    # Calculate year-over-year improvement (positive for cost reduction)
+    yoy_improvement = [None]  # No improvement for 2024
+    for i in range(1, len(all_costs)):
+        improvement = (all_costs[i-1] - all_costs[i]) / all_costs[i-1] * 100
+        yoy_improvement.append(round(improvement, 2))
+
+    bands = {}
+    if args.bootstrap:
+        t0 = time.perf_counter()
+        bands, draws = bootstrap_bands(args.bootstrap, args.workers, args.seed, family=family)
+        elapsed = time.perf_counter() - t0
+        print(f"Bootstrap ({family}): {len(draws):,} of {args.bootstrap:,} refits converged in {elapsed:.1f} s")
+        # 2024 is observed: the band collapses onto the actual cost
+        bands = {p: np.concatenate(([192], v)) for p, v in bands.items()}
+        print(f"2035 cost: point {all_costs[-1]:.1f} | "
+              + " | ".join(f"P{p} {v[-1]:.1f}" for p, v in bands.items()))
+
+    # Plot results
+    if not args.no_plot:
+        plt.figure(figsize=(10,6))
+        # Historical data as a connected line
+        plt.plot(years, cost_usd_per_kwh, 'purple', marker='o', label='Historical Cost')
+        # Forecast data as a dashed line
+        plt.plot(all_years, all_costs, 'r--', marker='o', label='Forecasted Cost')
+        if bands:
+            lo, hi = BAND_PERCENTILES[0], BAND_PERCENTILES[-1]
+            plt.fill_between(all_years, bands[lo], bands[hi], color='r', alpha=0.15, label=f'P{lo}-P{hi} (bootstrap)')
+        plt.xlabel('Year')
+        plt.ylabel('Battery Cost (USD/kWh)')
+        plt.title('Battery Cost Forecast 2024-2035')
+        plt.legend()
+        plt.grid(True)
+        plt.show()
+
+    # Save forecast to CSV including YoY improvement (and percentile bands)
+    csv_filename = args.output
+    with open(csv_filename, mode='w', newline='') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(["Year", "Predicted_Cost_USD_per_kWh", "YoY_Improvement_%"]
+                        + [f"P{p}_USD_per_kWh" for p in bands])
+        for i, (year, cost, improvement) in enumerate(zip(all_years, all_costs, yoy_improvement)):
+            writer.writerow([year, round(cost, 2), improvement] + [round(v[i], 2) for v in bands.values()])
+
+    print(f"Forecast saved to {os.path.abspath(csv_filename)}")
@@ -1,8 +1,10 @@
-import csv
-from collections import defaultdict
+import os
+import sys
 
-# Path to your CSV file
-filepath = "germany_electricity_supply.csv"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from iea_data import get_store, ELECTRICITY_SOURCES
+
+YEAR = 2024
 
 # Grouping rules to match germany_energy_supply.csv categories
 GROUPS = {
@@ -24,34 +26,14 @@ GROUPS = {
     "Waste": "Biofuels and waste",
 }
 
-totals_2024 = defaultdict(float)
-
-with open(filepath, newline="", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        source = row['electricity generation sources in Germany'].strip('"')
-        year = int(row["Year"])
-        value_str = row["Value"].strip()
-
-        # skip empty values
-        if value_str == "":
-            continue
-
-        value = float(value_str)
-
-        # process only 2024
-        if year == 2024:
-            if source in GROUPS:
-                group = GROUPS[source]
-                totals_2024[group] += value
-
-# Calculate total electricity generation in 2024
-grand_total = sum(totals_2024.values())
+# Grouped totals and shares straight from the indexed IEA store
+store = get_store()
+shares = store.grouped_shares(ELECTRICITY_SOURCES, YEAR, GROUPS)
+grand_total = sum(value for value, _ in shares.values())
 
 # Print grouped percentages
-print("Electricity Supply Percentages by Group (Germany, 2024)\n")
-for group, value in totals_2024.items():
-    pct = (value / grand_total) * 100
-    print(f"{group:35s}: {pct:.2f}%   ({value:.0f} GWh)")
+print(f"Electricity Supply Percentages by Group (Germany, {YEAR})\n")
+for group, (value, share) in shares.items():
+    print(f"{group:35s}: {share * 100:.2f}%   ({value:.0f} GWh)")
 
-print(f"\nTotal (2024): {grand_total:.0f} GWh")
+print(f"\nTotal ({YEAR}): {grand_total:.0f} GWh")
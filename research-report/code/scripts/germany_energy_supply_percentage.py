@@ -1,30 +1,25 @@
-import csv
+import os
+import sys
 
-filepath = "germany_energy_supply.csv"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from iea_data import get_store, TOTAL_ENERGY_SUPPLY_2024
 
-rows = []
+YEAR = 2024
 
 def tj_to_twh(tj):
     return tj / 3600
 
-with open(filepath, newline="", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        row["Value"] = float(row["Value"])
-        rows.append(row)
+# Energy supply by source straight from the indexed IEA store
+store = get_store()
+values = store.year_values(TOTAL_ENERGY_SUPPLY_2024, YEAR)
 
 # Calculate total energy supply in TJ
-total = sum(r["Value"] for r in rows)
+total = sum(values.values())
 
-print("Energy Supply Percentages (Germany, 2024)\n")
+print(f"Energy Supply Percentages (Germany, {YEAR})\n")
 print(f"Total energy supply: {total:,.0f} TJ  ({tj_to_twh(total):,.2f} TWh)\n")
 
-# Column name in CSV
-column_name = "Total energy supply, Germany, 2024"
-
-for r in rows:
-    name = r[column_name]
-    value_tj = r["Value"]
+for name, value_tj in values.items():
     value_twh = tj_to_twh(value_tj)
     pct = (value_tj / total) * 100
 
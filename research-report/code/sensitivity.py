@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# sensitivity.py
+"""
+Global sensitivity analysis (Sobol indices) for the germany_scenarios parameters
+Saltelli sampling, batched evaluation through GermanyScenarios.run_scenarios_batch
+Author: Christopher A. Trotter
+
+Two scrambled Sobol matrices A and B (N x d) and the d matrices AB_i (A with
+column i taken from B) give N * (d + 2) scenario evaluations. Indices per output:
+    first order  S_i  = mean(f_B * (f_AB_i - f_A)) / Var(f)       (Saltelli 2010)
+    total        ST_i = mean((f_A - f_AB_i)^2) / (2 Var(f))         (Jansen)
+with 95% bootstrap intervals over the N sample rows. S_i is the share of the
+output variance explained by parameter i alone; ST_i - S_i is what it explains
+only through interactions with the others.
+
+Usage:
+    python sensitivity.py                      # N = 2^14 -> 163,840 evaluations
+    python sensitivity.py --n 65536 --year 2030
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+# =============================================================================
+# PARAMETER RANGES (uniform) AND OUTPUTS
+# =============================================================================
+PARAMETERS = {
+    'electrification_factor': (1.00, 1.30),
+    'vres_target': (0.60, 0.95),
+    'bess_gw': (0.0, 20.0),
+    'bess_duration': (2.0, 12.0),
+    'dsm_ind_gw': (0.0, 12.0),
+    'dsm_pros_gw': (0.0, 4.0),
+    'curtailment_value': (15.0, 60.0),     # $/MWh, CURTAILMENT_VALUE_USD_MWH = 30
+    'crf': (0.06, 0.14),                   # BESS capital recovery factor, 0.10
+}
+OUTPUTS = ('net_benefit_busd', 'curtailment_reduction_twh')
+N_BASE = 2 ** 14
+N_BOOTSTRAP = 200
+
+
+def saltelli_samples(n, parameters=PARAMETERS, seed=0):
+    """A, B (n, d) and AB (d, n, d) scaled to the parameter ranges; n should be a power of 2"""
+    lo, hi = np.array(list(parameters.values()), dtype=float).T
+    d = len(lo)
+    base = qmc.Sobol(2 * d, scramble=True, seed=seed).random(n)
+    A = qmc.scale(base[:, :d], lo, hi)
+    B = qmc.scale(base[:, d:], lo, hi)
+    AB = np.repeat(A[None], d, axis=0)
+    for i in range(d):
+        AB[i, :, i] = B[:, i]
+    return A, B, AB
+
+
+def evaluate(model, X, year=2035, parameters=PARAMETERS, outputs=OUTPUTS):
+    """Batched run_scenario over the rows of X -> {output: (len(X),) array}"""
+    kwargs = {name: X[:, j] for j, name in enumerate(parameters)}
+    result = model.run_scenarios_batch(year, **kwargs)
+    return {name: result[name] for name in outputs}
+
+
+def sobol_indices(fA, fB, fAB):
+    """First-order and total indices; fAB has shape (d, n)"""
+    var = np.var(np.concatenate([fA, fB]))
+    if var == 0:
+        return np.zeros(len(fAB)), np.zeros(len(fAB))
+    first = np.mean(fB * (fAB - fA), axis=1) / var
+    total = 0.5 * np.mean((fA - fAB) ** 2, axis=1) / var
+    return first, total
+
+
+def bootstrap_intervals(fA, fB, fAB, n_boot=N_BOOTSTRAP, seed=0):
+    """Half-width of the 95% bootstrap interval of (first, total) per parameter"""
+    rng = np.random.default_rng(seed)
+    n = len(fA)
+    draws = [sobol_indices(fA[idx], fB[idx], fAB[:, idx])
+             for idx in rng.integers(0, n, size=(n_boot, n))]
+    first = np.array([d[0] for d in draws])
+    total = np.array([d[1] for d in draws])
+    half = lambda x: (np.percentile(x, 97.5, axis=0) - np.percentile(x, 2.5, axis=0)) / 2
+    return half(first), half(total)
+
+
+def analyze(model, n=N_BASE, year=2035, parameters=PARAMETERS, outputs=OUTPUTS, seed=0, n_boot=N_BOOTSTRAP):
+    """Sample, evaluate in one batched call and compute indices. Returns (table, timings)"""
+    t0 = time.perf_counter()
+    A, B, AB = saltelli_samples(n, parameters, seed)
+    d = len(parameters)
+    X = np.concatenate([A, B, AB.reshape(d * n, d)])
+    t1 = time.perf_counter()
+    values = evaluate(model, X, year, parameters, outputs)
+    t2 = time.perf_counter()
+
+    rows = []
+    for name, f in values.items():
+        fA, fB, fAB = f[:n], f[n:2 * n], f[2 * n:].reshape(d, n)
+        first, total = sobol_indices(fA, fB, fAB)
+        first_ci, total_ci = bootstrap_intervals(fA, fB, fAB, n_boot, seed)
+        for j, param in enumerate(parameters):
+            rows.append({'output': name, 'parameter': param, 'S1': first[j], 'S1_conf': first_ci[j],
+                         'ST': total[j], 'ST_conf': total_ci[j]})
+    t3 = time.perf_counter()
+    timings = {'evaluations': len(X), 'sample_s': t1 - t0, 'evaluate_s': t2 - t1, 'indices_s': t3 - t2}
+    return pd.DataFrame(rows), timings
+
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+if __name__ == "__main__":
+    from germany_scenarios import GermanyScenarios
+
+    parser = argparse.ArgumentParser(description="Sobol sensitivity of the germany_scenarios parameters")
+    parser.add_argument('--n', type=int, default=N_BASE, help="base samples (power of 2)")
+    parser.add_argument('--year', type=int, default=2035, help="BESS cost / demand year")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bootstrap', type=int, default=N_BOOTSTRAP)
+    args = parser.parse_args()
+
+    model = GermanyScenarios(seed=args.seed)
+    table, timings = analyze(model, args.n, args.year, seed=args.seed, n_boot=args.bootstrap)
+    print(f"\n🎲 SOBOL SENSITIVITY ({args.year}): {timings['evaluations']:,} evaluations in "
+          f"{timings['evaluate_s']:.1f} s ({timings['evaluations'] / timings['evaluate_s']:,.0f}/s), "
+          f"indices + bootstrap {timings['indices_s']:.1f} s")
+    for name, group in table.groupby('output', sort=False):
+        print(f"\n📊 {name}")
+        print(group.drop(columns='output').sort_values('ST', ascending=False).round(3).to_string(index=False))
+
+    os.makedirs('results', exist_ok=True)
+    table.to_csv('results/sobol_indices.csv', index=False)
+    print("\n✅ Saved: results/sobol_indices.csv")
@@ -0,0 +1,4 @@
+"""
+Shared tooling for the TEK5410 capacity expansion models (assignment4/5)
+and the research-report scenario engine.
+"""
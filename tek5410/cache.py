@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Persistent input-hash result cache for LP runs and scenario evaluations.
+
+Results are stored on disk under a key that hashes the input data, the model
+parameters and the code version of the model. A cache hit returns the stored
+result immediately; a miss runs the model and stores the result. Entries are
+evicted least-recently-used once the cache grows beyond `max_bytes`.
+
+Usage:
+    cache = ResultCache()
+    key = cache.key('assignment4', data=raw_data, params=params,
+                    code=code_version(__file__, aggregate, tighten), case='with_batt')
+    res = cache.get_or_compute(key, lambda: solve(...))
+
+    # Case studies: only the cases whose key changed are solved
+    results = cache.map(solve_case, cases, key_fn=lambda case: cache.key('study', params=case))
+
+Invalidation:
+    python -m tek5410.cache stats
+    python -m tek5410.cache clear [namespace]
+    python -m tek5410.cache evict --max-mb 200
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import types
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:   # pandas is optional for fingerprinting
+    pd = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ROOT = os.environ.get('TEK5410_CACHE_DIR', os.path.join(REPO_ROOT, '.cache', 'results'))
+DEFAULT_MAX_BYTES = 1 << 30   # 1 GiB
+CACHE_FORMAT = 1
+
+
+# ------------------------------------------------------------------
+# Fingerprints
+# ------------------------------------------------------------------
+def _update(h, obj):
+    """Feed a canonical byte representation of `obj` into hash `h`"""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        h.update(repr((type(obj).__name__, obj)).encode())
+    elif isinstance(obj, bytes):
+        h.update(b'bytes:' + obj)
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(f'ndarray:{arr.dtype.str}:{arr.shape}'.encode())
+        h.update(arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode())
+    elif isinstance(obj, np.generic):
+        _update(h, obj.item())
+    elif pd is not None and isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(f'{type(obj).__name__}:{obj.shape}'.encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+        if isinstance(obj, pd.DataFrame):
+            _update(h, [str(c) for c in obj.columns])
+    elif isinstance(obj, dict):
+        h.update(b'dict{')
+        for k in sorted(obj, key=repr):
+            _update(h, k)
+            _update(h, obj[k])
+        h.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        h.update(f'{type(obj).__name__}[{len(obj)}]'.encode())
+        for item in obj:
+            _update(h, item)
+    else:
+        h.update(json.dumps(obj, sort_keys=True, default=repr).encode())
+
+
+def fingerprint(*objs):
+    """Stable sha1 hex digest of arrays, frames, dicts, lists and scalars"""
+    h = hashlib.sha1()
+    for obj in objs:
+        _update(h, obj)
+    return h.hexdigest()
+
+
+_FILE_DIGESTS = {}
+
+
+def file_digest(path):
+    """sha1 of a file's content (memoized per mtime/size)"""
+    st = os.stat(path)
+    memo = _FILE_DIGESTS.get(path)
+    if memo and memo[0] == (st.st_mtime_ns, st.st_size):
+        return memo[1]
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    _FILE_DIGESTS[path] = ((st.st_mtime_ns, st.st_size), h.hexdigest())
+    return h.hexdigest()
+
+
+def _source_file(obj):
+    """Path, module, or a function/class defined in a module -> its source file"""
+    if isinstance(obj, str):
+        return obj
+    module = obj if isinstance(obj, types.ModuleType) else sys.modules[obj.__module__]
+    return module.__file__
+
+
+def code_version(*sources):
+    """
+    Code version of a model = hash of its source files. Pass the model file and every module
+    the result depends on (as paths, modules, or functions/classes imported from them).
+    """
+    return fingerprint([file_digest(os.path.abspath(_source_file(s))) for s in sources])
+
+
+# ------------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------------
+class ResultCache:
+    """On-disk pickle cache keyed by input hashes, with size-based LRU eviction"""
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+
+    # --- keys ---
+    def key(self, namespace, **parts):
+        """'<namespace>/<sha1>' over the given parts (data, params, code, case, ...)"""
+        return f"{namespace}/{fingerprint(CACHE_FORMAT, parts)}"
+
+    def _path(self, key):
+        namespace, digest = key.split('/', 1)
+        return os.path.join(self.root, namespace, digest[:2], digest + '.pkl')
+
+    # --- get / put ---
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        os.utime(path)   # LRU: a hit refreshes the entry
+        self.hits += 1
+        return value
+
+    def __contains__(self, key):
+        return self.enabled and os.path.exists(self._path(key))
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            replaced = os.path.getsize(path)   # overwriting an entry: its old size leaves the total
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp, path)   # atomic: readers never see partial entries
+        if self._size is not None:
+            self._size += os.path.getsize(path) - replaced
+        self.evict()
+
+    def get_or_compute(self, key, fn, store_if=None):
+        """Stored value, or fn() - kept only if store_if(value) (e.g. the solve was optimal)"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = fn()
+            if store_if is None or store_if(value):
+                self.put(key, value)
+        return value
+
+    def map(self, fn, cases, key_fn, store_if=None):
+        """fn(case) for every case, computing only the cases that miss the cache"""
+        results = []
+        for case in cases:
+            key = key_fn(case)
+            results.append(self.get_or_compute(key, lambda: fn(case), store_if))
+        return results
+
+    # --- maintenance ---
+    def _entries(self, namespace=None):
+        top = os.path.join(self.root, namespace) if namespace else self.root
+        for dirpath, _, files in os.walk(top):
+            for name in files:
+                if name.endswith('.pkl'):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def size(self):
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        return self._size
+
+    def evict(self, max_bytes=None):
+        """Delete least-recently-used entries until the cache fits in max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        if self.size() <= limit:
+            return 0
+        removed = 0
+        for path, size, _ in sorted(self._entries(), key=lambda e: e[2]):
+            if self._size <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            removed += 1
+        return removed
+
+    def invalidate(self, namespace=None):
+        """Remove all entries (or one namespace); returns the number removed"""
+        removed = 0
+        for path, _, _ in list(self._entries(namespace)):
+            os.remove(path)
+            removed += 1
+        self._size = None
+        return removed
+
+    def stats(self):
+        per_ns = {}
+        if os.path.isdir(self.root):
+            for ns in sorted(os.listdir(self.root)):
+                entries = list(self._entries(ns))
+                per_ns[ns] = (len(entries), sum(e[1] for e in entries))
+        return per_ns
+
+
+# ------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the TEK5410 result cache")
+    parser.add_argument('--root', default=DEFAULT_ROOT)
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('stats', help='entries and size per namespace')
+    clear = sub.add_parser('clear', help='invalidate all entries or one namespace')
+    clear.add_argument('namespace', nargs='?')
+    evict = sub.add_parser('evict', help='LRU-evict down to a size limit')
+    evict.add_argument('--max-mb', type=float, required=True)
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(root=args.root)
+    if args.cmd == 'stats':
+        stats = cache.stats()
+        for ns, (n, size) in stats.items():
+            print(f"{ns:30s} {n:8d} entries {size / 1e6:10.1f} MB")
+        print(f"{'TOTAL':30s} {sum(n for n, _ in stats.values()):8d} entries "
+              f"{sum(s for _, s in stats.values()) / 1e6:10.1f} MB")
+    elif args.cmd == 'clear':
+        print(f"Removed {cache.invalidate(args.namespace)} entries")
+    elif args.cmd == 'evict':
+        print(f"Evicted {cache.evict(int(args.max_mb * 1e6))} entries")
+
+
+if __name__ == "__main__":
+    main()
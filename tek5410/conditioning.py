@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Numerical conditioning of the PuLP capacity expansion models.
+
+The models are built in MW and € by default, which puts right-hand sides
+around 1e4 next to capacity factors of 1e-3 and ±1e6 placeholder bounds.
+The conditioned build (`build_model(..., condition=True)` in assignment4/5)
+works in GW and k€ instead: every cost coefficient keeps its value
+(€/MW = k€/GW, €/MWh = k€/GWh) and only the data and results are rescaled by
+1e3. Variable bounds are tightened from the data where the model allows it.
+
+This module reports matrix/objective/rhs/bound ranges of a built model, solves
+with CBC while capturing iteration counts, and checks afterwards that none of
+the tightened bounds is active (which would mean the bound changed the optimum).
+
+Usage:
+    ranges = coefficient_ranges(prob)
+    print_ranges({'MW/€': ranges_before, 'GW/k€': ranges_after})
+    stats = solve_with_stats(prob)        # {'status', 'iterations', 'solve_s', 'wall_s'}
+"""
+
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+import pulp
+
+POWER_UNIT = 1e3   # MW per GW, and € per k€ (costs are rescaled by the same factor)
+
+
+# ------------------------------------------------------------------
+# Coefficient ranges
+# ------------------------------------------------------------------
+def _range(values):
+    values = np.abs(np.asarray(values, dtype=float))
+    values = values[(values > 0) & np.isfinite(values)]
+    if values.size == 0:
+        return (np.nan, np.nan)
+    return (float(values.min()), float(values.max()))
+
+
+def coefficient_ranges(prob):
+    """Smallest/largest absolute nonzero in the matrix, objective, rhs and finite bounds"""
+    matrix, rhs = [], []
+    for con in prob.constraints.values():
+        matrix.extend(con.values())
+        rhs.append(-con.constant)
+    bounds = [b for v in prob.variables() for b in (v.lowBound, v.upBound) if b is not None]
+    objective = list(prob.objective.values())
+    return {
+        'matrix': _range(matrix),
+        'objective': _range(objective),
+        'rhs': _range(rhs),
+        'bounds': _range(bounds),
+        'overall': _range(matrix + objective + rhs + bounds),
+    }
+
+
+def print_ranges(ranges_by_label):
+    """Table of ranges and their max/min ratio (orders of magnitude) per build"""
+    print(f"{'':12s} {'kind':10s} {'min':>10s} {'max':>10s} {'log10 ratio':>12s}")
+    for label, ranges in ranges_by_label.items():
+        for kind, (lo, hi) in ranges.items():
+            ratio = np.log10(hi / lo) if lo > 0 else np.nan
+            print(f"{label:12s} {kind:10s} {lo:10.2e} {hi:10.2e} {ratio:12.1f}")
+
+
+# ------------------------------------------------------------------
+# Bound tightening bookkeeping
+# ------------------------------------------------------------------
+def tighten(var, lower=None, upper=None, record=None):
+    """Tighten the bounds of `var` (never loosen); remember the new bounds in `record`"""
+    if upper is not None and (var.upBound is None or upper < var.upBound):
+        var.upBound = upper
+        if record is not None:
+            record.append((var, 'upper', upper))
+    if lower is not None and (var.lowBound is None or lower > var.lowBound):
+        var.lowBound = lower
+        if record is not None:
+            record.append((var, 'lower', lower))
+
+
+def active_bounds(record, rel_tol=1e-6):
+    """Names of tightened bounds that are active in the solution"""
+    active = []
+    for var, side, bound in record:
+        value = var.varValue
+        if value is not None and abs(value - bound) <= rel_tol * max(1.0, abs(bound)):
+            active.append(f"{var.name} ({side} {bound:g})")
+    return active
+
+
+# ------------------------------------------------------------------
+# Solve with iteration counts
+# ------------------------------------------------------------------
+_ITER = re.compile(r'(\d+)\s+iterations')
+_WALL = re.compile(r'Wallclock seconds\):\s*([\d.]+)')
+
+
+def solve_with_stats(prob, **solver_kwargs):
+    """Solve with CBC, parsing simplex iterations and solver time from its log"""
+    fd, log_path = tempfile.mkstemp(suffix='.log')
+    os.close(fd)
+    try:
+        solver = pulp.PULP_CBC_CMD(msg=False, logPath=log_path, **solver_kwargs)
+        start = time.perf_counter()
+        prob.solve(solver)
+        wall = time.perf_counter() - start
+        with open(log_path) as f:
+            log = f.read()
+    finally:
+        os.remove(log_path)
+    iters = _ITER.findall(log)
+    cbc = _WALL.findall(log)
+    return {
+        'status': pulp.LpStatus[prob.status],
+        'iterations': int(iters[-1]) if iters else None,
+        'solve_s': float(cbc[-1]) if cbc else np.nan,
+        'wall_s': wall,
+    }
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Chronological merit-order dispatch simulator for given capacity mixes.
+
+Costs out capacity vectors of the assignment4 (one node) and assignment5 (north/
+south with a transmission link) models without solving an LP. Every array has
+a leading batch dimension, so thousands of capacity mixes are simulated at once.
+
+Dispatch rule per hour, in merit order:
+    1. VRE (cheapest marginal cost first) serves local demand, then the other
+       node's demand over the link
+    2. batteries discharge into the remaining local, then remote, demand;
+       leftover VRE charges local, then remote, batteries (eta on charge,
+       charge + discharge <= power capacity, SOC <= energy capacity)
+    3. gas covers what is left, local first; the rest is unserved energy
+Only step 2 is chronological (state of charge); steps 1 and 3 are vectorised over
+all hours. The dispatch has no foresight (the LP does), so for the same
+capacities the simulated cost is an upper bound on the LP's; the gap is
+largest for storage-heavy mixes, where the LP plans charging ahead of deficits.
+
+Shapes: H hours, K nodes (1 or 2), n capacity mixes
+    demand (H, K), cf[tech] (H, K), caps[tech] (n, K), tx_cap (n,)
+caps['batt'] is battery power (MW) and caps['batt_energy'] its energy (MWh);
+without 'batt_energy' the energy is params['dur']['batt'] * power if params fix a
+duration, zero if there is no battery, and a ValueError otherwise.
+
+Usage:
+    out = simulate(demand, cf, caps, params, tx_cap=tx, co2=0.202)
+    out['cost'], out['unserved'], out['emissions']       # (n,) each
+"""
+
+import numpy as np
+
+VRE = ('wind', 'solar')
+VOLL = 3000.0   # €/MWh, value of lost load for unserved energy
+POLICIES = ('reliability', 'economic')
+CHUNK = 256     # capacity mixes simulated together (~5 arrays of CHUNK * H * K * 8 B)
+
+
+def _as_batch(caps, K):
+    """Capacity dict -> {tech: (n, K) float array}"""
+    out = {t: np.atleast_2d(np.asarray(v, dtype=float)) for t, v in caps.items()}
+    for t, v in out.items():
+        if v.shape[1] != K:
+            out[t] = v.reshape(-1, K)
+    return out
+
+
+def _exchange(avail, need, room):
+    """
+    Serve the other node's need from `avail` over the link (K = 2).
+    room: (n, 2) remaining link capacity in the direction out of node k. Updates in place;
+    returns the net flow north->south (node 0 -> node 1).
+    """
+    x01 = np.minimum(np.minimum(avail[..., 0], need[..., 1]), room[..., 0])
+    x10 = np.minimum(np.minimum(avail[..., 1], need[..., 0]), room[..., 1])
+    avail[..., 0] -= x01
+    need[..., 1] -= x01
+    avail[..., 1] -= x10
+    need[..., 0] -= x10
+    room[..., 0] += x10 - x01
+    room[..., 1] += x01 - x10
+    return x01 - x10
+
+
+def simulate(demand, cf, caps, params, tx_cap=None, weights=None, co2=0.0, voll=VOLL,
+             tx_cost=0.0, soc0=0.0, policy='reliability', chunk=CHUNK):
+    """
+    Simulate a year for a batch of capacity mixes. Returns (n,) totals plus (n, K) per-node
+    energy per technology; costs follow the LP objective (annuities + vom/fuel) plus
+    VOLL * unserved. Mixes are processed `chunk` at a time to bound memory.
+    policy: 'reliability' keeps the battery for deficits no VRE can cover; 'economic' also
+    lets it displace VRE with a higher marginal cost (cheaper, but empties it sooner).
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+    demand = np.asarray(demand, dtype=float)
+    demand = demand[:, None] if demand.ndim == 1 else demand
+    H, K = demand.shape
+    cf = {t: (np.asarray(v, dtype=float)[:, None] if np.ndim(v) == 1 else np.asarray(v, dtype=float))
+          for t, v in cf.items()}
+    caps = _as_batch(caps, K)
+    n = caps['wind'].shape[0]
+    w = np.ones(H) if weights is None else np.asarray(weights, dtype=float)
+    T = np.zeros(n) if tx_cap is None else np.broadcast_to(np.asarray(tx_cap, dtype=float), (n,))
+
+    parts = [_simulate_chunk(demand, cf, {t: v[i:i + chunk] for t, v in caps.items()}, params,
+                             T[i:i + chunk], tx_cap is not None, w, co2, voll, tx_cost, soc0, policy)
+             for i in range(0, n, chunk)]
+    return _concat(parts)
+
+
+def _concat(parts):
+    if len(parts) == 1:
+        return parts[0]
+    out = {}
+    for key, value in parts[0].items():
+        if isinstance(value, dict):
+            out[key] = {t: np.concatenate([p[key][t] for p in parts]) for t in value}
+        else:
+            out[key] = np.concatenate([p[key] for p in parts])
+    return out
+
+
+def _simulate_chunk(demand, cf, caps, params, T, has_link, w, co2, voll, tx_cost, soc0, policy):
+    H, K = demand.shape
+    n = caps['wind'].shape[0]
+    link = K == 2 and has_link
+
+    mc = {t: params['vom'][t] + params['fuel'][t] for t in ('wind', 'solar', 'gas', 'batt')}
+    order = sorted(VRE, key=lambda t: mc[t])
+    # 'economic': VRE dearer than stored surplus energy (after losses) is dispatched after the
+    # battery; 'reliability': all VRE first, the battery only covers the remaining deficit
+    stored_cost = mc[order[0]] / params['eta']['batt'] + mc['batt']
+    late = [t for t in order if mc[t] > stored_cost] if policy == 'economic' else []
+
+    # --- 1. VRE, vectorised over hours: arrays (n, H, K) ---
+    need = np.broadcast_to(demand, (n, H, K)).copy()
+    room = np.broadcast_to(T[:, None, None], (n, H, K)).copy() if link else None
+    flow = np.zeros((n, H))
+    energy, spare = {}, {}
+    for t in order:
+        avail = caps[t][:, None, :] * cf[t][None, :, :]
+        if t in late:
+            spare[t] = avail            # dispatched hour by hour below
+            energy[t] = np.zeros((n, K))
+            continue
+        served = np.minimum(avail, need)
+        need -= served
+        avail -= served
+        if link:
+            before = avail.copy()
+            flow += _exchange(avail, need, room)
+            served += before - avail
+        energy[t] = np.einsum('nhk,h->nk', served, w)
+        spare[t] = avail
+
+    # --- 2. Batteries (and VRE dispatched after them), chronological ---
+    P = caps.get('batt', np.zeros((n, K)))
+    dur = params.get('dur', {}).get('batt')
+    if 'batt_energy' in caps:
+        E = caps['batt_energy']
+    elif dur is not None:
+        E = dur * P
+    elif 'batt' not in caps:
+        E = np.zeros((n, K))
+    else:
+        raise ValueError("caps['batt_energy'] is required when params do not fix the battery duration ('dur')")
+    eta = params['eta']['batt']
+    soc = np.minimum(np.full((n, K), float(soc0)), E)
+    e_ch = np.zeros((n, K))
+    e_dis = np.zeros((n, K))
+    for h in range(H if np.any(P > 0) or late else 0):
+        wh = w[h]
+        need_h = need[:, h, :]
+        room_h = room[:, h, :] if link else None
+        # discharge: local need first, then the other node's need over the link
+        avail = np.minimum(P, soc / wh)
+        before = avail.copy()
+        served = np.minimum(avail, need_h)
+        avail -= served
+        need_h -= served
+        if link:
+            flow[:, h] += _exchange(avail, need_h, room_h)
+        dis = before - avail
+        # dearer VRE serves what the battery could not
+        for t in late:
+            avail_t = spare[t][:, h, :]
+            before = avail_t.copy()
+            served = np.minimum(avail_t, need_h)
+            avail_t -= served
+            need_h -= served
+            if link:
+                flow[:, h] += _exchange(avail_t, need_h, room_h)
+            energy[t] += wh * (before - avail_t)
+        # charge from leftover VRE: local batteries first, then the other node's
+        surplus_h = sum(spare[t][:, h, :] for t in order)
+        head = np.minimum(P - dis, (E - soc) / (eta * wh))
+        ch = np.minimum(head, surplus_h)
+        surplus_h -= ch
+        head -= ch
+        if link:
+            got = head.copy()
+            flow[:, h] += _exchange(surplus_h, head, room_h)
+            ch += got - head
+        soc += wh * (eta * ch - dis)
+        e_ch += wh * ch
+        e_dis += wh * dis
+    curtailed = np.einsum('nhk,h->n', sum(spare.values()), w) - e_ch.sum(axis=1)
+
+    # --- 3. Gas, vectorised over hours ---
+    avail = caps['gas'][:, None, :] * cf['gas'][None, :, :]
+    served = np.minimum(avail, need)
+    need -= served
+    avail -= served
+    if link:
+        before = avail.copy()
+        flow += _exchange(avail, need, room)
+        served += before - avail
+    energy['gas'] = np.einsum('nhk,h->nk', served, w)
+
+    # --- Totals (energy = power * hours per step) ---
+    unserved = np.einsum('nhk,h->n', need, w)
+
+    capex = sum(params['a'][t] * caps[t].sum(axis=1) for t in ('wind', 'solar', 'gas', 'batt') if t in caps)
+    capex = capex + params['a_energy']['batt'] * E.sum(axis=1) + tx_cost * T
+    opex = sum(mc[t] * energy[t].sum(axis=1) for t in ('wind', 'solar', 'gas'))
+    opex = opex + mc['batt'] * e_dis.sum(axis=1)
+    return {
+        'gen': {**energy, 'batt': e_dis},
+        'charge': e_ch,
+        'unserved': unserved,
+        'curtailed': curtailed,
+        'emissions': co2 * energy['gas'].sum(axis=1),
+        'flow_abs': np.abs(flow) @ w,
+        'peak_flow': np.abs(flow).max(axis=1),
+        'capex': capex,
+        'opex': opex,
+        'cost': capex + opex + voll * unserved,
+    }
+
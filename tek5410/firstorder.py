@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+First-order primal-dual LP solver (PDLP-style) for instances too large for CBC.
+
+Restarted primal-dual hybrid gradient (PDHG) on
+
+    min c'x   s.t.  A_eq x = b_eq,  A_ub x <= b_ub,  lb <= x <= ub
+
+following Applegate et al. (2021), "Practical large-scale linear programming
+using primal-dual hybrid gradient":
+    - Ruiz equilibration (10 passes) and Pock-Chambolle scaling of the matrix
+    - step size 0.9 / ||K||_2 from a power iteration, split between primal and
+      dual by the primal weight, which is rebalanced at every restart
+    - restarts to the average iterate when its KKT error has dropped enough
+      (checked every `check_every` iterations)
+    - termination on relative primal residual, dual residual and duality gap,
+      all measured on the unscaled problem
+
+Memory is linear in the number of nonzeros: the scaled matrix and its transpose
+(CSR) plus a handful of vectors. With threads > 1 both are split into row
+blocks of equal nnz that are multiplied on a thread pool; scipy's sparse
+matvec releases the GIL, so the blocks run in parallel.
+
+The result is approximate (to `tol`). polish=True fixes the variables the
+first-order solution leaves at a bound with a positive reduced cost and solves
+the remaining, much smaller LP with HiGHS, which recovers a vertex solution
+when the active set is right (falls back to the PDHG point if it is not).
+
+`solve_pulp` runs a built PuLP model through it and writes varValue back, so
+result extraction written for CBC works unchanged; it is a `solve_fn` for
+assignment4/5 `solve()`.
+
+Usage:
+    out = pdlp(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, lb=lb, ub=ub, tol=1e-4, threads=4)
+    out['x'], out['objective'], out['status']           # 'optimal' or 'iteration_limit' / 'time_limit'
+    stats = solve_pulp(prob, tol=1e-4, polish=True)     # sets v.varValue for every variable
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pulp
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+RUIZ_PASSES = 10
+POWER_ITERATIONS = 30
+STEP_FRACTION = 0.9
+RESTART_SUFFICIENT = 0.2     # restart when the KKT error fell below this fraction of the last restart's
+RESTART_NECESSARY = 0.8      # ... or below this one and stopped improving
+RESTART_ARTIFICIAL = 0.36    # ... or the current run is this fraction of all iterations
+PRIMAL_WEIGHT_SMOOTHING = 0.5
+
+
+# ------------------------------------------------------------------
+# Multi-threaded sparse products
+# ------------------------------------------------------------------
+class BlockMatrix:
+    """CSR matrix in row blocks of equal nnz; `A @ x` multiplies the blocks on a thread pool"""
+
+    def __init__(self, A, pool=None, blocks=1):
+        A = sp.csr_matrix(A)
+        self.shape = A.shape
+        self.pool = pool if blocks > 1 else None
+        if self.pool is None or A.shape[0] < 2 * blocks:
+            self.blocks = [A]
+            self.pool = None
+            return
+        cuts = np.unique(np.searchsorted(A.indptr, np.linspace(0, A.nnz, blocks + 1)))
+        cuts[0], cuts[-1] = 0, A.shape[0]
+        self.blocks = [A[start:stop] for start, stop in zip(cuts[:-1], cuts[1:]) if stop > start]
+
+    def __matmul__(self, x):
+        if self.pool is None:
+            return self.blocks[0] @ x
+        return np.concatenate(list(self.pool.map(lambda block: block @ x, self.blocks)))
+
+    @property
+    def nnz(self):
+        return sum(block.nnz for block in self.blocks)
+
+
+# ------------------------------------------------------------------
+# Scaling
+# ------------------------------------------------------------------
+def _scale_rows_cols(K, row, col):
+    K.data *= np.repeat(row, np.diff(K.indptr))
+    K.data *= col[K.indices]
+
+
+def equilibrate(K, passes=RUIZ_PASSES):
+    """Ruiz + Pock-Chambolle (alpha = 1) scaling in place; returns (row, col) with K_scaled = R K C"""
+    m, n = K.shape
+    row, col = np.ones(m), np.ones(n)
+    for _ in range(passes):
+        A = abs(K)
+        r = np.sqrt(A.max(axis=1).toarray().ravel())
+        c = np.sqrt(A.max(axis=0).toarray().ravel())
+        r[r == 0], c[c == 0] = 1.0, 1.0
+        _scale_rows_cols(K, 1 / r, 1 / c)
+        row /= r
+        col /= c
+    A = abs(K)
+    r = np.sqrt(np.asarray(A.sum(axis=1)).ravel())
+    c = np.sqrt(np.asarray(A.sum(axis=0)).ravel())
+    r[r == 0], c[c == 0] = 1.0, 1.0
+    _scale_rows_cols(K, 1 / r, 1 / c)
+    return row / r, col / c
+
+
+def _norm_estimate(K, KT, iterations=POWER_ITERATIONS, seed=0):
+    """Largest singular value of K by power iteration on K'K"""
+    x = np.random.default_rng(seed).standard_normal(K.shape[1])
+    sigma = 1.0
+    for _ in range(iterations):
+        x /= np.linalg.norm(x)
+        v = KT @ (K @ x)
+        sigma = np.sqrt(np.linalg.norm(v))
+        x = v
+    return sigma
+
+
+# ------------------------------------------------------------------
+# KKT error
+# ------------------------------------------------------------------
+def _kkt(x, y, Kx, KTy, c, q, lb, ub, n_eq):
+    """(primal residual, dual residual, |gap|, primal objective, dual objective) of K x (=, >=) q"""
+    r = q - Kx
+    r[n_eq:] = np.maximum(r[n_eq:], 0.0)
+    reduced = c - KTy
+    pos, neg = reduced > 0, reduced < 0
+    lower_ok, upper_ok = np.isfinite(lb), np.isfinite(ub)
+    dual = np.where(pos & ~lower_ok, reduced, 0.0) + np.where(neg & ~upper_ok, reduced, 0.0)
+    pobj = c @ x
+    dobj = (q @ y + np.sum(np.where(pos & lower_ok, lb, 0.0) * np.where(pos, reduced, 0.0))
+            + np.sum(np.where(neg & upper_ok, ub, 0.0) * np.where(neg, reduced, 0.0)))
+    return np.linalg.norm(r), np.linalg.norm(dual), abs(pobj - dobj), pobj, dobj
+
+
+def _weighted(kkt, omega):
+    primal, dual, gap = kkt[:3]
+    return np.sqrt(omega ** 2 * primal ** 2 + dual ** 2 / omega ** 2 + gap ** 2)
+
+
+# ------------------------------------------------------------------
+# Solver
+# ------------------------------------------------------------------
+def _stack(c, A_eq, b_eq, A_ub, b_ub):
+    """K = [A_eq; -A_ub], q = [b_eq; -b_ub]: equality rows first, then K x >= q"""
+    n = len(c)
+    A_eq = sp.csr_matrix((0, n)) if A_eq is None else sp.csr_matrix(A_eq)
+    A_ub = sp.csr_matrix((0, n)) if A_ub is None else sp.csr_matrix(A_ub)
+    b_eq = np.zeros(0) if b_eq is None else np.asarray(b_eq, dtype=float)
+    b_ub = np.zeros(0) if b_ub is None else np.asarray(b_ub, dtype=float)
+    K = sp.vstack([A_eq, -A_ub]).tocsr().astype(float)
+    K.sum_duplicates()
+    return K, np.concatenate([b_eq, -b_ub]), A_eq.shape[0]
+
+
+def pdlp(c, A_eq=None, b_eq=None, A_ub=None, b_ub=None, lb=None, ub=None, tol=1e-4, max_iter=100_000,
+         time_limit=None, threads=1, polish=False, check_every=64, verbose=False):
+    """
+    Restarted PDHG on min c'x, A_eq x = b_eq, A_ub x <= b_ub, lb <= x <= ub (defaults 0 / inf).
+    threads: row blocks multiplied in parallel (None = all CPUs).
+    Returns {'x', 'objective', 'status', 'iterations', 'primal_res', 'dual_res', 'gap' (relative),
+    'duals_eq', 'duals_ub' (linprog's sign convention), 'solve_s', 'polished', 'trace'}.
+    """
+    start = time.perf_counter()
+    c = np.asarray(c, dtype=float)
+    n = len(c)
+    lb = np.zeros(n) if lb is None else np.asarray(lb, dtype=float)
+    ub = np.full(n, np.inf) if ub is None else np.asarray(ub, dtype=float)
+    K, q, n_eq = _stack(c, A_eq, b_eq, A_ub, b_ub)
+    q_norm, c_norm = np.linalg.norm(q), np.linalg.norm(c)
+
+    row, col = equilibrate(K)
+    cs, qs, lbs, ubs = c * col, q * row, lb / col, ub / col
+    threads = threads or os.cpu_count()
+    with ThreadPoolExecutor(threads) if threads > 1 else nullcontext() as pool:
+        KT = BlockMatrix(K.T.tocsr(), pool, threads)
+        K = BlockMatrix(K, pool, threads)
+        eta = STEP_FRACTION / _norm_estimate(K, KT)
+        cs_norm, qs_norm = np.linalg.norm(cs), np.linalg.norm(qs)
+        omega = cs_norm / qs_norm if cs_norm > 0 and qs_norm > 0 else 1.0
+
+        def project_dual(y):
+            y[n_eq:] = np.maximum(y[n_eq:], 0.0)
+            return y
+
+        x = np.clip(np.zeros(n), lbs, ubs)
+        y = np.zeros(K.shape[0])
+        Kx, KTy = K @ x, np.zeros(n)
+        sums = [np.zeros(n), np.zeros(len(y)), np.zeros(len(y)), np.zeros(n)]
+        count = 0
+        restart_x, restart_y = x.copy(), y.copy()
+        restart_err = _weighted(_kkt(x, y, Kx, KTy, cs, qs, lbs, ubs, n_eq), omega)
+        previous_err = np.inf
+        run_start, trace, status = 0, [], 'iteration_limit'
+        it = 0
+        for it in range(1, max_iter + 1):
+            tau, sigma = eta / omega, eta * omega
+            x_new = np.clip(x - tau * (cs - KTy), lbs, ubs)
+            Kx_new = K @ x_new
+            y = project_dual(y + sigma * (qs - 2 * Kx_new + Kx))
+            x, Kx = x_new, Kx_new
+            KTy = KT @ y
+            for total, value in zip(sums, (x, y, Kx, KTy)):
+                total += value
+            count += 1
+            if it % check_every:
+                continue
+
+            # candidate: current or average iterate, whichever has the lower KKT error
+            current = (x, y, Kx, KTy)
+            average = tuple(total / count for total in sums)
+            err_current = _weighted(_kkt(*current, cs, qs, lbs, ubs, n_eq), omega)
+            err_average = _weighted(_kkt(*average, cs, qs, lbs, ubs, n_eq), omega)
+            candidate, err = (average, err_average) if err_average < err_current else (current, err_current)
+
+            # termination on the unscaled problem
+            cx, cy, cKx, cKTy = candidate
+            primal, dual, gap, pobj, dobj = _kkt(cx * col, cy * row, cKx / row, cKTy / col, c, q, lb, ub, n_eq)
+            rel = (primal / (1 + q_norm), dual / (1 + c_norm), gap / (1 + abs(pobj) + abs(dobj)))
+            trace.append({'iteration': it, 'primal_res': rel[0], 'dual_res': rel[1], 'gap': rel[2],
+                          'objective': pobj, 'omega': omega, 'elapsed_s': time.perf_counter() - start})
+            if verbose and it % (16 * check_every) == 0:
+                print(f"  it {it:7d} | primal {rel[0]:.2e} | dual {rel[1]:.2e} | gap {rel[2]:.2e} | "
+                      f"obj {pobj:.6g} | {trace[-1]['elapsed_s']:.1f} s")
+            if max(rel) <= tol:
+                x, y, Kx, KTy = candidate
+                status = 'optimal'
+                break
+            if time_limit is not None and time.perf_counter() - start > time_limit:
+                x, y, Kx, KTy = candidate
+                status = 'time_limit'
+                break
+
+            if (err <= RESTART_SUFFICIENT * restart_err
+                    or (err <= RESTART_NECESSARY * restart_err and err > previous_err)
+                    or it - run_start >= RESTART_ARTIFICIAL * it):
+                x, y, Kx, KTy = (v.copy() for v in candidate)
+                dx, dy = np.linalg.norm(x - restart_x), np.linalg.norm(y - restart_y)
+                if dx > 1e-10 and dy > 1e-10:
+                    omega = np.exp(PRIMAL_WEIGHT_SMOOTHING * np.log(dy / dx)
+                                   + (1 - PRIMAL_WEIGHT_SMOOTHING) * np.log(omega))
+                restart_x, restart_y = x.copy(), y.copy()
+                restart_err = _weighted(_kkt(x, y, Kx, KTy, cs, qs, lbs, ubs, n_eq), omega)
+                previous_err = np.inf
+                sums = [np.zeros(n), np.zeros(len(y)), np.zeros(len(y)), np.zeros(n)]
+                count, run_start = 0, it
+            else:
+                previous_err = err
+
+    x, y = x * col, y * row
+    out = {'x': x, 'objective': float(c @ x), 'status': status, 'iterations': it,
+           'primal_res': trace[-1]['primal_res'] if trace else np.nan,
+           'dual_res': trace[-1]['dual_res'] if trace else np.nan,
+           'gap': trace[-1]['gap'] if trace else np.nan,
+           'duals_eq': y[:n_eq], 'duals_ub': -y[n_eq:], 'polished': False, 'trace': trace}
+    if polish:
+        reduced = c - KTy / col
+        polished = _polish(c, A_eq, b_eq, A_ub, b_ub, lb, ub, x, reduced, tol)
+        if polished is not None:
+            out.update(x=polished, objective=float(c @ polished), status='optimal', polished=True)
+    out['solve_s'] = time.perf_counter() - start
+    return out
+
+
+def _polish(c, A_eq, b_eq, A_ub, b_ub, lb, ub, x, reduced, tol):
+    """Fix variables at a bound with a reduced cost pushing them there, solve the rest with HiGHS"""
+    threshold = tol * np.maximum(1.0, np.abs(c))
+    at_lower = np.isfinite(lb) & (x - lb <= tol * (1 + np.abs(lb))) & (reduced > threshold)
+    at_upper = np.isfinite(ub) & (ub - x <= tol * (1 + np.abs(ub))) & (reduced < -threshold)
+    fixed = at_lower | at_upper
+    value = np.where(at_lower, lb, np.where(at_upper, ub, 0.0))
+    free = ~fixed
+    kwargs = {}
+    if A_eq is not None:
+        A_eq = sp.csc_matrix(A_eq)
+        kwargs.update(A_eq=A_eq[:, free], b_eq=np.asarray(b_eq, dtype=float) - A_eq[:, fixed] @ value[fixed])
+    if A_ub is not None:
+        A_ub = sp.csc_matrix(A_ub)
+        kwargs.update(A_ub=A_ub[:, free], b_ub=np.asarray(b_ub, dtype=float) - A_ub[:, fixed] @ value[fixed])
+    res = linprog(c[free], bounds=np.column_stack([lb[free], ub[free]]), method='highs', **kwargs)
+    if res.status != 0:
+        return None
+    value[free] = res.x
+    return value
+
+
+# ------------------------------------------------------------------
+# PuLP models
+# ------------------------------------------------------------------
+def lp_from_pulp(prob):
+    """Matrix form of a PuLP LP: {'c', 'A_eq', 'b_eq', 'A_ub', 'b_ub', 'lb', 'ub', 'variables', 'offset'}"""
+    variables = prob.variables()
+    index = {v.name: i for i, v in enumerate(variables)}
+    n = len(variables)
+    c = np.zeros(n)
+    for v, coef in prob.objective.items():
+        c[index[v.name]] += coef
+    rows = {'eq': ([], [], [], []), 'ub': ([], [], [], [])}
+    for con in prob.constraints.values():
+        kind = 'eq' if con.sense == pulp.LpConstraintEQ else 'ub'
+        sign = -1.0 if con.sense == pulp.LpConstraintGE else 1.0
+        r, cols, vals, rhs = rows[kind]
+        i = len(rhs)
+        for v, coef in con.items():
+            r.append(i)
+            cols.append(index[v.name])
+            vals.append(sign * coef)
+        rhs.append(-sign * con.constant)
+    out = {'c': c, 'variables': variables, 'offset': prob.objective.constant,
+           'lb': np.array([-np.inf if v.lowBound is None else v.lowBound for v in variables], dtype=float),
+           'ub': np.array([np.inf if v.upBound is None else v.upBound for v in variables], dtype=float)}
+    for kind, (r, cols, vals, rhs) in rows.items():
+        out[f'A_{kind}'] = sp.csr_matrix((vals, (r, cols)), shape=(len(rhs), n)) if rhs else None
+        out[f'b_{kind}'] = np.asarray(rhs, dtype=float) if rhs else None
+    return out
+
+
+def solve_pulp(prob, tol=1e-4, max_iter=100_000, time_limit=None, threads=1, polish=False, verbose=False):
+    """
+    Solve a PuLP LP with pdlp() and write the solution into its variables.
+    prob.status is Optimal when the tolerance (or the polish) was reached, Not Solved otherwise.
+    Returns {'status', 'iterations', 'solve_s', 'wall_s', 'primal_res', 'dual_res', 'gap', 'polished', 'nnz'}.
+    """
+    start = time.perf_counter()
+    lp = lp_from_pulp(prob)
+    out = pdlp(lp['c'], lp['A_eq'], lp['b_eq'], lp['A_ub'], lp['b_ub'], lp['lb'], lp['ub'], tol=tol,
+               max_iter=max_iter, time_limit=time_limit, threads=threads, polish=polish, verbose=verbose)
+    for v, value in zip(lp['variables'], out['x']):
+        v.varValue = float(value)
+    prob.status = pulp.LpStatusOptimal if out['status'] == 'optimal' else pulp.LpStatusNotSolved
+    nnz = sum(A.nnz for A in (lp['A_eq'], lp['A_ub']) if A is not None)
+    return {'status': pulp.LpStatus[prob.status], 'iterations': out['iterations'], 'solve_s': out['solve_s'],
+            'wall_s': time.perf_counter() - start, 'primal_res': out['primal_res'], 'dual_res': out['dual_res'],
+            'gap': out['gap'], 'polished': out['polished'], 'nnz': nnz}
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Filesystem-backed job queue for distributing LP solves across worker machines.
+
+A coordinator enqueues model instances (target function + parameters + data
+reference) as JSON files. Workers on any host that shares the queue directory
+claim jobs with an atomic rename, solve them in a child process with a per-job
+timeout and memory limit, and write the pickled result back. Jobs whose worker
+died (no heartbeat within the lease) or that crashed are retried up to
+`max_attempts` times before they are moved to failed/.
+
+Queue layout:
+    <queue>/pending/<id>.json    waiting to be claimed
+    <queue>/running/<id>.json    claimed; mtime is the worker heartbeat
+    <queue>/done/<id>.json       finished (timings, worker)
+    <queue>/failed/<id>.json     gave up after max_attempts (last error)
+    <queue>/results/<id>.pkl     result of target(params, data)
+
+Usage:
+    q = JobQueue('/shared/sweep')
+    ids = [q.submit('assignment5:run_job', {'tx_cost': c}, data='baseline_data.csv',
+                    pythonpath=['assignment5'], timeout=600, mem_mb=4000) for c in costs]
+
+    # on every host (or several times on one box)
+    python -m tek5410.jobqueue worker /shared/sweep --workers 4
+
+    results = q.wait(ids)
+"""
+
+import argparse
+import importlib
+import json
+import multiprocessing as mp
+import os
+import pickle
+import socket
+import sys
+import tempfile
+import time
+import traceback
+import uuid
+
+STATES = ('pending', 'running', 'done', 'failed', 'results')
+DEFAULT_LEASE_S = 60        # a running job without heartbeat for this long is requeued
+HEARTBEAT_S = 5
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+def _write_json(path, obj):
+    """Atomic JSON write (tmp file + rename in the same directory)"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(obj, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _resolve(target, pythonpath=()):
+    """'package.module:function' -> callable"""
+    for p in pythonpath:
+        if p not in sys.path:
+            sys.path.insert(0, p)
+    module, func = target.split(':')
+    return getattr(importlib.import_module(module), func)
+
+
+# ------------------------------------------------------------------
+# Queue (coordinator side)
+# ------------------------------------------------------------------
+class JobQueue:
+    def __init__(self, root, lease_s=DEFAULT_LEASE_S):
+        self.root = os.path.abspath(root)
+        self.lease_s = lease_s
+        for state in STATES:
+            os.makedirs(os.path.join(self.root, state), exist_ok=True)
+
+    def path(self, state, job_id, ext='.json'):
+        return os.path.join(self.root, state, job_id + ext)
+
+    def submit(self, target, params=None, data=None, timeout=None, mem_mb=None,
+               max_attempts=3, pythonpath=(), job_id=None):
+        """Enqueue target(params, data); `data` is a path (or any JSON reference) read by the worker"""
+        job_id = job_id or uuid.uuid4().hex[:16]
+        job = {
+            'id': job_id, 'target': target, 'params': params or {}, 'data': data,
+            'timeout': timeout, 'mem_mb': mem_mb, 'max_attempts': max_attempts,
+            'pythonpath': [os.path.abspath(p) for p in pythonpath],
+            'attempts': 0, 'errors': [], 'submitted': time.time(),
+        }
+        _write_json(self.path('pending', job_id), job)
+        return job_id
+
+    def ids(self, state):
+        return sorted(f[:-5] for f in os.listdir(os.path.join(self.root, state)) if f.endswith('.json'))
+
+    def status(self):
+        return {state: len(self.ids(state)) for state in STATES if state != 'results'}
+
+    def state_of(self, job_id):
+        for state in ('done', 'failed', 'running', 'pending'):
+            if os.path.exists(self.path(state, job_id)):
+                return state
+        return None
+
+    def result(self, job_id):
+        with open(self.path('results', job_id, '.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def info(self, job_id):
+        state = self.state_of(job_id)
+        return _read_json(self.path(state, job_id)) if state else None
+
+    def wait(self, ids, poll=1.0, timeout=None):
+        """Block until all jobs are done/failed; returns {id: result or None if failed}"""
+        start = time.time()
+        pending = set(ids)
+        while pending:
+            pending = {i for i in pending if self.state_of(i) not in ('done', 'failed')}
+            if pending:
+                if timeout is not None and time.time() - start > timeout:
+                    raise TimeoutError(f"{len(pending)} jobs still pending")
+                self.requeue_stale()
+                time.sleep(poll)
+        return {i: (self.result(i) if self.state_of(i) == 'done' else None) for i in ids}
+
+    # --- claiming / retries ---
+    def claim(self, worker):
+        """Atomically move the oldest pending job to running/; None if the queue is empty"""
+        for job_id in self.ids('pending'):
+            try:
+                os.rename(self.path('pending', job_id), self.path('running', job_id))
+            except (FileNotFoundError, OSError):
+                continue   # another worker won the race
+            try:
+                # rename keeps the mtime of submission: refresh it before requeue_stale sees an old lease
+                os.utime(self.path('running', job_id))
+                job = _read_json(self.path('running', job_id))
+            except FileNotFoundError:
+                continue   # requeued as stale before the heartbeat was set
+            job['attempts'] += 1
+            job['worker'] = worker
+            job['started'] = time.time()
+            _write_json(self.path('running', job_id), job)
+            return job
+        return None
+
+    def heartbeat(self, job_id):
+        try:
+            os.utime(self.path('running', job_id))
+        except FileNotFoundError:
+            pass
+
+    def _move(self, job, state):
+        """Write the job record and move it out of running/ (no-op if it was requeued meanwhile)"""
+        if not os.path.exists(self.path('running', job['id'])):
+            return False
+        _write_json(self.path('running', job['id']), job)
+        try:
+            os.replace(self.path('running', job['id']), self.path(state, job['id']))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def finish(self, job, elapsed):
+        job['elapsed_s'] = elapsed
+        job['finished'] = time.time()
+        self._move(job, 'done')
+
+    def fail(self, job, error):
+        """Record a failed attempt: retry (back to pending) or give up (failed/)"""
+        job['errors'].append({'attempt': job['attempts'], 'worker': job.get('worker'), 'error': error})
+        state = 'pending' if job['attempts'] < job['max_attempts'] else 'failed'
+        self._move(job, state)
+        return state
+
+    def requeue_stale(self):
+        """Running jobs whose heartbeat is older than the lease (worker/host died) are retried"""
+        now = time.time()
+        requeued = 0
+        for job_id in self.ids('running'):
+            path = self.path('running', job_id)
+            try:
+                if now - os.stat(path).st_mtime < self.lease_s:
+                    continue
+                # Take ownership of the stale entry with an atomic rename
+                stale = path + f'.stale.{uuid.uuid4().hex[:8]}'
+                os.rename(path, stale)
+            except FileNotFoundError:
+                continue
+            job = _read_json(stale)
+            os.replace(stale, path)
+            self.fail(job, f"lease expired (no heartbeat for {self.lease_s}s)")
+            requeued += 1
+        return requeued
+
+
+# ------------------------------------------------------------------
+# Worker
+# ------------------------------------------------------------------
+def _child(job, result_path, error_path):
+    """Run one job inside a child process with a memory limit"""
+    if job.get('mem_mb'):
+        import resource
+        limit = int(job['mem_mb']) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        fn = _resolve(job['target'], job.get('pythonpath', ()))
+        result = fn(job['params'], job['data'])
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(result_path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, result_path)
+    except BaseException:
+        with open(error_path, 'w') as f:
+            f.write(traceback.format_exc())
+        os._exit(1)
+
+
+def run_job(queue, job):
+    """Execute a claimed job; returns 'done', 'pending' (retry) or 'failed'"""
+    result_path = queue.path('results', job['id'], '.pkl')
+    error_path = queue.path('results', job['id'], f".err.{os.getpid()}")
+    ctx = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+    proc = ctx.Process(target=_child, args=(job, result_path, error_path), daemon=True)
+
+    start = time.time()
+    proc.start()
+    timeout = job.get('timeout')
+    while proc.is_alive():
+        remaining = HEARTBEAT_S if timeout is None else max(0.0, start + timeout - time.time())
+        proc.join(min(HEARTBEAT_S, remaining))
+        queue.heartbeat(job['id'])
+        if timeout is not None and time.time() - start >= timeout and proc.is_alive():
+            proc.kill()
+            proc.join()
+            return queue.fail(job, f"timeout after {timeout}s")
+    elapsed = time.time() - start
+
+    if proc.exitcode == 0 and os.path.exists(result_path):
+        queue.finish(job, elapsed)
+        return 'done'
+    if os.path.exists(error_path):
+        with open(error_path) as f:
+            error = f.read().strip().splitlines()[-1]
+        os.remove(error_path)
+    else:
+        error = f"worker process exited with code {proc.exitcode}"   # e.g. killed / out of memory
+    return queue.fail(job, error)
+
+
+def worker_loop(root, worker_id=None, poll=1.0, exit_when_empty=False, lease_s=DEFAULT_LEASE_S):
+    queue = JobQueue(root, lease_s=lease_s)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    n_done = 0
+    while True:
+        queue.requeue_stale()
+        job = queue.claim(worker_id)
+        if job is None:
+            if exit_when_empty and not queue.ids('running'):
+                return n_done
+            time.sleep(poll)
+            continue
+        state = run_job(queue, job)
+        n_done += state == 'done'
+        print(f"[{worker_id}] {job['id']} attempt {job['attempts']}: {state}", flush=True)
+
+
+# ------------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Filesystem job queue for LP solves")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    w = sub.add_parser('worker', help='claim and solve jobs')
+    w.add_argument('queue')
+    w.add_argument('--workers', type=int, default=1, help='worker processes on this host')
+    w.add_argument('--poll', type=float, default=1.0)
+    w.add_argument('--lease', type=float, default=DEFAULT_LEASE_S)
+    w.add_argument('--exit-when-empty', action='store_true')
+
+    s = sub.add_parser('submit', help='enqueue one job')
+    s.add_argument('queue')
+    s.add_argument('target', help="'module:function' called as function(params, data)")
+    s.add_argument('--params', default='{}', help='JSON parameters')
+    s.add_argument('--data', help='data reference (path)')
+    s.add_argument('--pythonpath', action='append', default=[])
+    s.add_argument('--timeout', type=float)
+    s.add_argument('--mem-mb', type=int)
+    s.add_argument('--max-attempts', type=int, default=3)
+
+    st = sub.add_parser('status', help='job counts per state')
+    st.add_argument('queue')
+    rq = sub.add_parser('requeue', help='retry jobs with an expired lease')
+    rq.add_argument('queue')
+    rq.add_argument('--lease', type=float, default=DEFAULT_LEASE_S)
+    args = parser.parse_args(argv)
+
+    if args.cmd == 'worker':
+        kwargs = dict(poll=args.poll, exit_when_empty=args.exit_when_empty, lease_s=args.lease)
+        if args.workers == 1:
+            worker_loop(args.queue, **kwargs)
+            return
+        procs = [mp.Process(target=worker_loop, args=(args.queue,), kwargs=kwargs)
+                 for _ in range(args.workers)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    elif args.cmd == 'submit':
+        q = JobQueue(args.queue)
+        print(q.submit(args.target, json.loads(args.params), args.data, args.timeout,
+                       args.mem_mb, args.max_attempts, args.pythonpath))
+    elif args.cmd == 'status':
+        for state, n in JobQueue(args.queue).status().items():
+            print(f"{state:8s} {n}")
+    elif args.cmd == 'requeue':
+        print(f"Requeued {JobQueue(args.queue, lease_s=args.lease).requeue_stale()} jobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Model reduction pass for the PuLP capacity expansion models.
+
+Finds structure in a built model that only costs build time and solver work:
+    unused      variables that were created but appear in no constraint and
+                have a zero objective coefficient (never reach the solver)
+    dangling    variables in the objective but in no constraint (fixed at
+                their cheapest bound)
+    singleton   rows with one variable, which are really variable bounds
+    dup_bound   singleton rows that do not tighten the existing bounds
+    dup_row     rows identical (up to scaling) to an earlier row
+    empty       rows without variables
+
+`reduce_model` reports these and, with strip=True, removes them: singleton rows
+become variable bounds, dangling variables are dropped from the objective and
+duplicate/empty rows are deleted. After the solve, `Reduction.restore()`
+assigns the fixed values to every removed variable so result extraction still
+sees a value for each of them.
+
+Usage:
+    red = reduce_model(prob, var, strip=True)
+    red.print_report()
+    red.solve(prob)                      # prob.solve() + restore()
+"""
+
+from collections import defaultdict
+
+import pulp
+
+EQ, LE, GE = pulp.LpConstraintEQ, pulp.LpConstraintLE, pulp.LpConstraintGE
+KEY_DIGITS = 12   # rounding used to match duplicate rows
+
+
+def model_variables(var):
+    """All LpVariables in a build_model var dict (nested dicts of variables)"""
+    out = []
+    for v in var.values():
+        if isinstance(v, pulp.LpVariable):
+            out.append(v)
+        elif isinstance(v, dict):
+            out.extend(x for x in v.values() if isinstance(x, pulp.LpVariable))
+    return out
+
+
+def _bound_of(coef, sense, rhs):
+    """(lower, upper) implied by coef*x (sense) rhs"""
+    value = rhs / coef
+    if sense == EQ:
+        return value, value
+    if (sense == LE) == (coef > 0):
+        return None, value
+    return value, None
+
+
+def _row_key(con):
+    """Row normalised by its first coefficient, so scaled copies compare equal"""
+    items = sorted(((v.name, c) for v, c in con.items()), key=lambda item: item[0])
+    scale = items[0][1]
+    sense = con.sense if scale > 0 else -con.sense
+    return (sense, tuple((n, round(c / scale, KEY_DIGITS)) for n, c in items),
+            round(-con.constant / scale, KEY_DIGITS))
+
+
+class Reduction:
+    """Findings of one pass over a model, and what was stripped"""
+
+    def __init__(self):
+        self.found = defaultdict(list)   # category -> names
+        self.fixed = {}                  # LpVariable -> value assigned after the solve
+        self.stripped = False
+        self.counts = {}
+
+    def restore(self):
+        for v, value in self.fixed.items():
+            v.varValue = value
+
+    def solve(self, prob, solve_fn=None):
+        status = (solve_fn or pulp.LpProblem.solve)(prob)
+        self.restore()
+        return status
+
+    def print_report(self, title='Model reduction'):
+        before, after = self.counts['before'], self.counts.get('after')
+        print(f"\n=== {title} ===")
+        print(f"  variables: {before['variables']:,} created, {before['solver_variables']:,} passed to the solver"
+              + (f" -> {after['solver_variables']:,}" if after else ""))
+        print(f"  rows:      {before['rows']:,}" + (f" -> {after['rows']:,}" if after else ""))
+        for category in ('unused', 'dangling', 'singleton', 'dup_bound', 'dup_row', 'empty'):
+            names = self.found.get(category, [])
+            example = f"  e.g. {', '.join(names[:3])}" if names else ""
+            print(f"  {category:10s} {len(names):8,}{example}")
+
+
+def _counts(prob, all_vars):
+    return {'variables': len(all_vars), 'solver_variables': len(prob.variables()),
+            'rows': len(prob.constraints)}
+
+
+def reduce_model(prob, var=None, strip=False):
+    """
+    Analyse `prob` (and the variables created for it in `var`) and optionally strip
+    the redundant parts in place. Returns a Reduction.
+    """
+    red = Reduction()
+    all_vars = model_variables(var) if var is not None else prob.variables()
+    red.counts['before'] = _counts(prob, all_vars)
+
+    objective = prob.objective
+    in_rows = defaultdict(int)
+    for con in prob.constraints.values():
+        for v in con.keys():
+            in_rows[v.name] += 1
+
+    # --- rows ---
+    seen_rows = {}
+    drop_rows, new_bounds = [], {}
+    for name, con in prob.constraints.items():
+        if len(con) == 0:
+            red.found['empty'].append(name)
+            drop_rows.append(name)
+            continue
+        if len(con) == 1:
+            (v, coef), = con.items()
+            lo, up = _bound_of(coef, con.sense, -con.constant)
+            cur_lo, cur_up = new_bounds.get(v.name, (v, v.lowBound, v.upBound))[1:]
+            tighter = ((lo is not None and (cur_lo is None or lo > cur_lo)) or
+                       (up is not None and (cur_up is None or up < cur_up)))
+            if tighter:
+                red.found['singleton'].append(name)
+                lo = cur_lo if lo is None else (lo if cur_lo is None else max(lo, cur_lo))
+                up = cur_up if up is None else (up if cur_up is None else min(up, cur_up))
+                if lo is not None and up is not None and lo > up + 1e-9:
+                    raise ValueError(f"row {name} makes {v.name} infeasible ({lo} > {up})")
+                new_bounds[v.name] = (v, lo, up)
+            else:
+                red.found['dup_bound'].append(name)
+            drop_rows.append(name)
+            in_rows[v.name] -= 1
+            continue
+        key = _row_key(con)
+        if key in seen_rows:
+            red.found['dup_row'].append(name)
+            drop_rows.append(name)
+            for v in con.keys():
+                in_rows[v.name] -= 1
+        else:
+            seen_rows[key] = name
+
+    # --- variables ---
+    bounds = {v.name: (lo, up) for v, lo, up in new_bounds.values()}
+    drop_objective = []
+    for v in all_vars:
+        if in_rows[v.name] > 0:
+            continue
+        lo, up = bounds.get(v.name, (v.lowBound, v.upBound))
+        coef = objective.get(v, 0.0)
+        if coef > 0:
+            value = lo
+        elif coef < 0:
+            value = up
+        else:
+            value = lo if lo is not None else (up if up is not None else 0.0)
+        if value is None:
+            raise ValueError(f"dangling variable {v.name} makes the objective unbounded")
+        red.found['dangling' if v in objective else 'unused'].append(v.name)
+        red.fixed[v] = value
+        if v in objective:
+            drop_objective.append(v)
+
+    if strip:
+        for name in drop_rows:
+            del prob.constraints[name]
+        for v, lo, up in new_bounds.values():
+            if v not in red.fixed:
+                v.lowBound, v.upBound = lo, up
+        for v in drop_objective:
+            objective.constant += objective[v] * red.fixed[v]
+            del objective[v]
+        # PuLP only ever adds to its variable list; rebuild it from the remaining rows
+        prob._variables, prob._variable_ids = [], {}
+        red.stripped = True
+        red.counts['after'] = _counts(prob, all_vars)
+    else:
+        red.fixed = {}
+    return red
+
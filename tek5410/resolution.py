@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution temporal mode for the capacity expansion LPs.
+
+Consecutive hours are aggregated into blocks of `step_h` hours (counted from the
+`weight` column, so sub-hourly or already aggregated rows group by time, not by
+row count). Power-like
+columns (demand, capacity factors) become block means, so every block carries
+the same energy as the hours it replaces, and a `weight` column records the
+block length in hours. The models use the weight to scale per-step operating
+cost and the storage SOC change (SOC[b] = SOC[b-1] + w_b * (eta*charge - discharge)).
+
+Results are mapped back to hourly form: power variables are constant within a
+block, and the state of charge is interpolated linearly inside a block (exact,
+since charge and discharge are constant over the block).
+
+The other direction is a sub-hourly time base: `subhourly` interpolates hourly
+columns onto steps of 1/steps_per_hour h (weight < 1), and `entsoe_load` reads a
+measured series such as the 15-minute German load of assignment3 to replace the
+demand column. aggregate(steps, 1) is then the matching hourly run.
+
+Usage:
+    blocks = aggregate(raw_data, 3)              # 8784 h -> 2928 blocks
+    quarters = subhourly(raw_data, 4)            # 8784 h -> 35136 steps of 0.25 h
+    hourly = expand(block_values, blocks['weight'])       # step=0.25 for blocks of quarters
+    table = compare_resolutions(solve_fn, raw_data, [1, 2, 3, 6], metrics_fn)
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+RESOLUTIONS = (1, 2, 3, 6)
+WEIGHT = 'weight'
+
+
+def aggregate(raw_data, step_h):
+    """
+    Block means of the numeric columns plus a `weight` column (hours per block).
+    Rows are grouped by the hour they start in, so blocks span step_h hours whatever
+    the row length (15-minute rows with step_h=2 give 2 h blocks of 8 rows). A trailing
+    partial block keeps its true length. step_h=1 on hourly data returns weights of 1.
+    """
+    if not step_h > 0:
+        raise ValueError(f"step_h must be a positive number of hours, got {step_h}")
+    numeric = raw_data.select_dtypes('number')
+    weights = hour_weights(raw_data)
+    start = np.cumsum(weights) - weights
+    block = np.floor(start / step_h + 1e-9).astype(int)
+
+    # Weighted means, so aggregating an already aggregated frame stays energy-consistent
+    sums = numeric.drop(columns=WEIGHT, errors='ignore').mul(weights, axis=0).groupby(block).sum()
+    w = pd.Series(weights).groupby(block).sum()
+    out = sums.div(w, axis=0).reset_index(drop=True)
+    out[WEIGHT] = w.to_numpy()
+    return out
+
+
+def subhourly(hourly, steps_per_hour):
+    """
+    Hourly numeric columns linearly interpolated onto steps_per_hour steps per hour
+    (hourly values sit at the hour centres; the first and last half hour are held
+    flat), plus a `weight` column of 1/steps_per_hour.
+    """
+    steps_per_hour = int(steps_per_hour)
+    if steps_per_hour < 1:
+        raise ValueError(f"steps_per_hour must be a positive integer, got {steps_per_hour}")
+    numeric = hourly.select_dtypes('number').drop(columns=WEIGHT, errors='ignore')
+    centres = np.arange(len(hourly)) + 0.5
+    t = (np.arange(len(hourly) * steps_per_hour) + 0.5) / steps_per_hour
+    out = pd.DataFrame({col: np.interp(t, centres, numeric[col].to_numpy(float)) for col in numeric})
+    out[WEIGHT] = 1.0 / steps_per_hour
+    return out
+
+
+def entsoe_load(path, column='Actual'):
+    """
+    ENTSO-E 'Total Load - Day Ahead / Actual' export -> load (MW) at its native resolution
+    as a Series on a regular local-time index. The repeated autumn DST hour is averaged;
+    the skipped spring hour and other gaps are interpolated, so every step has a value.
+    """
+    df = pd.read_csv(path, na_values=['N/A', 'n/e', '-'])
+    df.columns = ['Time', 'Forecast', 'Actual']
+    start = pd.to_datetime(df['Time'].str.split(' - ').str[0], format='%d.%m.%Y %H:%M')
+    load = df[column].groupby(start).mean()
+    step = load.index.to_series().diff().mode()[0]
+    index = pd.date_range(load.index[0].normalize(), load.index[-1].normalize() + pd.Timedelta('1D'),
+                          freq=step, inclusive='left')
+    return load.reindex(index).interpolate(limit_direction='both')
+
+
+def hour_weights(data):
+    """Hours represented by each row (1.0 everywhere for hourly data)"""
+    if WEIGHT in data:
+        return np.asarray(data[WEIGHT], dtype=float)
+    return np.ones(len(data))
+
+
+def _rows_per_block(weights, step):
+    """Number of `step`-hour rows in each block of `weights` hours"""
+    rows = np.asarray(weights, dtype=float) / step
+    counts = np.rint(rows).astype(int)
+    if np.any(np.abs(rows - counts) > 1e-6) or np.any(counts < 1):
+        raise ValueError(f"block weights are not whole multiples of the {step} h row length")
+    return counts
+
+
+def expand(values, weights, step=1.0):
+    """Block values -> values per row of `step` hours (repeated over the rows of each block)"""
+    return np.repeat(np.asarray(values), _rows_per_block(weights, step))
+
+
+def expand_state(ends, weights, initial=0.0, step=1.0):
+    """
+    End-of-block state (e.g. SOC) -> end-of-row state for rows of `step` hours,
+    interpolating linearly from the previous block's end. `initial` is the state
+    before the first block.
+    """
+    ends = np.asarray(ends, dtype=float)
+    steps = _rows_per_block(weights, step)
+    starts = np.concatenate([[initial], ends[:-1]])
+    rate = (ends - starts) / steps
+    offset = np.concatenate([np.arange(1, s + 1) for s in steps])
+    return np.repeat(starts, steps) + np.repeat(rate, steps) * offset
+
+
+def compare_resolutions(solve_fn, raw_data, resolutions=RESOLUTIONS, metrics_fn=None, verbose=True):
+    """
+    Solve at each resolution and report solve time, speedup and the deviation of
+    every metric (cost, capacities, ...) relative to the finest resolution.
+
+    solve_fn(data) -> result, metrics_fn(result) -> {name: float}
+    Returns a DataFrame with one row per resolution.
+    """
+    metrics_fn = metrics_fn or (lambda result: result)
+    rows = []
+    for step_h in sorted(resolutions):
+        data = aggregate(raw_data, step_h)
+        start = time.perf_counter()
+        result = solve_fn(data)
+        elapsed = time.perf_counter() - start
+        rows.append({'resolution_h': step_h, 'steps': len(data), 'solve_s': elapsed,
+                     **metrics_fn(result)})
+        if verbose:
+            print(f"  {step_h}h: {len(data)} steps, {elapsed:.1f} s")
+
+    table = pd.DataFrame(rows)
+    ref = table.iloc[0]
+    table['speedup'] = ref['solve_s'] / table['solve_s']
+    for col in [c for c in table.columns if c not in ('resolution_h', 'steps', 'solve_s', 'speedup')]:
+        denom = abs(ref[col]) if abs(ref[col]) > 1e-9 else np.nan
+        table[f'{col}_dev_pct'] = (table[col] - ref[col]) / denom * 100
+    return table
+
+
+def print_report(table, title):
+    """Metrics and their deviation (%) from the finest resolution, one column per resolution"""
+    cols = [f"{h}h" for h in table['resolution_h']]
+    timing = table[['steps', 'solve_s', 'speedup']].T
+    metrics = [c for c in table.columns if c.endswith('_dev_pct')]
+    values = table[[c[:-len('_dev_pct')] for c in metrics]].T
+    devs = table[metrics].T
+    devs.index = values.index
+    for frame in (timing, values, devs):
+        frame.columns = cols
+
+    print(f"\n=== {title}: resolution vs hourly ===")
+    with pd.option_context('display.width', 200, 'display.float_format', '{:,.2f}'.format):
+        print(timing.to_string())
+        print("\nValues:")
+        print(values.to_string())
+        print("\nDeviation from hourly (%):")
+        print(devs.to_string())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Shared-memory input arrays for multi-process solves and sweeps.
+
+The coordinator loads the input time series once and publishes them in a
+single `multiprocessing.shared_memory` block (same host) or as a directory of
+.npy files that workers memory-map (shared filesystem). Workers attach by a
+short reference string and get read-only NumPy views - no parsing, no copies -
+so per-worker startup time and private memory stay flat as workers scale.
+
+Reference strings (accepted by assignment4/5 `load_data` and job-queue jobs):
+    shm:<name>      shared memory block created by SharedArrays
+    npy:<dir>       directory written by save_npy (memory-mapped read-only)
+
+Usage:
+    with SharedArrays.from_frame(pd.read_csv('baseline_data.csv')) as shared:
+        ref = shared.ref                       # 'shm:tek5410_…'
+        pool = ProcessPoolExecutor(64, initializer=init_worker, initargs=(ref,))
+        ...                                    # workers call worker_frame() / worker_arrays()
+
+    python -m tek5410.sharedarrays bench assignment5/baseline_data.csv --workers 1 8 64
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+
+HEADER = struct.Struct('<Q')   # length of the JSON layout that precedes the data
+ALIGN = 64
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _open_untracked(name):
+    """
+    Attach without registering the block with the resource tracker: a worker that
+    exits must not unlink a block owned by the coordinator (track=False on 3.13+).
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+# ------------------------------------------------------------------
+# Shared memory block
+# ------------------------------------------------------------------
+class SharedArrays:
+    """Owner of a shared memory block holding named arrays (with a self-describing header)"""
+
+    def __init__(self, arrays, name=None):
+        arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+        layout, offset = {}, 0
+        for key, arr in arrays.items():
+            if arr.dtype.hasobject:
+                raise TypeError(f"array '{key}' has dtype object; only numeric/fixed-width arrays can be shared")
+            layout[key] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+            offset = _align(offset + arr.nbytes)
+        header = json.dumps(layout).encode()
+        data_start = _align(HEADER.size + len(header))
+
+        self.name = name or f"tek5410_{uuid.uuid4().hex[:12]}"
+        self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=max(data_start + offset, 1))
+        HEADER.pack_into(self.shm.buf, 0, len(header))
+        self.shm.buf[HEADER.size:HEADER.size + len(header)] = header
+        for key, arr in arrays.items():
+            start = data_start + layout[key]['offset']
+            view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=self.shm.buf, offset=start)
+            view[...] = arr
+
+    @classmethod
+    def from_frame(cls, df, name=None):
+        """Numeric columns of a DataFrame (index is not shared; workers get a RangeIndex)"""
+        return cls({c: df[c].to_numpy() for c in df.columns if df[c].dtype.kind in 'biuf'}, name)
+
+    @property
+    def ref(self):
+        return f"shm:{self.name}"
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_ATTACHED = {}   # keep segments mapped for the lifetime of the worker
+
+
+def attach(ref):
+    """Read-only, zero-copy views of the arrays behind a 'shm:' or 'npy:' reference"""
+    if ref in _ATTACHED:
+        return _ATTACHED[ref][1]
+    kind, _, target = ref.partition(':')
+    if kind == 'npy':
+        arrays = load_npy(target)
+        _ATTACHED[ref] = (None, arrays)
+        return arrays
+    if kind != 'shm':
+        raise ValueError(f"not a shared array reference: {ref!r}")
+
+    shm = _open_untracked(target)
+    (n,) = HEADER.unpack_from(shm.buf, 0)
+    layout = json.loads(bytes(shm.buf[HEADER.size:HEADER.size + n]))
+    data_start = _align(HEADER.size + n)
+    arrays = {}
+    for key, spec in layout.items():
+        arr = np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']),
+                         buffer=shm.buf, offset=data_start + spec['offset'])
+        arr.flags.writeable = False
+        arrays[key] = arr
+    _ATTACHED[ref] = (shm, arrays)
+    return arrays
+
+
+def is_shared_ref(ref):
+    return isinstance(ref, str) and ref.split(':', 1)[0] in ('shm', 'npy') and ':' in ref
+
+
+def attach_frame(ref):
+    """DataFrame whose columns are the shared (read-only) arrays"""
+    import pandas as pd
+    return pd.DataFrame(attach(ref), copy=False)
+
+
+# ------------------------------------------------------------------
+# Memory-mapped .npy directory (multi-host, shared filesystem)
+# ------------------------------------------------------------------
+def save_npy(arrays, directory):
+    os.makedirs(directory, exist_ok=True)
+    for key, arr in arrays.items():
+        np.save(os.path.join(directory, f"{key}.npy"), np.ascontiguousarray(arr))
+    with open(os.path.join(directory, 'columns.json'), 'w') as f:
+        json.dump(list(arrays), f)
+    return f"npy:{os.path.abspath(directory)}"
+
+
+def load_npy(directory):
+    with open(os.path.join(directory, 'columns.json')) as f:
+        keys = json.load(f)
+    return {k: np.load(os.path.join(directory, f"{k}.npy"), mmap_mode='r') for k in keys}
+
+
+# ------------------------------------------------------------------
+# Worker-side helpers (ProcessPoolExecutor / multiprocessing.Pool initializer)
+# ------------------------------------------------------------------
+_WORKER_REF = None
+
+
+def init_worker(ref):
+    global _WORKER_REF
+    _WORKER_REF = ref
+    attach(ref)
+
+
+def worker_arrays():
+    return attach(_WORKER_REF)
+
+
+def worker_frame():
+    return attach_frame(_WORKER_REF)
+
+
+# ------------------------------------------------------------------
+# Benchmark: per-worker startup time and private memory
+# ------------------------------------------------------------------
+def _private_kb():
+    """Private (unshared) resident memory of this process, from /proc/self/smaps_rollup"""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return sum(int(fields[k].split()[0]) for k in ('Private_Clean', 'Private_Dirty'))
+    except (OSError, KeyError):
+        return float('nan')
+
+
+def _bench_worker(args):
+    mode, ref = args
+    before = _private_kb()
+    t0 = time.perf_counter()
+    if mode == 'csv':
+        import pandas as pd
+        df = pd.read_csv(ref)
+        arrays = {c: df[c].to_numpy() for c in df.columns if df[c].dtype.kind in 'f'}
+    else:
+        arrays = attach(ref)
+    checksum = sum(float(a.sum()) for a in arrays.values())   # touch every page
+    return time.perf_counter() - t0, _private_kb() - before, checksum
+
+
+def bench(csv_path, worker_counts):
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+
+    df = pd.read_csv(csv_path)
+    print(f"{'workers':>8s} {'mode':>6s} {'startup ms (mean/max)':>24s} {'private MB/worker':>18s}")
+    with SharedArrays.from_frame(df) as shared:
+        for n in worker_counts:
+            for mode, ref in (('csv', csv_path), ('shm', shared.ref)):
+                with ProcessPoolExecutor(n) as pool:
+                    stats = list(pool.map(_bench_worker, [(mode, ref)] * n))
+                t = np.array([s[0] for s in stats]) * 1e3
+                mem = np.array([s[1] for s in stats]) / 1024
+                print(f"{n:8d} {mode:>6s} {t.mean():11.1f} / {t.max():10.1f} {mem.mean():18.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared input arrays")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    b = sub.add_parser('bench', help='per-worker startup time and private memory: read_csv vs shared memory')
+    b.add_argument('csv')
+    b.add_argument('--workers', type=int, nargs='+', default=[1, 8, 64])
+    args = parser.parse_args()
+    bench(args.csv, args.workers)